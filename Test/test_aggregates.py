@@ -0,0 +1,68 @@
+import random
+from datetime import date, timedelta
+
+from src.aggregates import DailyTotalsIndex, FenwickTree, RollupCache
+from src.models import WorkChunk
+
+
+def test_fenwick_prefix_sum():
+    values = [3, 0, 5, 1, 7]
+    tree = FenwickTree(values)
+    assert [tree.prefix_sum(i) for i in range(5)] == [3, 3, 8, 9, 16]
+
+    tree.add(1, 10)
+    assert tree.prefix_sum(1) == 13
+    assert tree.prefix_sum(4) == 26
+
+
+def test_daily_totals_match_scan():
+    rng = random.Random(1)
+    start = date(2023, 1, 1)
+    chunks = [WorkChunk(i, start + timedelta(days=rng.randrange(700)), rng.randrange(1, 120))
+              for i in range(500)]
+    index = DailyTotalsIndex(chunks[:250])
+    for chunk in chunks[250:]:
+        index.add(chunk.chunk_date, chunk.minutes)
+
+    for _ in range(50):
+        a = start + timedelta(days=rng.randrange(-30, 730))
+        b = a + timedelta(days=rng.randrange(0, 90))
+        expected = sum(c.minutes for c in chunks if a <= c.chunk_date <= b)
+        assert index.total_for_range(a, b) == expected
+
+
+def test_daily_totals_grow_and_remove():
+    index = DailyTotalsIndex()
+    assert index.total_for_range(date(2025, 1, 1), date(2025, 12, 31)) == 0
+
+    index.add(date(2025, 9, 30), 30)
+    index.add(date(2010, 1, 1), 15)  # Far outside the current span
+    assert index.total_for_range(date(2000, 1, 1), date(2030, 1, 1)) == 45
+    assert index.total_for_day(date(2010, 1, 1)) == 15
+
+    index.add(date(2025, 9, 30), -30)
+    assert index.total_for_day(date(2025, 9, 30)) == 0
+    assert index.total_for_range(date(2025, 1, 1), date(2025, 12, 31)) == 0
+
+
+def test_rollup_cache_periods():
+    chunks = [WorkChunk(1, date(2025, 9, 29), 10),   # Monday
+              WorkChunk(2, date(2025, 10, 1), 20),
+              WorkChunk(3, date(2025, 12, 31), 30),
+              WorkChunk(4, date(2024, 12, 31), 40)]
+    cache = RollupCache(chunks)
+
+    assert cache.day(date(2025, 10, 1)) == 20
+    assert cache.week(date(2025, 10, 5)) == 30
+    assert cache.month(date(2025, 10, 15)) == 20
+    assert cache.quarter(date(2025, 11, 1)) == 50
+    assert cache.year(date(2025, 1, 1)) == 60
+
+    cache.add(date(2025, 10, 1), -20)
+    assert cache.week(date(2025, 10, 1)) == 10
+    assert date(2025, 10, 1).toordinal() not in cache.daily
+
+    restored = RollupCache.from_dict(cache.to_dict())
+    assert restored.daily == cache.daily
+    assert restored.weekly == cache.weekly
+    assert restored.monthly == cache.monthly
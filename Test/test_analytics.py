@@ -0,0 +1,70 @@
+import random
+import pytest
+from datetime import date, timedelta
+
+from src import analytics
+from src.analytics import year_report
+from src.calculations import DaysOffCalendar, calculate_billed_time
+from src.chunk_store import ChunkStore
+from src.models import WorkChunk
+
+
+@pytest.fixture
+def chunks():
+    return [
+        WorkChunk(1, date(2024, 12, 31), 100),  # Before the year; only in rolling windows
+        WorkChunk(2, date(2025, 1, 1), 480),    # Wednesday
+        WorkChunk(3, date(2025, 1, 2), 300),
+        WorkChunk(4, date(2025, 1, 2), 200),
+        WorkChunk(5, date(2025, 1, 3), 15),
+        WorkChunk(6, date(2025, 1, 4), 60),     # Saturday
+        WorkChunk(7, date(2025, 1, 6), 480),
+    ]
+
+
+def test_year_report(chunks):
+    report = year_report(chunks, 2025, use_numpy=False)
+
+    assert len(report["daily"]) == 365
+    assert report["daily"][:6] == [480, 500, 15, 60, 0, 480]
+    assert report["rolling_7"][0] == pytest.approx(580 / 7)
+    assert report["weeks"][0] == {"week_start": date(2025, 1, 1), "billed": 1055,
+                                  "goal": 3 * 480, "attainment": pytest.approx(1055 / 1440)}
+    assert report["weeks"][1]["week_start"] == date(2025, 1, 6)
+    assert report["chunk_sizes"]["counts"] == [1, 0, 1, 0, 1, 3]
+    assert report["chunk_sizes"]["median"] == 250
+    assert report["total"] == 1535
+
+
+def test_streaks_skip_days_off(chunks):
+    days_off = DaysOffCalendar([date(2025, 1, 3)])
+    report = year_report(chunks, 2025, days_off=days_off, as_of=date(2025, 1, 6), use_numpy=False)
+
+    # Jan 1, 2 and 6 met the goal; Jan 3 is a day off and Jan 4-5 a weekend
+    assert report["streaks"] == {"longest": 3, "current": 3}
+    assert report["goal"] == 3 * 480
+
+
+def test_matches_scalar_path():
+    rng = random.Random(4)
+    chunks = [WorkChunk(i, date(2024, 11, 1) + timedelta(days=rng.randrange(500)), rng.randrange(5, 300))
+              for i in range(2000)]
+    report = year_report(ChunkStore(chunks), 2025, use_numpy=False)
+
+    for week in report["weeks"][1:-1]:
+        assert week["billed"] == calculate_billed_time(week["week_start"], "week", chunks)
+    assert sum(report["daily"]) == calculate_billed_time(date(2025, 6, 1), "year", chunks)
+
+
+@pytest.mark.skipif(analytics.np is None, reason="NumPy not installed")
+def test_numpy_matches_python():
+    rng = random.Random(5)
+    chunks = [WorkChunk(i, date(2024, 11, 1) + timedelta(days=rng.randrange(500)), rng.randrange(5, 300))
+              for i in range(2000)]
+    days_off = [date(2025, 7, 4), date(2025, 12, 25)]
+    expected = year_report(chunks, 2025, days_off=days_off, use_numpy=False)
+    actual = year_report(chunks, 2025, days_off=days_off, use_numpy=True)
+
+    for key in ("daily", "weeks", "streaks", "chunk_sizes", "total", "goal"):
+        assert actual[key] == expected[key]
+    assert actual["rolling_30"] == pytest.approx(expected["rolling_30"])
@@ -0,0 +1,122 @@
+import json
+import threading
+import pytest
+from datetime import date
+from http.client import HTTPConnection
+
+from src.api_server import ApiServer, BillingApi
+from src.data_manager import DataManager
+from src.models import WorkChunk
+from src.storage import load_chunks_from_csv, save_chunks_to_csv
+
+TEST_FILENAME = "test_work_chunks.csv"
+
+
+@pytest.fixture
+def api(tmp_path):
+    manager = DataManager(filename=str(tmp_path / TEST_FILENAME))
+    manager.add_chunks(date(2025, 9, 30), [60], "Client A")
+    manager.add_chunks(date(2025, 10, 1), [30, 45], "Client B")
+    manager.add_chunks(date(2025, 10, 2), [15], "Internal")
+    return BillingApi(manager, daily_goal=480)
+
+
+def get(api, path, **query):
+    status, body, _ = api.handle("GET", path, {k: str(v) for k, v in query.items()})
+    return status, json.loads(body)
+
+
+def test_list_chunks_pages(api):
+    status, page = get(api, "/chunks", **{"from": "2025-10-01", "to": "2025-10-31", "limit": 2})
+    assert status == 200
+    assert page["total"] == 3 and page["next_offset"] == 2
+    assert [c["minutes"] for c in page["chunks"]] == [30, 45]
+
+    _, page = get(api, "/chunks", **{"from": "2025-10-01", "to": "2025-10-31", "limit": 2, "offset": 2})
+    assert page["next_offset"] is None
+    assert page["chunks"] == [{"id": 4, "date": "2025-10-02", "minutes": 15, "description": "Internal"}]
+
+
+def test_totals_and_report(api):
+    _, totals = get(api, "/totals", date="2025-10-01", period="week")
+    assert (totals["billed"], totals["goal"]) == (150, 5 * 480)
+
+    _, report = get(api, "/report", **{"from": "2025-09-01", "to": "2025-10-31", "period": "month"})
+    assert [row["billed"] for row in report["rows"]] == [60, 90]
+    assert report["billed"] == 150
+
+
+def test_post_invalidates_cache(api):
+    query = {"date": "2025-10-01", "period": "day"}
+    _, before = get(api, "/totals", **query)
+    status, body, _ = api.handle("POST", "/chunks", {},
+                                 json.dumps({"date": "2025-10-01", "minutes": 20}).encode())
+    assert status == 201
+    assert json.loads(body)["chunks"][0]["id"] == 5
+    _, after = get(api, "/totals", **query)
+    assert after["billed"] == before["billed"] + 20
+
+
+def test_post_returns_stored_ids(api):
+    # Another process appends first; the response has the IDs storage gave
+    save_chunks_to_csv([WorkChunk(0, date(2025, 10, 3), 100, "Elsewhere")], filename=api.data_manager.filename)
+    status, body, _ = api.handle("POST", "/chunks", {},
+                                 json.dumps({"date": "2025-10-03", "minutes": 20}).encode())
+    assert status == 201
+    assert json.loads(body)["chunks"][0]["id"] == 6
+    assert [c.chunk_id for c in load_chunks_from_csv(api.data_manager.filename)][-1] == 6
+
+
+def test_etag_differs_between_launches(api):
+    restarted = BillingApi(api.data_manager)
+    assert api.etag(api.version) != restarted.etag(api.version)
+
+
+def test_bad_requests(api):
+    assert get(api, "/chunks", **{"from": "2025-10-01"})[0] == 400
+    assert get(api, "/chunks", **{"from": "2025-10-01", "to": "2025-10-02", "limit": 0})[0] == 400
+    assert get(api, "/totals", date="2025-10-01", period="decade")[0] == 400
+    assert get(api, "/nothing")[0] == 404
+    assert api.handle("POST", "/chunks", {}, b'{"date": "2025-10-01", "minutes": -5}')[0] == 400
+    assert api.handle("POST", "/chunks", {}, b'not json')[0] == 400
+
+
+def test_unexpected_error_answered(api, monkeypatch, capsys):
+    def fail(chunks):
+        raise RuntimeError("backend broke")
+    monkeypatch.setattr(api.data_manager.storage, "append_chunks", fail)
+
+    status, body, _ = api.handle("POST", "/chunks", {}, b'{"date": "2025-10-01", "minutes": 20}')
+    assert status == 500
+    assert "backend broke" in json.loads(body)["error"]
+    assert "RuntimeError" in capsys.readouterr().err
+
+
+def test_http_keep_alive_and_etag(api):
+    server = ApiServer(api, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        conn = HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+        conn.request("GET", "/version")
+        response = conn.getresponse()
+        etag = response.getheader("ETag")
+        assert response.status == 200
+        assert json.loads(response.read()) == {"version": api.version}
+
+        # Same connection, revalidated
+        conn.request("GET", "/version", headers={"If-None-Match": etag})
+        response = conn.getresponse()
+        assert response.status == 304
+        response.read()
+
+        conn.request("POST", "/chunks", body=json.dumps({"date": "2025-10-03", "minutes": [10]}),
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        assert response.status == 201
+        assert response.getheader("ETag") != etag
+        response.read()
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
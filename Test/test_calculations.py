@@ -36,3 +36,53 @@ def test_get_month_range(input_date, expected_start, expected_end):
     start, end = get_month_range(input_date)
     assert start == expected_start
     assert end == expected_end
+
+def test_get_months_in_range():
+    assert get_months_in_range(date(2025, 11, 30), date(2026, 2, 1)) == [
+        (2025, 11), (2025, 12), (2026, 1), (2026, 2)
+    ]
+    assert get_months_in_range(date(2025, 10, 5), date(2025, 10, 1)) == []
+
+@pytest.mark.parametrize("start,end,expected", [
+    (date(2025, 9, 29), date(2025, 10, 5), 5),    # Full week
+    (date(2025, 10, 4), date(2025, 10, 5), 0),    # Weekend only
+    (date(2025, 10, 1), date(2025, 10, 31), 23),
+    (date(2024, 2, 1), date(2024, 2, 29), 21),    # Leap Year
+    (date(2025, 10, 5), date(2025, 10, 1), 0),    # Reversed range
+])
+def test_count_workdays(start, end, expected):
+    assert count_workdays(start, end) == expected
+    assert count_workdays(start, end) == len(get_weekdays_in_range(start, end))
+
+def test_count_workdays_with_days_off():
+    days_off = DaysOffCalendar([
+        date(2025, 10, 13),  # Monday
+        date(2025, 10, 18),  # Saturday - never a workday anyway
+        date(2025, 12, 25),  # Outside the range
+    ])
+    assert count_workdays(date(2025, 10, 1), date(2025, 10, 31), days_off) == 22
+    assert date(2025, 10, 13) in days_off
+    assert days_off.count_in_range(date(2025, 10, 13), date(2025, 10, 13)) == 1
+
+@pytest.mark.parametrize("period,expected", [
+    ("day", (date(2025, 11, 5), date(2025, 11, 5))),
+    ("week", (date(2025, 11, 3), date(2025, 11, 9))),
+    ("month", (date(2025, 11, 1), date(2025, 11, 30))),
+    ("quarter", (date(2025, 10, 1), date(2025, 12, 31))),
+    ("year", (date(2025, 1, 1), date(2025, 12, 31))),
+])
+def test_get_period_range(period, expected):
+    assert get_period_range(date(2025, 11, 5), period) == expected
+
+def test_get_period_range_unknown():
+    with pytest.raises(ValueError):
+        get_period_range(date(2025, 11, 5), "fortnight")
+
+def test_get_period_totals():
+    chunks = [WorkChunk(1, date(2025, 9, 30), 60), WorkChunk(2, date(2025, 10, 1), 30),
+              WorkChunk(3, date(2025, 10, 20), 45)]
+    rows = get_period_totals(chunks, date(2025, 9, 29), date(2025, 10, 31), "month", 480)
+    assert [(r["start"], r["end"], r["billed"], r["goal"]) for r in rows] == [
+        (date(2025, 9, 29), date(2025, 9, 30), 60, 2 * 480),
+        (date(2025, 10, 1), date(2025, 10, 31), 75, 23 * 480),
+    ]
@@ -34,3 +34,47 @@ def test_old_highlight_cleared_on_date_change(calendar_instance):
     yesterday_format = calendar_instance.dateTextFormat(yesterday)
     assert yesterday_format.background().color().name() != "#444444"  # not weekend color
     assert yesterday_format.background().color().name() != "#F4F8A4"  # not today color    
+
+
+class FakeTotals:
+    """Per-day totals source for the heatmap, like DataManager."""
+    def __init__(self, daily):
+        self.daily = daily
+        self.totals_version = 0
+        self.calls = 0
+
+    def daily_minutes_for_range(self, start_date, end_date):
+        self.calls += 1
+        return {o: m for o, m in self.daily.items() if start_date.toordinal() <= o <= end_date.toordinal()}
+
+
+def test_heatmap_style():
+    assert heatmap_style(0, 480) is None
+    assert heatmap_style(60, 480) == HEATMAP_LEVELS[0][1]
+    assert heatmap_style(480, 480) == HEATMAP_LEVELS[-1][1]
+
+
+def test_heatmap_colors_days(calendar_instance):
+    calendar_instance.setCurrentPage(2025, 10)
+    day = date(2025, 10, 14)
+    totals = FakeTotals({day.toordinal(): 300})
+
+    calendar_instance.set_heatmap(totals, 480)
+    expected = heatmap_style(300, 480)[0]
+    assert calendar_instance.dateTextFormat(QDate(day)).background().color().name().upper() == expected.upper()
+
+    # Cached until the totals change
+    calls = totals.calls
+    calendar_instance.refresh_heatmap()
+    assert totals.calls == calls
+    totals.daily = {}
+    totals.totals_version += 1
+    calendar_instance.refresh_heatmap()
+    assert calendar_instance.dateTextFormat(QDate(day)).background().color().name() != expected
+
+
+def test_page_format_only_sets_changed_dates(calendar_instance):
+    calendar_instance.setCurrentPage(2025, 10)
+    with patch.object(CustomCalendarWidget, 'setDateTextFormat') as set_format:
+        calendar_instance.apply_page_format(2025, 10)
+    assert set_format.call_count == 0
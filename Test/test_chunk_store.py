@@ -0,0 +1,88 @@
+import pytest
+from datetime import date
+
+from src.calculations import get_total_minutes_for_range, calculate_billed_time
+from src.chunk_store import ChunkStore, DayView
+from src.models import WorkChunk
+
+
+@pytest.fixture
+def store():
+    return ChunkStore([
+        WorkChunk(1, date(2025, 9, 30), 60, "Client A"),
+        WorkChunk(2, date(2025, 9, 30), 30, "Client B"),
+        WorkChunk(3, date(2025, 10, 1), 45, "Client A"),
+    ])
+
+
+def test_views(store):
+    assert len(store) == 3
+    assert [(c.chunk_id, c.minutes, c.description) for c in store] == [
+        (1, 60, "Client A"), (2, 30, "Client B"), (3, 45, "Client A")
+    ]
+    assert store[-1].chunk_date == date(2025, 10, 1)
+    assert store.get(2).description == "Client B"
+    assert store.get(4) is None
+    # Repeated descriptions share one string table entry
+    assert store.strings == ["Client A", "Client B"]
+
+
+def test_remove(store):
+    removed = store.remove(1)
+
+    assert removed.minutes == 60
+    assert store.remove(1) is None
+    assert [c.chunk_id for c in store] == [2, 3]
+    assert store[0].chunk_id == 2
+    assert [c.chunk_id for c in store.chunks_for_day(date(2025, 9, 30))] == [2]
+
+
+def test_readded_id(store):
+    store.remove(3)
+    store.append(WorkChunk(3, date(2025, 10, 2), 15, "Again"))
+
+    assert store.get(3).minutes == 15
+    assert store.remove(3).minutes == 15
+    assert store.get(3) is None
+
+
+def test_ids_for_range(store):
+    store.append(WorkChunk(4, date(2025, 9, 29), 15, "Client C"))
+
+    assert store.ids_for_range(date(2025, 9, 29), date(2025, 10, 1)) == [4, 1, 2, 3]
+    assert store.ids_for_range(date(2025, 9, 30), date(2025, 9, 30)) == [1, 2]
+    assert store.ids_for_range(date(2025, 10, 2), date(2025, 10, 31)) == []
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_range_totals(store, monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr("src.chunk_store.np", None)
+    store.remove(2)
+
+    assert store.total_minutes_for_range(date(2025, 9, 1), date(2025, 9, 30)) == 60
+    assert get_total_minutes_for_range(store, date(2025, 9, 1), date(2025, 10, 31)) == 105
+    assert calculate_billed_time(date(2025, 10, 1), "month", store) == 45
+
+
+def test_day_view(store):
+    days = DayView(store)
+
+    assert date(2025, 9, 30) in days
+    assert date(2025, 9, 29) not in days
+    assert len(days) == 2
+    assert [c.minutes for c in days[date(2025, 9, 30)].chunks] == [60, 30]
+    with pytest.raises(KeyError):
+        days[date(2025, 9, 29)]
+
+
+def test_compacts_dead_rows(monkeypatch):
+    monkeypatch.setattr("src.chunk_store.COMPACT_MIN_DEAD_ROWS", 2)
+    store = ChunkStore(WorkChunk(i, date(2025, 9, 30), i, "") for i in range(1, 5))
+
+    for chunk_id in (1, 2, 3):
+        store.remove(chunk_id)
+
+    assert len(store.ids) == 1
+    assert [c.chunk_id for c in store] == [4]
+    assert store.total_minutes_for_day(date(2025, 9, 30)) == 4
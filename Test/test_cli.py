@@ -0,0 +1,85 @@
+import json
+import subprocess
+import sys
+import pytest
+from datetime import date
+
+from src import cli
+from src.storage import load_chunks_from_csv, save_chunks_to_csv
+from src.models import WorkChunk
+
+TEST_FILENAME = "test_work_chunks.csv"
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    save_chunks_to_csv([
+        WorkChunk(0, date(2025, 9, 30), 60, "Client A"),
+        WorkChunk(0, date(2025, 10, 1), 30, "Client B"),
+        WorkChunk(0, date(2025, 10, 2), 45, "Internal"),
+    ], filename=filename)
+    return filename
+
+
+def run(data_file, *args):
+    return cli.main(["--storage", "csv", "--file", data_file, *args])
+
+
+def test_import_json_and_csv(tmp_path, data_file):
+    entries = tmp_path / "entries.json"
+    entries.write_text(json.dumps([{"date": "2025-10-03", "minutes": 15, "description": "New"},
+                                   {"Date": "2025-10-04", "Minutes": "20"}]))
+    rows = tmp_path / "entries.csv"
+    rows.write_text("Date,Minutes,Description\n2025-10-05,25,From CSV\n")
+
+    assert run(data_file, "import", str(entries)) == 0
+    assert run(data_file, "import", str(rows)) == 0
+
+    chunks = load_chunks_from_csv(data_file)
+    assert [(c.chunk_id, c.minutes, c.description) for c in chunks[3:]] == \
+           [(4, 15, "New"), (5, 20, ""), (6, 25, "From CSV")]
+
+
+def test_import_rejects_bad_entries(tmp_path, data_file, capsys):
+    entries = tmp_path / "entries.jsonl"
+    entries.write_text('{"date": "2025-10-03", "minutes": 15}\n{"date": "2025-13-01", "minutes": 15}\n')
+
+    assert run(data_file, "import", str(entries)) == 1
+    assert "line 2" in capsys.readouterr().err
+    assert len(load_chunks_from_csv(data_file)) == 3  # Nothing imported
+
+
+def test_report(data_file, capsys):
+    assert run(data_file, "report", "--from", "2025-09-29", "--to", "2025-10-05",
+               "--period", "week", "--json") == 0
+    report = json.loads(capsys.readouterr().out)
+    assert [(r["start"], r["end"], r["billed"], r["goal"]) for r in report["rows"]] == \
+           [("2025-09-29", "2025-10-05", 135, 5 * 480)]
+
+    assert run(data_file, "report", "--from", "2025-09-30", "--to", "2025-10-31") == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].split()[:2] == ["2025-09-30", "1:00"]
+    assert lines[-1].split()[:2] == ["Total", "2:15"]
+
+
+def test_export_round_trip(tmp_path, data_file, capsys):
+    assert run(data_file, "export", "--format", "jsonl", "--from", "2025-10-01") == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"id": 2, "date": "2025-10-01", "minutes": 30, "description": "Client B"},
+        {"id": 3, "date": "2025-10-02", "minutes": 45, "description": "Internal"},
+    ]
+
+    exported = str(tmp_path / "export.csv")
+    assert run(data_file, "export", "-o", exported) == 0
+    copy = str(tmp_path / "copy.csv")
+    assert run(copy, "import", exported) == 0
+    assert [(c.chunk_date, c.minutes, c.description) for c in load_chunks_from_csv(copy)] == \
+           [(c.chunk_date, c.minutes, c.description) for c in load_chunks_from_csv(data_file)]
+
+
+def test_cli_does_not_import_qt():
+    result = subprocess.run([sys.executable, "-c", "import sys, src.cli; print('PyQt5' in sys.modules)"],
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
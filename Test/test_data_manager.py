@@ -0,0 +1,351 @@
+import threading
+import pytest
+from datetime import date
+
+from src.calculations import calculate_billed_time
+from src.data_manager import DataManager
+from src.models import WorkChunk
+from src.storage import CSVStorage, get_storage, load_chunks_from_csv, save_chunks_to_csv
+
+TEST_FILENAME = "test_work_chunks.csv"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DataManager(filename=str(tmp_path / TEST_FILENAME))
+
+
+def test_add_chunks_updates_cache(manager):
+    manager.add_chunks(date(2025, 9, 30), [30, 45], "Test")
+    manager.add_chunks(date(2025, 10, 1), [60], "Other")
+
+    assert [c.minutes for c in manager.chunks] == [30, 45, 60]
+    assert len(manager.days_dict[date(2025, 9, 30)].chunks) == 2
+    assert manager.get_max_id() == 3
+
+    # Cache matches what a fresh load from disk would produce
+    loaded = load_chunks_from_csv(manager.filename)
+    assert [(c.chunk_id, c.minutes) for c in manager.chunks] == \
+           [(c.chunk_id, c.minutes) for c in loaded]
+
+
+def test_delete_chunk(manager):
+    manager.add_chunks(date(2025, 9, 30), [30, 45], "Test")
+
+    manager.delete_chunk(manager.chunks[0].chunk_id)
+
+    assert [c.minutes for c in manager.chunks] == [45]
+    assert [c.minutes for c in manager.days_dict[date(2025, 9, 30)].chunks] == [45]
+
+
+def test_mutations_do_not_reload(manager, monkeypatch):
+    def fail_reload(*args, **kwargs):
+        raise AssertionError("CSV should not be reparsed after a write")
+    # Every way DataManager reads the whole CSV back
+    for name in ("load_store", "load_chunks", "iter_chunks"):
+        monkeypatch.setattr(CSVStorage, name, fail_reload)
+    monkeypatch.setattr("src.storage.load_chunk_store_from_csv", fail_reload)
+    monkeypatch.setattr("src.storage.load_chunks_from_csv", fail_reload)
+
+    new_chunks = manager.add_chunks(date(2025, 9, 30), [30], "Test")
+    assert manager.get_chunk(new_chunks[0].chunk_id).minutes == 30
+
+    assert manager.delete_chunk(new_chunks[0].chunk_id)
+    assert len(manager.chunks) == 0
+    assert date(2025, 9, 30) not in manager.days_dict
+
+
+def test_delete_unknown_chunk(manager):
+    assert not manager.delete_chunk(42)
+
+
+def test_delete_keeps_other_ids(manager):
+    manager.add_chunks(date(2025, 9, 30), [10, 20, 30], "Test")
+
+    manager.delete_chunk(1)
+    assert [c.chunk_id for c in manager.chunks] == [2, 3]
+
+    # Same IDs after a reload and after compaction
+    assert [c.chunk_id for c in DataManager(manager.filename).chunks] == [2, 3]
+    manager.compact()
+    assert manager.storage.tombstone_count == 0
+    assert [c.chunk_id for c in DataManager(manager.filename).chunks] == [2, 3]
+
+
+def test_total_minutes_for_range(manager):
+    manager.add_chunks(date(2025, 9, 30), [30], "Test")
+    manager.add_chunks(date(2025, 10, 1), [45], "Test")
+
+    assert manager.total_minutes_for_range(date(2025, 9, 1), date(2025, 9, 30)) == 30
+    assert calculate_billed_time(date(2025, 10, 1), "week", manager) == 75
+
+
+def test_totals_follow_deletes(manager):
+    new_chunks = manager.add_chunks(date(2025, 9, 30), [30, 15], "Test")
+    manager.delete_chunk(new_chunks[0].chunk_id)
+
+    assert manager.total_minutes_for_day(date(2025, 9, 30)) == 15
+    assert calculate_billed_time(date(2025, 9, 30), "month", manager) == 15
+
+
+@pytest.fixture
+def history_file(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    chunks = [WorkChunk(0, date(2024, 3, 4), 10, "Old"),
+              WorkChunk(0, date(2025, 9, 30), 20, "Last month"),
+              WorkChunk(0, date(2025, 10, 15), 30, "This month")]
+    save_chunks_to_csv(chunks, filename=filename, append=False)
+    return filename
+
+
+def test_lazy_load_current_month_first(history_file, monkeypatch):
+    # Keep the background load from running so only on-demand loading is seen
+    monkeypatch.setattr(DataManager, "_load_history", lambda self: None)
+    manager = DataManager(history_file, lazy=False)
+    manager.start_lazy_load(today=date(2025, 10, 16))
+
+    assert not manager.history_loaded
+    assert [c.description for c in manager.chunks] == ["This month"]
+
+    # Other months are read when they're asked for
+    assert manager.total_minutes_for_range(date(2025, 9, 1), date(2025, 9, 30)) == 20
+    assert date(2024, 3, 4) not in manager.days_dict
+    manager.ensure_range_loaded(date(2024, 3, 1), date(2024, 3, 31))
+    assert date(2024, 3, 4) in manager.days_dict
+
+
+def test_lazy_load_history(history_file):
+    manager = DataManager(history_file, lazy=True)
+    manager.add_chunks(date(2025, 10, 16), [5], "New")
+
+    # Writes wait for the full history
+    assert manager.history_loaded
+    assert [c.chunk_id for c in manager.chunks] == [1, 2, 3, 4]
+    assert manager.total_minutes_for_range(date(2024, 1, 1), date(2025, 12, 31)) == 65
+
+
+def test_history_loaded_callback(history_file):
+    loaded = threading.Event()
+    manager = DataManager(history_file, lazy=False)
+    manager.on_history_loaded = loaded.set
+    manager.start_lazy_load(today=date(2025, 10, 16))
+
+    assert loaded.wait(5)
+    assert manager.history_loaded
+
+
+def test_rollups_not_saved_over_other_writes(history_file, monkeypatch):
+    manager = DataManager(history_file)
+    manager.delete_chunk(1)
+    # Another process appends before the rollups are saved
+    save_chunks_to_csv([WorkChunk(0, date(2024, 3, 5), 7, "Added elsewhere")],
+                       filename=history_file, append=True)
+    manager.close()
+
+    # A full load would save fresh rollups, so only the lazy start reads the saved ones
+    monkeypatch.setattr(DataManager, "_load_history", lambda self: None)
+    reopened = DataManager(history_file, lazy=True)
+    assert calculate_billed_time(date(2024, 3, 4), "month", reopened) == 7
+
+
+def test_billed_minutes_periods(manager):
+    manager.add_chunks(date(2025, 9, 30), [15], "Tuesday")
+    manager.add_chunks(date(2025, 10, 2), [45], "Thursday")
+
+    assert calculate_billed_time(date(2025, 10, 2), "day", manager) == 45
+    assert calculate_billed_time(date(2025, 10, 2), "week", manager) == 60
+    assert calculate_billed_time(date(2025, 10, 2), "month", manager) == 45
+    assert calculate_billed_time(date(2025, 10, 2), "quarter", manager) == 45
+    assert calculate_billed_time(date(2025, 10, 2), "year", manager) == 60
+
+
+def test_rollups_saved_for_lazy_load(history_file, monkeypatch):
+    DataManager(history_file).close()
+
+    monkeypatch.setattr(DataManager, "_load_history", lambda self: None)
+    manager = DataManager(history_file, lazy=False)
+    manager.start_lazy_load(today=date(2025, 10, 16))
+
+    # Totals for unloaded months come from the saved rollups
+    assert date(2024, 3, 4) not in manager.days_dict
+    assert calculate_billed_time(date(2024, 3, 4), "year", manager) == 10
+    assert date(2024, 3, 4) not in manager.days_dict
+
+
+def test_stale_rollups_ignored(history_file, monkeypatch):
+    DataManager(history_file).close()
+    save_chunks_to_csv([WorkChunk(0, date(2024, 3, 5), 7, "Added elsewhere")],
+                       filename=history_file, append=True)
+
+    monkeypatch.setattr(DataManager, "_load_history", lambda self: None)
+    manager = DataManager(history_file, lazy=False)
+    manager.start_lazy_load(today=date(2025, 10, 16))
+
+    assert calculate_billed_time(date(2024, 3, 4), "month", manager) == 17
+
+
+def test_background_writes(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    save_chunks_to_csv([WorkChunk(0, date(2025, 9, 30), 20, "Deleted later")], filename=filename)
+    manager = DataManager(filename)
+    manager.delete_chunk(1)
+    manager.close()
+
+    manager = DataManager(filename, background_writes=True)
+    new_chunks = manager.add_chunks(date(2025, 10, 1), [30, 15], "Background")
+
+    # Shown straight away, with the IDs storage goes on to give them
+    assert [c.chunk_id for c in new_chunks] == [2, 3]
+    assert manager.total_minutes_for_day(date(2025, 10, 1)) == 45
+    manager.delete_chunk(2)
+    manager.close()
+
+    assert [(c.chunk_id, c.minutes) for c in load_chunks_from_csv(filename)] == [(3, 15)]
+
+
+def test_background_writes_after_another_writer(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    manager = DataManager(filename, background_writes=True)
+    renumbered = []
+    manager.on_renumbered = renumbered.append
+    append_chunks = manager.storage.append_chunks
+    deleted = threading.Event()
+
+    def append_after_another_process(chunks):
+        deleted.wait(5)  # So the delete is queued with the ID add_chunks handed out
+        save_chunks_to_csv([WorkChunk(0, date(2025, 10, 1), 100, "Elsewhere")], filename=filename)
+        append_chunks(chunks)
+    manager.storage.append_chunks = append_after_another_process
+
+    assert [c.chunk_id for c in manager.add_chunks(date(2025, 10, 1), [30, 15], "Mine")] == [1, 2]
+    manager.delete_chunk(1)
+    deleted.set()
+    manager.flush()
+
+    assert renumbered == [{1: 2, 2: 3}]
+    assert manager.get_chunk(3).minutes == 15
+    assert [(c.chunk_id, c.minutes) for c in load_chunks_from_csv(filename)] == [(1, 100), (3, 15)]
+    manager.apply_external_changes()
+    assert manager.total_minutes_for_day(date(2025, 10, 1)) == 115
+    manager.close()
+
+
+def test_search_tracks_writes(manager):
+    manager.add_chunks(date(2025, 9, 30), [30, 45], "Client A")
+    assert manager.search("client").minutes == 75
+
+    # Once built, the index is updated in place
+    new_chunks = manager.add_chunks(date(2025, 10, 1), [60], "Client B")
+    manager.delete_chunk(manager.chunks[0].chunk_id)
+
+    result = manager.search("client")
+    assert result.minutes == 105
+    assert result.chunk_ids() == [2, new_chunks[0].chunk_id]
+    assert manager.search("client", date(2025, 10, 1), date(2025, 10, 31)).minutes == 60
+
+
+def test_daily_minutes_for_range(manager):
+    version = manager.totals_version
+    manager.add_chunks(date(2025, 9, 30), [30, 45], "Test")
+    manager.add_chunks(date(2025, 10, 2), [60], "Test")
+
+    assert manager.totals_version > version
+    assert manager.daily_minutes_for_range(date(2025, 9, 1), date(2025, 10, 1)) == \
+           {date(2025, 9, 30).toordinal(): 75}
+
+
+def test_apply_external_changes(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    first = DataManager(filename=filename)
+    second = DataManager(filename=filename)
+
+    first.add_chunks(date(2025, 9, 30), [30, 45], "From first")
+    second.add_chunks(date(2025, 9, 30), [60], "From second")
+    first.delete_chunk(1)
+
+    assert second.apply_external_changes()
+    assert sorted(c.chunk_id for c in second.chunks) == [2, 3]
+    assert second.total_minutes_for_day(date(2025, 9, 30)) == 105
+    assert not second.apply_external_changes()
+
+    assert first.apply_external_changes()
+    assert sorted(c.chunk_id for c in first.chunks) == [2, 3]
+
+    # After a rewrite the data is reloaded instead
+    first.compact()
+    second.add_chunks(date(2025, 10, 1), [15], "After compact")
+    assert second.apply_external_changes()
+    assert first.apply_external_changes()
+    assert [c.chunk_id for c in first.chunks] == [2, 3, 4]
+
+
+@pytest.mark.parametrize("backend", ["csv", "sqlite", "partitioned"])
+def test_changes_applied_without_reload(tmp_path, backend):
+    path = str(tmp_path / {"csv": TEST_FILENAME, "sqlite": "test.db", "partitioned": "data"}[backend])
+    first = DataManager(storage=get_storage(backend, path))
+    second = DataManager(storage=get_storage(backend, path))
+
+    def fail():
+        raise AssertionError("full reload")
+    first.load_data = second.load_data = fail
+
+    # Neither this process's own writes nor another's need a reload
+    first.add_chunks(date(2025, 9, 30), [30, 45], "From first")
+    first.delete_chunk(1)
+    assert not first.apply_external_changes()
+    assert second.apply_external_changes()
+    assert [(c.chunk_id, c.minutes) for c in second.chunks] == [(2, 45)]
+
+    second.add_chunks(date(2025, 10, 1), [15], "From second")
+    second.delete_chunk(2)
+    assert first.apply_external_changes()
+    assert [(c.chunk_id, c.minutes) for c in first.chunks] == [(3, 15)]
+    assert not second.apply_external_changes()
+    first.storage.close()
+    second.storage.close()
+
+
+@pytest.mark.parametrize("journal", ["off", "always"])
+def test_own_deletes_stay_deleted(tmp_path, journal):
+    filename = str(tmp_path / TEST_FILENAME)
+    manager = DataManager(storage=get_storage("csv", filename, journal))
+    manager.add_chunks(date(2025, 10, 1), [10], "Kept")
+    manager.add_chunks(date(2025, 10, 1), [30], "Deleted")
+    if journal != "off":
+        manager.storage.checkpoint()  # The row reaches the CSV; the delete stays journaled
+    manager.delete_chunk(2)
+
+    manager.apply_external_changes()
+    assert [c.chunk_id for c in manager.chunks] == [1]
+    assert manager.total_minutes_for_range(date(2025, 10, 1), date(2025, 10, 31)) == 10
+
+    manager.add_chunks(date(2025, 10, 2), [20], "Deleted before compacting")
+    manager.delete_chunk(3)
+    manager.compact()
+    assert [c.chunk_id for c in manager.chunks] == [1]
+    manager.close()
+    assert [c.chunk_id for c in load_chunks_from_csv(filename)] == [1]
+
+
+def test_compact_reload_waits_for_queued_writes(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    manager = DataManager(filename, background_writes=True)
+    manager.add_chunks(date(2025, 10, 1), [10], "Written")
+    manager.flush()
+
+    compact = manager.storage.compact
+
+    def compact_while_writing():
+        # A write queued while compact holds the locks
+        manager.writer.append([WorkChunk(2, date(2025, 10, 2), 20, "Queued")])
+        compact()
+
+    manager.storage.compact = compact_while_writing
+    manager.storage.read_changes = lambda cursor: None  # Forces a reload
+    thread = threading.Thread(target=manager.compact, daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive()
+    del manager.storage.read_changes
+    assert [c.chunk_id for c in manager.chunks] == [1, 2]
+    manager.close()
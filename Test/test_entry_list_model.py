@@ -0,0 +1,69 @@
+import pytest
+from datetime import date
+
+from PyQt5.QtCore import Qt
+from src.data_manager import DataManager
+from src.GUI import entry_list_model
+from src.GUI.entry_list_model import EntryListModel
+
+TEST_FILENAME = "test_entry_list_model.csv"
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DataManager(filename=str(tmp_path / TEST_FILENAME))
+    manager.add_chunks(date(2025, 9, 30), [60, 30], "Client A")
+    manager.add_chunks(date(2025, 10, 1), [45], "Client B")
+    return manager
+
+
+def test_show_day(manager):
+    model = EntryListModel(manager)
+    model.show_day(date(2025, 9, 30))
+
+    assert model.rowCount() == 2
+    assert model.data(model.index(0)) == "60 min - Client A"
+    assert model.data(model.index(1), Qt.UserRole).minutes == 30
+
+
+def test_rows_fetched_in_batches(manager, monkeypatch):
+    monkeypatch.setattr(entry_list_model, "FETCH_BATCH_SIZE", 2)
+    model = EntryListModel(manager)
+    model.show_range(date(2025, 9, 1), date(2025, 10, 31))
+
+    assert model.rowCount() == 2
+    assert model.total_count() == 3
+    assert model.canFetchMore()
+    model.fetchMore()
+    assert model.rowCount() == 3
+    assert not model.canFetchMore()
+
+
+def test_incremental_changes(manager):
+    model = EntryListModel(manager)
+    model.show_range(date(2025, 9, 1), date(2025, 9, 30))
+    inserted, removed = [], []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append(first))
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append(first))
+
+    new_chunks = manager.add_chunks(date(2025, 9, 15), [10], "Client C")
+    model.add_chunks(new_chunks)
+    model.add_chunks(manager.add_chunks(date(2025, 10, 2), [5], "Outside"))
+    assert inserted == [0]
+    assert model.rowCount() == 3
+
+    manager.delete_chunk(new_chunks[0].chunk_id)
+    model.remove_chunk(new_chunks[0].chunk_id)
+    assert removed == [0]
+    assert [model.chunk_at(row).minutes for row in range(model.rowCount())] == [60, 30]
+
+
+def test_missing_chunk_shows_nothing(manager):
+    model = EntryListModel(manager)
+    model.show_day(date(2025, 9, 30))
+    # Deleted without the model being told, as when another write gets in first
+    manager.delete_chunk(1)
+
+    assert model.data(model.index(0)) is None
+    assert model.data(model.index(0), Qt.UserRole) is None
+    assert model.data(model.index(1)) == "30 min - Client A"
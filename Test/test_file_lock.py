@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import pytest
+from datetime import date
+
+from src.file_lock import atomic_write, file_lock
+from src.models import WorkChunk
+from src.storage import load_chunks_from_csv, save_chunks_to_csv
+
+TEST_FILENAME = "test_work_chunks.csv"
+
+
+def append_many(filename, count):
+    for i in range(count):
+        save_chunks_to_csv([WorkChunk(0, date(2025, 9, 30), 15, f"chunk {i}")], filename=filename)
+
+
+def test_concurrent_appends_get_unique_ids(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    save_chunks_to_csv([], filename=filename, append=False)
+
+    processes = [multiprocessing.Process(target=append_many, args=(filename, 50)) for _ in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert [c.chunk_id for c in load_chunks_from_csv(filename)] == list(range(1, 151))
+
+
+def test_lock_is_reentrant(tmp_path):
+    filename = str(tmp_path / TEST_FILENAME)
+    with file_lock(filename, shared=True):
+        with file_lock(filename):
+            with file_lock(filename, shared=True):
+                pass
+    assert os.path.exists(filename + ".lock")
+
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / "data.txt"
+    path.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path)) as f:
+            f.write("partial")
+            raise RuntimeError("interrupted")
+
+    assert path.read_text() == "old"
+    assert not os.path.exists(str(path) + ".tmp")
+
+    with atomic_write(str(path)) as f:
+        f.write("new")
+    assert path.read_text() == "new"
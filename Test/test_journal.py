@@ -0,0 +1,112 @@
+import pytest
+from datetime import date
+
+from src import journal
+from src.journal import Journal, JournaledStorage
+from src.models import WorkChunk
+from src.storage import CSVStorage, get_storage, load_chunks_from_csv
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    return str(tmp_path / "test_journal.csv")
+
+
+def test_writes_journaled_until_checkpoint(csv_file):
+    storage = JournaledStorage(CSVStorage(csv_file))
+    chunks = [WorkChunk(0, date(2025, 10, 1), m, "Journaled") for m in (30, 15)]
+    storage.append_chunks(chunks)
+    storage.delete_chunk(1, date(2025, 10, 1))
+
+    assert [c.chunk_id for c in chunks] == [1, 2]
+    assert storage.last_id() == 2
+    assert load_chunks_from_csv(csv_file) == []
+    assert len(storage.journal.read()) == 3
+
+    # Reads checkpoint first
+    assert [(c.chunk_id, c.minutes) for c in storage.load_chunks()] == [(2, 15)]
+    assert storage.journal.read() == []
+
+
+def test_checkpoint_every_n_records(csv_file, monkeypatch):
+    monkeypatch.setattr(journal, "CHECKPOINT_RECORDS", 3)
+    storage = JournaledStorage(CSVStorage(csv_file), fsync="never")
+    for minutes in (10, 20, 30):
+        storage.append_chunks([WorkChunk(0, date(2025, 10, 1), minutes)])
+
+    assert len(load_chunks_from_csv(csv_file)) == 3
+
+
+def test_replay_after_crash(csv_file):
+    storage = JournaledStorage(CSVStorage(csv_file))
+    storage.append_chunks([WorkChunk(0, date(2025, 10, 1), 30, "Kept")])
+    storage.journal.close()  # Simulate a crash: no checkpoint
+    with open(storage.journal.filename, mode='a', encoding='utf-8') as f:
+        f.write('{"op": "append", "id": 2, "da')  # Torn final write
+
+    reopened = JournaledStorage(CSVStorage(csv_file))
+    assert [(c.chunk_id, c.description) for c in load_chunks_from_csv(csv_file)] == [(1, "Kept")]
+    assert reopened.last_id() == 1
+
+    # Appends that reached the backend before the crash aren't written twice
+    with open(storage.journal.filename, mode='w', encoding='utf-8') as f:
+        f.write('{"op": "append", "id": 1, "date": "2025-10-01", "minutes": 30, "description": "Kept"}\n')
+    JournaledStorage(CSVStorage(csv_file))
+    assert len(load_chunks_from_csv(csv_file)) == 1
+
+
+def test_checkpoint_after_another_writer(csv_file):
+    first = JournaledStorage(CSVStorage(csv_file))
+    second = JournaledStorage(CSVStorage(csv_file))
+    first.append_chunks([WorkChunk(0, date(2025, 10, 1), 30, "First")])
+    second.append_chunks([WorkChunk(0, date(2025, 10, 1), 15, "Second")])
+    second.delete_chunk(1, date(2025, 10, 1))  # Its own chunk, under the ID it was handed
+    cursor = second.change_cursor()
+
+    # Both journaled ID 1; the second writer's chunk and delete move to ID 2
+    assert first.checkpoint() == {}
+    assert second.checkpoint() == {1: 2}
+    assert [(c.chunk_id, c.description) for c in CSVStorage(csv_file).load_chunks()] == [(1, "First")]
+    assert second.read_changes(cursor) is None  # Callers must reload
+    assert second.last_id() == 2
+
+    # IDs handed out after that follow whatever reached the backend
+    first.append_chunks([WorkChunk(0, date(2025, 10, 2), 5, "Later")])
+    assert first.last_id() == 3
+
+
+def test_failed_checkpoint_not_appended_twice(csv_file, monkeypatch):
+    storage = JournaledStorage(CSVStorage(csv_file))
+    storage.append_chunks([WorkChunk(0, date(2025, 10, 1), m) for m in (30, 15)])
+    storage.delete_chunk(1, date(2025, 10, 1))
+
+    def fail_delete(chunk_id, chunk_date=None):
+        raise OSError("disk full")
+
+    # The appends reach the backend, then the delete fails
+    monkeypatch.setattr(storage.backend, "delete_chunk", fail_delete)
+    with pytest.raises(OSError):
+        storage.checkpoint()
+    monkeypatch.undo()
+    storage.checkpoint()
+
+    assert [c.chunk_id for c in load_chunks_from_csv(csv_file)] == [2]
+    assert storage.journal.read() == []
+
+
+def test_group_commit_syncs_once(tmp_path, monkeypatch):
+    syncs = []
+    monkeypatch.setattr(journal.os, "fsync", syncs.append)
+    log = Journal(str(tmp_path / "test.journal"), fsync="always")
+    log.commit([{"op": "delete", "id": i, "date": None} for i in range(50)])
+
+    assert len(syncs) == 1
+    assert len(log.read()) == 50
+    with pytest.raises(ValueError):
+        Journal(str(tmp_path / "test.journal"), fsync="sometimes")
+
+
+def test_get_storage_journal(csv_file):
+    storage = get_storage("csv", csv_file, journal="interval")
+    assert isinstance(storage, JournaledStorage)
+    assert isinstance(get_storage("csv", csv_file, journal="off"), CSVStorage)
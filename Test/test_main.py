@@ -0,0 +1,22 @@
+import subprocess
+import sys
+
+
+def imported_after(statement):
+    """Return the modules loaded by running statement in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-c", f"import sys; {statement}; print(' '.join(sys.modules))"],
+                            capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_main_defers_gui_imports():
+    modules = imported_after("import src.main")
+    assert "PyQt5" not in modules
+    assert "src.data_manager" not in modules
+
+
+def test_data_manager_defers_optional_modules():
+    modules = imported_after("import src.data_manager")
+    assert "numpy" not in modules
+    assert "concurrent.futures" not in modules  # Only for background writes
+    assert "src.search_index" not in modules    # Only once something is searched
@@ -0,0 +1,98 @@
+import random
+from datetime import date, timedelta
+
+from src import mmap_reader
+from src.calculations import calculate_billed_time
+from src.mmap_reader import MappedCSVReader
+from src.models import WorkChunk
+from src.storage import append_tombstones, compact_csv, load_chunks_from_csv_in_range, save_chunks_to_csv
+
+
+def fields(chunks):
+    return [(c.chunk_id, c.chunk_date, c.minutes, c.description) for c in chunks]
+
+
+def make_ledger(filename, count=600, seed=0):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    chunks = [WorkChunk(0, start + timedelta(days=i // 3), rng.randrange(5, 120), f"Task {i}")
+              for i in range(count)]
+    # A few entries added later for earlier dates, one with a quoted description
+    chunks.insert(400, WorkChunk(0, date(2024, 1, 5), 45, 'Late, "quoted" entry'))
+    chunks.insert(500, WorkChunk(0, date(2024, 2, 29), 15, "Late entry"))
+    save_chunks_to_csv(chunks, filename=filename, append=False)
+
+
+def test_ranges_match_full_read(tmp_path):
+    filename = str(tmp_path / "ledger.csv")
+    make_ledger(filename)
+    append_tombstones([3, 501], filename)  # 501 is "Late entry"
+    reader = MappedCSVReader(filename)
+
+    rng = random.Random(1)
+    for _ in range(100):
+        a = date(2023, 12, 20) + timedelta(days=rng.randrange(230))
+        b = a + timedelta(days=rng.randrange(40))
+        assert fields(reader.load_chunks_in_range(a, b)) == \
+            fields(load_chunks_from_csv_in_range(a, b, filename))
+
+    assert 'Late, "quoted" entry' in [c.description for c in
+                                      reader.load_chunks_in_range(date(2024, 1, 5), date(2024, 1, 5))]
+    assert reader.load_chunks_in_range(date(2024, 2, 29), date(2024, 2, 29))[-1].description != "Late entry"
+    assert len(reader.index["outliers"]) == 2
+
+
+def test_index_follows_file_changes(tmp_path):
+    filename = str(tmp_path / "ledger.csv")
+    make_ledger(filename)
+    MappedCSVReader(filename).load_chunks_in_range(date(2024, 1, 1), date(2024, 1, 31))
+
+    # A new reader picks up the saved index and indexes appended rows
+    save_chunks_to_csv([WorkChunk(0, date(2024, 1, 2), 10, "Appended")], filename=filename)
+    reader = MappedCSVReader(filename)
+    assert reader.index is not None
+    assert "Appended" in [c.description for c in
+                          reader.load_chunks_in_range(date(2024, 1, 2), date(2024, 1, 2))]
+
+    # A rewrite is noticed and the index rebuilt
+    append_tombstones([1], filename)
+    compact_csv(filename)
+    a, b = date(2024, 1, 1), date(2024, 3, 31)
+    assert fields(reader.load_chunks_in_range(a, b)) == fields(load_chunks_from_csv_in_range(a, b, filename))
+
+
+def test_unordered_file_read_in_full(tmp_path, monkeypatch):
+    monkeypatch.setattr(mmap_reader, "MAX_OUTLIER_RATIO", 0.01)
+    filename = str(tmp_path / "ledger.csv")
+    rng = random.Random(2)
+    save_chunks_to_csv([WorkChunk(0, date(2024, 1, 1) + timedelta(days=rng.randrange(100)), 10, "")
+                        for _ in range(300)], filename=filename, append=False)
+    reader = MappedCSVReader(filename)
+    a, b = date(2024, 2, 1), date(2024, 2, 15)
+
+    assert fields(reader.load_chunks_in_range(a, b)) == fields(load_chunks_from_csv_in_range(a, b, filename))
+    assert reader.index["outliers"] is None
+    assert calculate_billed_time(date(2024, 2, 7), "month", reader) == \
+        10 * len(load_chunks_from_csv_in_range(date(2024, 2, 1), date(2024, 2, 29), filename))
+
+
+def test_multi_line_descriptions(tmp_path):
+    filename = str(tmp_path / "ledger.csv")
+    make_ledger(filename, count=300)
+    # Late entries whose descriptions span lines, one with a line that looks like a row
+    save_chunks_to_csv([WorkChunk(0, date(2024, 1, 10), 20, "Late\nsecond line"),
+                        WorkChunk(0, date(2024, 3, 1), 30, 'Pasted "notes"\n7,2024-01-12,99,not a row\nend')],
+                       filename=filename)
+    reader = MappedCSVReader(filename)
+
+    for a, b in [(date(2024, 1, 10), date(2024, 1, 10)), (date(2024, 1, 12), date(2024, 1, 12)),
+                 (date(2024, 2, 25), date(2024, 3, 5)), (date(2024, 1, 1), date(2024, 12, 31))]:
+        assert fields(reader.load_chunks_in_range(a, b)) == \
+            fields(load_chunks_from_csv_in_range(a, b, filename))
+    assert len(reader.index["outliers"]) == 4
+    assert len(reader.index["quoted"]) == 1
+
+
+def test_missing_file(tmp_path):
+    reader = MappedCSVReader(str(tmp_path / "missing.csv"))
+    assert reader.load_chunks_in_range(date(2024, 1, 1), date(2024, 12, 31)) == []
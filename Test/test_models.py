@@ -11,4 +11,8 @@ def test_to_csv_row():
     assert result == expected
 
 def test_from_csv_row():
-    pass
\ No newline at end of file
+    chunk = WorkChunk.from_csv_row(["7", "2025-09-30", "45", "Test"])
+    assert chunk.chunk_id == 7
+    assert chunk.chunk_date == date(2025, 9, 30)
+    assert chunk.minutes == 45
+    assert chunk.description == "Test"
\ No newline at end of file
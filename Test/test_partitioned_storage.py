@@ -0,0 +1,108 @@
+import os
+import pytest
+from datetime import date
+
+from src.data_manager import DataManager
+from src.models import WorkChunk
+from src.partitioned_storage import (
+    PartitionedCSVStorage, migrate_csv_to_partitions, migrate_partitions_to_csv
+)
+from src.file_lock import LOCK_SUFFIX
+from src.storage import load_chunks_from_csv, save_chunks_to_csv
+
+
+def data_files(storage):
+    """Files in the partition directory, leaving out lock files (see file_lock.py)."""
+    return sorted(name for name in os.listdir(storage.directory) if not name.endswith(LOCK_SUFFIX))
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = PartitionedCSVStorage(str(tmp_path / "data"))
+    storage.append_chunks([
+        WorkChunk(0, date(2025, 9, 30), 10, "Test 1"),
+        WorkChunk(0, date(2025, 10, 1), 20, "Test 2"),
+        WorkChunk(0, date(2025, 10, 31), 30, "Test 3"),
+    ])
+    return storage
+
+
+def test_one_file_per_month(storage):
+    assert data_files(storage) == ["2025-09.csv", "2025-10.csv", "manifest.json"]
+    assert storage.manifest["partitions"]["2025-10"] == {"rows": 2, "minutes": 50}
+    assert [c.chunk_id for c in storage.load_chunks()] == [1, 2, 3]
+
+
+def test_range_queries(storage):
+    assert [c.minutes for c in storage.load_chunks_in_range(date(2025, 10, 1), date(2025, 10, 5))] == [20]
+    assert storage.total_minutes_for_range(date(2025, 10, 1), date(2025, 10, 31)) == 50
+    assert storage.total_minutes_for_range(date(2025, 9, 29), date(2025, 10, 5)) == 30
+
+
+def test_delete_rewrites_one_partition(storage):
+    storage.delete_chunk(1, date(2025, 9, 30))
+    storage.delete_chunk(3)
+
+    assert data_files(storage) == ["2025-10.csv", "manifest.json"]
+    assert storage.manifest["partitions"] == {"2025-10": {"rows": 1, "minutes": 20}}
+
+    # The manifest survives a reopen and IDs aren't reused
+    reopened = PartitionedCSVStorage(storage.directory)
+    new_chunk = WorkChunk(0, date(2025, 10, 2), 5, "")
+    reopened.append_chunks([new_chunk])
+    assert new_chunk.chunk_id == 4
+
+
+def test_manifest_rebuilt_when_missing(storage):
+    os.remove(os.path.join(storage.directory, "manifest.json"))
+
+    assert PartitionedCSVStorage(storage.directory).manifest == storage.manifest
+
+
+def test_migration_round_trip(tmp_path):
+    csv_file = str(tmp_path / "work_chunks.csv")
+    directory = str(tmp_path / "data")
+    save_chunks_to_csv([WorkChunk(0, date(2025, 9, 30), 10, "A"),
+                        WorkChunk(0, date(2025, 10, 1), 20, "B")], filename=csv_file, append=False)
+
+    assert migrate_csv_to_partitions(csv_file, directory) == 2
+    with pytest.raises(ValueError):
+        migrate_csv_to_partitions(csv_file, directory)
+
+    manager = DataManager(storage=PartitionedCSVStorage(directory))
+    assert manager.total_minutes_for_range(date(2025, 9, 1), date(2025, 10, 31)) == 30
+
+    merged_file = str(tmp_path / "merged.csv")
+    assert migrate_partitions_to_csv(directory, merged_file) == 2
+    assert [(c.chunk_id, c.description) for c in load_chunks_from_csv(merged_file)] == [(1, "A"), (2, "B")]
+
+
+def test_two_instances_share_the_manifest(storage):
+    # Another process with the same directory open; neither may overwrite
+    # the other's manifest or reuse its IDs
+    other = PartitionedCSVStorage(storage.directory)
+    mine = WorkChunk(0, date(2025, 10, 2), 5, "Mine")
+    theirs = WorkChunk(0, date(2025, 10, 3), 7, "Theirs")
+    storage.append_chunks([mine])
+    other.append_chunks([theirs])
+    assert (mine.chunk_id, theirs.chunk_id) == (4, 5)
+
+    storage.delete_chunk(2)
+    assert [c.chunk_id for c in other.load_chunks()] == [1, 3, 4, 5]
+    assert other.total_minutes_for_range(date(2025, 10, 1), date(2025, 10, 31)) == 42
+    assert other.last_id() == 5
+    assert PartitionedCSVStorage(storage.directory).manifest["partitions"]["2025-10"] == {"rows": 3, "minutes": 42}
+
+
+def test_read_changes(storage):
+    cursor = storage.change_cursor()
+    storage.append_chunks([WorkChunk(0, date(2025, 11, 1), 40, "New month")])
+    storage.delete_chunk(2)
+
+    chunks, deleted, cursor = storage.read_changes(cursor)
+    assert ([c.chunk_id for c in chunks], deleted) == ([4], [2])
+    assert storage.read_changes(cursor)[:2] == ([], [])
+
+    # After a rewrite the data has to be loaded again
+    storage.replace_chunks(storage.load_chunks())
+    assert storage.read_changes(cursor) is None
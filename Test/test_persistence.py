@@ -0,0 +1,87 @@
+import threading
+from datetime import date
+
+from src.models import WorkChunk
+from src.persistence import PersistenceWorker
+from src.storage import CSVStorage, StorageBackend
+
+
+class RecordingStorage(StorageBackend):
+    """Records calls; the first append blocks until released so later writes queue up."""
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.next_id = 0
+
+    def append_chunks(self, chunks):
+        self.started.set()
+        self.release.wait(5)
+        for chunk in chunks:
+            self.next_id += 1
+            chunk.chunk_id = self.next_id
+        self.calls.append(("append", [c.chunk_id for c in chunks]))
+
+    def delete_chunk(self, chunk_id, chunk_date=None):
+        self.calls.append(("delete", chunk_id))
+
+
+def test_queued_writes_are_batched():
+    storage = RecordingStorage()
+    worker = PersistenceWorker(storage)
+    worker.append([WorkChunk(1, date(2025, 10, 1), 30)])
+    storage.started.wait(5)
+    # These queue up behind the blocked first write
+    worker.append([WorkChunk(2, date(2025, 10, 1), 15)])
+    worker.append([WorkChunk(3, date(2025, 10, 2), 45)])
+    worker.delete(2)
+    worker.delete(2)
+    storage.release.set()
+    worker.close()
+
+    assert storage.calls == [("append", [1]), ("append", [2, 3]), ("delete", 2)]
+
+
+def test_errors_reported():
+    storage = RecordingStorage()
+    storage.release.set()
+
+    def append_chunks(chunks):
+        raise OSError("disk full")
+    storage.append_chunks = append_chunks
+    errors = []
+    worker = PersistenceWorker(storage, on_error=errors.append)
+    worker.append([WorkChunk(1, date(2025, 10, 1), 30)])
+    worker.flush()
+
+    assert errors == ["Could not save changes: disk full"]
+
+
+def test_renumbered_when_storage_assigns_other_ids():
+    storage = RecordingStorage()
+    storage.next_id = 6  # Another process appended first
+    renumbered = []
+    worker = PersistenceWorker(storage)
+    # The caller moves the queued writes itself, as DataManager does
+    worker.on_renumber = lambda ids: renumbered.append(worker.renumber_pending(ids))
+    worker.append([WorkChunk(5, date(2025, 10, 1), 30)])
+    storage.started.wait(5)
+    worker.append([WorkChunk(6, date(2025, 10, 1), 15)])
+    worker.delete(5)
+    worker.delete(6)
+    storage.release.set()
+    worker.close()
+
+    assert renumbered == [{5: 7, 6: 8}]
+    assert storage.calls == [("append", [7]), ("append", [8]), ("delete", 7), ("delete", 8)]
+
+
+def test_writes_reach_csv(tmp_path):
+    storage = CSVStorage(str(tmp_path / "chunks.csv"))
+    worker = PersistenceWorker(storage)
+    worker.append([WorkChunk(1, date(2025, 10, 1), 30, "A"), WorkChunk(2, date(2025, 10, 2), 15, "B")])
+    worker.delete(1, date(2025, 10, 1))
+    worker.close()
+
+    assert [(c.chunk_id, c.description) for c in storage.load_chunks()] == [(2, "B")]
+    assert storage.last_id() == 2
@@ -0,0 +1,28 @@
+from src.profiling import Profiler, percentile
+
+
+def test_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 51.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    with profiler.phase("refresh"):
+        pass
+    assert profiler.summary() == {}
+
+
+def test_enabled_profiler_records_phases():
+    profiler = Profiler(enabled=True)
+    for _ in range(3):
+        with profiler.phase("refresh"):
+            with profiler.phase("refresh.lookup"):
+                pass
+
+    summary = profiler.summary()
+    assert summary["refresh"]["count"] == 3
+    assert summary["refresh.lookup"]["count"] == 3
+    assert summary["refresh"]["p99_ms"] >= summary["refresh"]["p50_ms"]
@@ -0,0 +1,71 @@
+from datetime import date
+
+from src.chunk_store import ChunkStore
+from src.models import WorkChunk
+from src.search_index import DescriptionIndex, tokenize
+
+
+def make_chunks():
+    return [
+        WorkChunk(1, date(2025, 9, 1), 30, "Client A - onboarding"),
+        WorkChunk(2, date(2025, 9, 2), 45, "Client B"),
+        WorkChunk(3, date(2025, 9, 3), 60, "client a support"),
+        WorkChunk(4, date(2025, 10, 1), 15, "Client A - onboarding"),
+        WorkChunk(5, date(2025, 8, 30), 20, "Client A - onboarding"),  # Added out of date order
+    ]
+
+
+def test_tokenize():
+    assert tokenize("Client A - Onboarding, v2") == ["client", "a", "onboarding", "v2"]
+
+
+def test_search_all_words():
+    index = DescriptionIndex(make_chunks())
+
+    result = index.search("client a")
+    assert result.chunk_ids() == [5, 1, 3, 4]
+    assert result.count == 4
+    assert result.minutes == 125
+
+    assert index.search("onboarding client").chunk_ids() == [5, 1, 4]
+    assert index.search("missing").count == 0
+    assert index.search("  ").minutes == 0
+
+
+def test_search_date_range():
+    index = DescriptionIndex(make_chunks())
+
+    result = index.search("client", date(2025, 9, 1), date(2025, 9, 30))
+    assert result.chunk_ids() == [1, 2, 3]
+    assert result.minutes == 135
+    assert index.search("client", start_date=date(2025, 9, 3)).chunk_ids() == [3, 4]
+
+
+def test_last_word_matches_prefix():
+    index = DescriptionIndex(make_chunks())
+
+    assert index.search("supp").chunk_ids() == [3]
+    assert index.search("cli b").count == 0  # Only the last word is a prefix
+    assert index.search("supp", prefix=False).count == 0
+
+
+def test_add_and_remove():
+    chunks = make_chunks()
+    index = DescriptionIndex(chunks)
+
+    index.add(WorkChunk(6, date(2025, 9, 2), 10, "Travel"))
+    assert index.search("travel").minutes == 10
+    assert index.search("client", date(2025, 9, 1), date(2025, 9, 30)).minutes == 135
+
+    index.remove(chunks[0])
+    index.remove(WorkChunk(6, date(2025, 9, 2), 10, "Travel"))
+    assert index.search("onboarding").chunk_ids() == [5, 4]
+    assert index.search("trav").count == 0
+
+
+def test_build_from_store():
+    store = ChunkStore(make_chunks())
+    store.remove(2)
+
+    index = DescriptionIndex(store)
+    assert index.search("client").chunk_ids() == [5, 1, 3, 4]
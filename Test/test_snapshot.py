@@ -0,0 +1,100 @@
+import threading
+from datetime import date
+
+from src import data_manager, storage
+from src.chunk_store import ChunkStore
+from src.data_manager import DataManager
+from src.models import WorkChunk
+from src.snapshot import SNAPSHOT_SUFFIX, load_snapshot, save_snapshot
+from src.storage import CSVStorage, save_chunks_to_csv
+
+
+def fields(store):
+    return [(c.chunk_id, c.chunk_date, c.minutes, c.description) for c in store]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "test.snapshot")
+    store = ChunkStore([WorkChunk(1, date(2025, 9, 30), 60, "Client A"),
+                        WorkChunk(2, date(2025, 9, 30), 30, "Kommentar: Über"),
+                        WorkChunk(3, date(2025, 10, 1), 45, "Client A")])
+    store.remove(2)
+    save_snapshot(store, path, "sig-1")
+
+    loaded = load_snapshot(path, "sig-1")
+    assert fields(loaded) == fields(store)
+    assert [c.chunk_id for c in loaded.chunks_for_day(date(2025, 9, 30))] == [1]
+    assert load_snapshot(path, "sig-2") is None
+
+
+def test_unreadable_snapshot(tmp_path):
+    path = str(tmp_path / "test.snapshot")
+    assert load_snapshot(path, "sig") is None
+    save_snapshot(ChunkStore([WorkChunk(1, date(2025, 9, 30), 60)]), path, "sig")
+    with open(path, "r+b") as f:
+        f.truncate(40)
+    assert load_snapshot(path, "sig") is None
+
+
+def test_csv_storage_uses_snapshot(tmp_path, monkeypatch):
+    filename = str(tmp_path / "test_snapshot.csv")
+    save_chunks_to_csv([WorkChunk(0, date(2025, 10, 1), m, "Work") for m in (10, 20)], filename=filename)
+    expected = fields(CSVStorage(filename).load_store())
+
+    def fail(filename):
+        raise AssertionError("CSV parsed despite a valid snapshot")
+    monkeypatch.setattr(storage, "load_chunk_store_from_csv", fail)
+    assert fields(CSVStorage(filename).load_store()) == expected
+
+    # Once the CSV changes, the snapshot no longer matches
+    monkeypatch.undo()
+    save_chunks_to_csv([WorkChunk(0, date(2025, 10, 2), 5, "New")], filename=filename)
+    assert len(CSVStorage(filename).load_store()) == 3
+
+
+def test_snapshot_refreshed_after_background_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_manager, "SNAPSHOT_DELAY", 0)
+    filename = str(tmp_path / "test_snapshot.csv")
+    manager = DataManager(filename, background_writes=True)
+    manager.add_chunks(date(2025, 10, 1), [30, 15], "Background")
+    manager.delete_chunk(1)
+    manager._snapshot_timer.join()
+    manager.flush()
+
+    csv_storage = CSVStorage(filename)
+    snapshot = load_snapshot(filename + SNAPSHOT_SUFFIX, csv_storage.signature())
+    assert fields(snapshot) == fields(manager.chunks)
+    manager.close()
+
+
+def test_snapshot_not_saved_over_other_writes(tmp_path):
+    filename = str(tmp_path / "test_snapshot.csv")
+    manager = DataManager(filename)
+    manager.add_chunks(date(2025, 10, 1), [30], "Mine")
+    # Another process writes after this one last caught up
+    save_chunks_to_csv([WorkChunk(0, date(2025, 10, 2), 15, "Elsewhere")], filename=filename)
+    manager.close()
+
+    assert [c.description for c in CSVStorage(filename).load_store()] == ["Mine", "Elsewhere"]
+
+
+def test_snapshot_not_saved_over_append_during_parse(tmp_path, monkeypatch):
+    filename = str(tmp_path / "test_snapshot.csv")
+    save_chunks_to_csv([WorkChunk(0, date(2025, 10, 1), 30, "First")], filename=filename)
+    parse = storage.load_chunk_store_from_csv
+    writer = threading.Thread(target=save_chunks_to_csv, daemon=True,
+                              args=([WorkChunk(0, date(2025, 10, 2), 15, "Elsewhere")],),
+                              kwargs={"filename": filename})
+
+    def parse_then_append(filename):
+        store = parse(filename)
+        # Another process appends once the rows are parsed, before the snapshot is saved
+        writer.start()
+        writer.join(0.2)
+        return store
+
+    monkeypatch.setattr(storage, "load_chunk_store_from_csv", parse_then_append)
+    assert [c.description for c in CSVStorage(filename).load_store()] == ["First"]
+    writer.join(5)
+    monkeypatch.undo()
+    assert [c.description for c in CSVStorage(filename).load_store()] == ["First", "Elsewhere"]
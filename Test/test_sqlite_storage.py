@@ -0,0 +1,94 @@
+import pytest
+from datetime import date
+
+from src.data_manager import DataManager
+from src.models import WorkChunk
+from src.sqlite_storage import SQLiteStorage, migrate_csv_to_sqlite
+from src.storage import get_storage, save_chunks_to_csv
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "test_work_chunks.db"))
+    yield storage
+    storage.close()
+
+
+def test_append_and_load(storage):
+    chunks = [WorkChunk("0", date(2025, 9, 30), 60, "Test 1"),
+              WorkChunk("0", date(2025, 10, 1), 30, "Test 2")]
+    storage.append_chunks(chunks)
+
+    assert [c.chunk_id for c in chunks] == [1, 2]
+    loaded = storage.load_chunks()
+    assert [(c.chunk_id, c.chunk_date, c.minutes, c.description) for c in loaded] == [
+        (1, date(2025, 9, 30), 60, "Test 1"),
+        (2, date(2025, 10, 1), 30, "Test 2"),
+    ]
+
+
+def test_delete_keeps_ids(storage):
+    storage.append_chunks([WorkChunk("0", date(2025, 9, 30), m, "") for m in (10, 20)])
+    storage.delete_chunk(2)
+    assert storage.last_id() == 2
+    new_chunk = WorkChunk("0", date(2025, 9, 30), 30, "")
+    storage.append_chunks([new_chunk])
+
+    # A deleted ID is never handed out again
+    assert new_chunk.chunk_id == 3
+    assert [c.chunk_id for c in storage.load_chunks()] == [1, 3]
+
+
+def test_total_minutes_for_range(storage):
+    storage.append_chunks([
+        WorkChunk("0", date(2025, 9, 30), 10, ""),
+        WorkChunk("0", date(2025, 10, 1), 20, ""),
+        WorkChunk("0", date(2025, 10, 31), 40, ""),
+    ])
+
+    assert storage.total_minutes_for_range(date(2025, 10, 1), date(2025, 10, 31)) == 60
+    assert storage.total_minutes_for_range(date(2024, 1, 1), date(2024, 12, 31)) == 0
+
+
+def test_migrate_csv_to_sqlite(tmp_path):
+    csv_file = str(tmp_path / "test_work_chunks.csv")
+    db_file = str(tmp_path / "test_work_chunks.db")
+    save_chunks_to_csv([WorkChunk("0", date(2025, 9, 30), m, "Test") for m in (10, 20)],
+                       filename=csv_file, append=False)
+
+    assert migrate_csv_to_sqlite(csv_file, db_file) == 2
+    with pytest.raises(ValueError):
+        migrate_csv_to_sqlite(csv_file, db_file)
+
+    manager = DataManager(storage=get_storage("sqlite", db_file))
+    assert [(c.chunk_id, c.minutes) for c in manager.chunks] == [(1, 10), (2, 20)]
+    manager.storage.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_storage("xml")
+
+
+def test_load_chunks_in_range(storage):
+    storage.append_chunks([
+        WorkChunk(0, date(2025, 9, 30), 10, ""),
+        WorkChunk(0, date(2025, 10, 1), 20, ""),
+    ])
+
+    assert [c.minutes for c in storage.load_chunks_in_range(date(2025, 10, 1), date(2025, 10, 31))] == [20]
+
+
+def test_read_changes(storage):
+    storage.append_chunks([WorkChunk(0, date(2025, 10, 1), m, "") for m in (10, 20)])
+    cursor = storage.change_cursor()
+    storage.append_chunks([WorkChunk(0, date(2025, 10, 2), 30, "")])
+    storage.delete_chunk(1)
+
+    chunks, deleted, cursor = storage.read_changes(cursor)
+    assert ([c.chunk_id for c in chunks], deleted) == ([3], [1])
+    assert storage.read_changes(cursor)[:2] == ([], [])
+
+    # After a compaction the data has to be loaded again
+    storage.compact()
+    assert storage.read_changes(cursor) is None
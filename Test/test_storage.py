@@ -1,5 +1,10 @@
+import threading
 import pytest
-from src.storage import save_chunks_to_csv, load_chunks_from_csv
+from src.storage import (
+    CSVStorage, save_chunks_to_csv, load_chunks_from_csv, load_chunk_store_from_csv,
+    load_chunks_from_csv_in_range, load_days_off, read_last_id,
+    append_tombstones, load_tombstones, compact_csv
+)
 from src.models import WorkChunk
 from datetime import date
 
@@ -46,4 +51,146 @@ def test_load_from_csv(tmp_path):
 
     assert len(loaded_chunks) == 2
     assert loaded_chunks[0].description == "Test 1"
-    assert loaded_chunks[1].minutes == 30
\ No newline at end of file
+    assert loaded_chunks[1].minutes == 30
+
+def test_append_continues_ids(tmp_path):
+    test_file = tmp_path / TEST_FILENAME
+
+    save_chunks_to_csv([WorkChunk("1", date(2025, 9, 30), 60, "Test 1")], filename=str(test_file), append=False)
+    new_chunk = WorkChunk("0", date(2025, 10, 1), 15, "Test 2")
+    save_chunks_to_csv([new_chunk], filename=str(test_file), append=True)
+
+    assert new_chunk.chunk_id == 2
+    loaded_chunks = load_chunks_from_csv(str(test_file))
+    assert [c.chunk_id for c in loaded_chunks] == [1, 2]
+
+def test_read_last_id(tmp_path):
+    test_file = tmp_path / TEST_FILENAME
+
+    # No file and header-only file both have no rows
+    assert read_last_id(str(test_file)) == 0
+    save_chunks_to_csv([], filename=str(test_file), append=False)
+    assert read_last_id(str(test_file)) == 0
+
+    # Enough rows that the last one isn't in the first block read from the end
+    chunks = [WorkChunk("0", date(2025, 9, 30), 5, "x" * 50) for _ in range(500)]
+    save_chunks_to_csv(chunks, filename=str(test_file), append=True)
+    assert read_last_id(str(test_file)) == 500
+
+
+def test_tombstoned_chunks_not_loaded(tmp_path):
+    test_file = str(tmp_path / TEST_FILENAME)
+    chunks = [WorkChunk("0", date(2025, 9, 30), m, "Test") for m in (10, 20, 30)]
+    save_chunks_to_csv(chunks, filename=test_file, append=True)
+
+    append_tombstones([2], filename=test_file)
+
+    loaded_chunks = load_chunks_from_csv(test_file)
+    assert [c.chunk_id for c in loaded_chunks] == [1, 3]
+    # The deleted row's ID stays reserved
+    assert read_last_id(test_file) == 3
+
+def test_compact_keeps_ids(tmp_path):
+    test_file = str(tmp_path / TEST_FILENAME)
+    chunks = [WorkChunk("0", date(2025, 9, 30), m, "Test") for m in (10, 20, 30)]
+    save_chunks_to_csv(chunks, filename=test_file, append=True)
+    append_tombstones([1], filename=test_file)
+
+    assert compact_csv(test_file) == 1
+
+    assert load_tombstones(test_file) == set()
+    loaded_chunks = load_chunks_from_csv(test_file)
+    assert [(c.chunk_id, c.minutes) for c in loaded_chunks] == [(2, 20), (3, 30)]
+
+def test_compact_keeps_last_id(tmp_path):
+    test_file = str(tmp_path / TEST_FILENAME)
+    chunks = [WorkChunk("0", date(2025, 9, 30), m, "Test") for m in (10, 20, 30)]
+    save_chunks_to_csv(chunks, filename=test_file, append=True)
+    append_tombstones([2, 3], filename=test_file)
+
+    assert compact_csv(test_file) == 1
+
+    # The deleted final row stays, so its ID isn't handed out again
+    assert read_last_id(test_file) == 3
+    assert load_tombstones(test_file) == {"3"}
+    assert [c.chunk_id for c in load_chunks_from_csv(test_file)] == [1]
+    assert compact_csv(test_file) == 0
+
+    new_chunk = WorkChunk(0, date(2025, 10, 1), 5, "")
+    save_chunks_to_csv([new_chunk], filename=test_file, append=True)
+    assert new_chunk.chunk_id == 4
+
+def test_load_chunk_store_from_csv(tmp_path):
+    test_file = str(tmp_path / TEST_FILENAME)
+    chunks = [WorkChunk("0", date(2025, 9, 30), m, "Test") for m in (10, 20, 30)]
+    save_chunks_to_csv(chunks, filename=test_file, append=True)
+    append_tombstones([2], filename=test_file)
+
+    store = load_chunk_store_from_csv(test_file)
+
+    assert [(c.chunk_id, c.minutes) for c in store] == [(1, 10), (3, 30)]
+    assert store.total_minutes_for_day(date(2025, 9, 30)) == 40
+
+def test_load_chunks_from_csv_in_range(tmp_path):
+    test_file = str(tmp_path / TEST_FILENAME)
+    chunks = [WorkChunk(0, date(2025, 9, 30), 10, ""),
+              WorkChunk(0, date(2025, 10, 1), 20, ""),
+              WorkChunk(0, date(2025, 10, 31), 30, ""),
+              WorkChunk(0, date(2025, 11, 1), 40, "")]
+    save_chunks_to_csv(chunks, filename=test_file, append=True)
+
+    loaded = load_chunks_from_csv_in_range(date(2025, 10, 1), date(2025, 10, 31), test_file)
+    assert [c.minutes for c in loaded] == [20, 30]
+
+def test_iter_chunks_does_not_block_writers(tmp_path):
+    test_file = str(tmp_path / TEST_FILENAME)
+    save_chunks_to_csv([WorkChunk(0, date(2025, 9, 30), m, "Test") for m in (10, 20, 30)],
+                       filename=test_file)
+    append_tombstones([2], filename=test_file)
+    chunks = CSVStorage(test_file).iter_chunks()
+    assert next(chunks).chunk_id == 1
+
+    # A writer on another thread waits for the lock like another process would
+    writer = threading.Thread(target=lambda: (
+        save_chunks_to_csv([WorkChunk(0, date(2025, 10, 1), 40, "Later")], filename=test_file),
+        compact_csv(test_file)), daemon=True)
+    writer.start()
+    writer.join(5)
+    assert not writer.is_alive()
+
+    # The rest is read as the file was when iteration started
+    assert [c.chunk_id for c in chunks] == [3]
+    assert [c.chunk_id for c in load_chunks_from_csv(test_file)] == [1, 3, 4]
+
+def test_load_days_off(tmp_path):
+    days_off_file = tmp_path / "days_off.txt"
+    days_off_file.write_text("# Holidays\n2025-12-25,Christmas Day\n\n2026-01-01\n", encoding="utf-8")
+
+    assert load_days_off(str(days_off_file)) == [date(2025, 12, 25), date(2026, 1, 1)]
+    assert load_days_off(str(tmp_path / "missing.txt")) == []
+
+
+def test_read_csv_changes(tmp_path):
+    from src.storage import csv_change_cursor, read_csv_changes
+    test_file = str(tmp_path / TEST_FILENAME)
+    save_chunks_to_csv([WorkChunk(0, date(2025, 9, 30), 60, "Old")], filename=test_file)
+    cursor = csv_change_cursor(test_file)
+
+    save_chunks_to_csv([WorkChunk(0, date(2025, 10, 1), 30, "New")], filename=test_file)
+    append_tombstones([1], filename=test_file)
+    with open(test_file, "a", encoding="utf-8") as f:
+        f.write("3,2025-10-02,4")  # A row still being written
+
+    chunks, deleted, cursor = read_csv_changes(cursor, test_file)
+    assert [(c.chunk_id, c.minutes, c.description) for c in chunks] == [(2, 30, "New")]
+    assert deleted == [1]
+
+    with open(test_file, "a", encoding="utf-8") as f:
+        f.write("5,Done\n")
+    chunks, deleted, cursor = read_csv_changes(cursor, test_file)
+    assert [(c.chunk_id, c.minutes) for c in chunks] == [(3, 45)]
+    assert deleted == []
+
+    # A rewrite can't be followed incrementally
+    compact_csv(test_file)
+    assert read_csv_changes(cursor, test_file) is None
@@ -0,0 +1,52 @@
+# bench_analytics.py
+# Compares a whole-year report from analytics.py (NumPy and pure Python)
+# against the scalar path: one calculate_billed_time call per day and week.
+#
+#     python -m bench.bench_analytics [--rows 100000]
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from bench.synthetic import generate_chunks
+from src import analytics
+from src.analytics import year_report
+from src.calculations import calculate_billed_time
+from src.chunk_store import ChunkStore
+
+YEAR = 2025  # The synthetic data ends in October 2025
+
+
+def scalar_year(chunks, year):
+    """Daily and weekly totals for a year the way the GUI computes a single day's stats."""
+    day = date(year, 1, 1)
+    daily, weekly = [], []
+    while day.year == year:
+        daily.append(calculate_billed_time(day, "day", chunks))
+        if day.weekday() == 0:
+            weekly.append(calculate_billed_time(day, "week", chunks))
+        day += timedelta(days=1)
+    return daily, weekly
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark whole-year analytics.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    chunks = generate_chunks(args.rows)
+    store = ChunkStore(chunks)
+    runs = [("scalar calculate_billed_time", lambda: scalar_year(chunks, YEAR)),
+            ("year_report (pure Python)", lambda: year_report(store, YEAR, use_numpy=False))]
+    if analytics.np is not None:
+        runs.append(("year_report (NumPy)", lambda: year_report(store, YEAR, use_numpy=True)))
+
+    print(f"{args.rows:,} chunks, year {YEAR}")
+    for name, run in runs:
+        start = time.perf_counter()
+        run()
+        print(f"{name:<32}{(time.perf_counter() - start) * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
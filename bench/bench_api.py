@@ -0,0 +1,106 @@
+# bench_api.py
+# Load test for the HTTP API (src/api_server.py): serves a synthetic ledger
+# in-process and drives it from client threads, each on one kept-alive
+# connection, with a mix of chunk pages, period totals and monthly reports.
+#
+#     python -m bench.bench_api [--rows 1000000] [--clients 8] [--seconds 10] [--post-every 0]
+#
+# --post-every N makes every Nth request a POST, so cached responses are
+# invalidated as they would be while someone is logging time.
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from http.client import HTTPConnection
+
+from bench.synthetic import write_csv
+from src.api_server import ApiServer, BillingApi
+from src.data_manager import DataManager
+
+END = date(2025, 10, 31)  # The synthetic data ends here
+
+
+def request_mix(rng: random.Random, post_every: int):
+    """Yield (method, path, body) forever."""
+    count = 0
+    while True:
+        count += 1
+        day = END - timedelta(days=rng.randrange(365))
+        if post_every and count % post_every == 0:
+            body = json.dumps({"date": day.isoformat(), "minutes": 15, "description": "Load test"})
+            yield "POST", "/chunks", body
+            continue
+        kind = rng.random()
+        if kind < 0.4:
+            period = rng.choice(("day", "week", "month"))
+            yield "GET", f"/totals?date={day.isoformat()}&period={period}", None
+        elif kind < 0.8:
+            start = day.replace(day=1)
+            offset = rng.randrange(0, 200, 50)
+            yield "GET", f"/chunks?from={start.isoformat()}&to={day.isoformat()}&offset={offset}&limit=50", None
+        else:
+            yield "GET", f"/report?from={END.year}-01-01&to={END.isoformat()}&period=month", None
+
+
+def client(port: int, seed: int, deadline: float, post_every: int, latencies: list):
+    conn = HTTPConnection("127.0.0.1", port)
+    requests = request_mix(random.Random(seed), post_every)
+    while time.perf_counter() < deadline:
+        method, path, body = next(requests)
+        started = time.perf_counter()
+        conn.request(method, path, body=body,
+                     headers={"Content-Type": "application/json"} if body else {})
+        response = conn.getresponse()
+        response.read()
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path}: HTTP {response.status}")
+        latencies.append(time.perf_counter() - started)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the HTTP API.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--post-every", type=int, default=0, help="Make every Nth request a POST")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = write_csv(os.path.join(tmp, "work_chunks.csv"), args.rows)
+        started = time.perf_counter()
+        manager = DataManager(filename=filename)
+        print(f"{args.rows:,} chunks loaded in {time.perf_counter() - started:.1f} s")
+
+        server = ApiServer(BillingApi(manager), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        latencies = [[] for _ in range(args.clients)]
+        deadline = time.perf_counter() + args.seconds
+        clients = [threading.Thread(target=client,
+                                    args=(server.server_port, seed, deadline, args.post_every, latencies[seed]))
+                   for seed in range(args.clients)]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        server.shutdown()
+        server.server_close()
+        manager.close()
+
+    times = sorted(t for per_client in latencies for t in per_client)
+    percentile = lambda p: times[min(len(times) - 1, int(p * len(times)))] * 1000
+    print(f"{len(times):,} requests from {args.clients} clients in {args.seconds:.0f} s: "
+          f"{len(times) / args.seconds:,.0f} req/s")
+    print(f"latency ms: median {statistics.median(times) * 1000:.2f}, "
+          f"p95 {percentile(0.95):.2f}, p99 {percentile(0.99):.2f}, max {times[-1] * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# bench_csv_loader.py
+# Compares the old per-row strptime CSV loader against the current loaders.
+#
+#     python -m bench.bench_csv_loader [--rows 1000000]
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from bench.synthetic import write_csv
+from src.models import WorkChunk
+from src.storage import load_chunks_from_csv, load_chunk_store_from_csv
+
+
+def legacy_load(filename):
+    """The loader as it was before: strptime and a WorkChunk for every row."""
+    chunks = []
+    with open(filename, mode='r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            chunk_date = datetime.strptime(row[1], '%Y-%m-%d').date()
+            chunks.append(WorkChunk(row[0], chunk_date, int(row[2]), row[3] if len(row) > 2 else ""))
+    return chunks
+
+
+LOADERS = [
+    ("legacy strptime", legacy_load),
+    ("load_chunks_from_csv", load_chunks_from_csv),
+    ("load_chunk_store_from_csv", load_chunk_store_from_csv),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = write_csv(os.path.join(tmp, "work_chunks.csv"), args.rows)
+        for name, loader in LOADERS:
+            start = time.perf_counter()
+            loaded = loader(filename)
+            elapsed = time.perf_counter() - start
+            assert len(loaded) == args.rows
+            print(f"{name:<28}{elapsed:8.2f} s{args.rows / elapsed:14,.0f} rows/s")
+            del loaded
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# bench_gui_refresh.py
+# Headless benchmark of BillingTrackerGUI.refresh_entries.
+#
+#     python -m bench.bench_gui_refresh [--rows 1000000] [--output results.json]
+#
+# Opens the main window offscreen against a synthetic ledger, selects every
+# weekday of the last 12 months of data on the calendar and reports p50/p99
+# latency per click, plus the per-phase breakdown from the profiler.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QDate
+from PyQt5.QtWidgets import QApplication
+
+from bench.synthetic import write_csv
+from src.data_manager import DataManager
+from src.GUI.BillingTrackerGUI import BillingTrackerGUI
+from src.profiling import percentile, profiler
+
+LAST_DAY = date(2025, 10, 31)  # Last date in the synthetic data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GUI refreshes offscreen.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", help="Write JSON results here as well as printing them")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = write_csv(os.path.join(tmp, "work_chunks.csv"), args.rows)
+        window = BillingTrackerGUI(data_manager=DataManager(filename))
+        window.show()
+        app.processEvents()
+
+        profiler.enabled = True
+        profiler.reset()
+        clicks = []
+        day = LAST_DAY - timedelta(days=365)
+        while day <= LAST_DAY:
+            if day.weekday() < 5:
+                start = time.perf_counter()
+                window.calendar.setSelectedDate(QDate(day.year, day.month, day.day))
+                app.processEvents()
+                clicks.append(time.perf_counter() - start)
+            day += timedelta(days=1)
+        window.close()
+
+    results = {
+        "rows": args.rows,
+        "clicks": len(clicks),
+        "p50_ms": percentile(clicks, 50) * 1000,
+        "p99_ms": percentile(clicks, 99) * 1000,
+        "phases": profiler.summary(),
+    }
+    print(f"{len(clicks)} clicks over {args.rows:,} chunks: "
+          f"p50 {results['p50_ms']:.3f} ms, p99 {results['p99_ms']:.3f} ms")
+    profiler.report(sys.stdout)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
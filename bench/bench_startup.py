@@ -0,0 +1,97 @@
+# bench_startup.py
+# Startup cost: import time of the entry modules (from `python -X importtime`)
+# and, where PyQt5 is installed, wall time from launch to the first paint of
+# the splash and of the main window.
+#
+#     python -m bench.bench_startup [--top 10] [--repeat 5] [--target-ms 400]
+#
+# Exits 1 if the median time to the splash's first paint misses --target-ms.
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ["src.main", "src.data_manager", "src.cli", "src.GUI.BillingTrackerGUI"]
+TARGET_FIRST_PAINT_MS = 400
+
+
+def import_times(module: str):
+    """
+    Import module in a fresh interpreter under -X importtime.
+
+    :return: (total microseconds, [(self us, cumulative us, name)]), or None
+             if the import failed (e.g. PyQt5 is missing).
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    # Top-level imports are the unindented names; together they make up the total
+    total = sum(cumulative for _, cumulative, name in rows if not name.startswith("  "))
+    return total, rows
+
+
+def first_paint(repeat: int):
+    """
+    Launch the GUI with --exit-after-paint repeat times.
+
+    :return: Lists of milliseconds from launch to the splash and to the main
+             window being painted, or None if the GUI could not start.
+    """
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    splash, window = [], []
+    for _ in range(repeat):
+        launched = time.time()
+        result = subprocess.run([sys.executable, "-m", "src.main", "--exit-after-paint"],
+                                capture_output=True, text=True, env=env)
+        marks = [line.split() for line in result.stderr.splitlines() if line.startswith("startup ")]
+        if result.returncode != 0 or not marks:
+            return None
+        _, _, splash_time, _, window_time = marks[-1]
+        splash.append((float(splash_time) - launched) * 1000)
+        window.append((float(window_time) - launched) * 1000)
+    return splash, window
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application startup.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module")
+    parser.add_argument("--repeat", type=int, default=5, help="GUI launches to time")
+    parser.add_argument("--target-ms", type=float, default=TARGET_FIRST_PAINT_MS,
+                        help="Allowed median time to the splash's first paint (default: %(default)s)")
+    args = parser.parse_args()
+
+    for module in MODULES:
+        measured = import_times(module)
+        if measured is None:
+            print(f"{module:<32}{'import failed':>14}")
+            continue
+        total, rows = measured
+        print(f"{module:<32}{total / 1000:11.1f} ms")
+        for self_us, _, name in sorted(rows, reverse=True)[:args.top]:
+            print(f"    {name.strip():<40}{self_us / 1000:8.1f} ms self")
+
+    paints = first_paint(args.repeat)
+    if paints is None:
+        print("first paint: GUI could not start (is PyQt5 installed?)")
+        return
+    splash, window = (statistics.median(times) for times in paints)
+    print(f"first paint: splash {splash:.0f} ms, main window {window:.0f} ms "
+          f"(median of {args.repeat}, target {args.target_ms:.0f} ms)")
+    if splash > args.target_ms:
+        print(f"MISSED TARGET splash first paint {splash:.0f} ms > {args.target_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# run.py
+# Benchmark suite for storage, calculations and the DataManager.
+#
+#     python -m bench.run [--sizes 1000,100000,1000000] [--output results.json]
+#                         [--compare baseline.json] [--threshold 1.25]
+#
+# Results are written as JSON, one record per (benchmark, size). With
+# --compare, any benchmark whose median is more than --threshold times the
+# baseline's is reported and the exit status is 1.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+from bench.synthetic import write_csv
+from src.calculations import calculate_billed_time
+from src.chunk_store import ChunkStore
+from src.data_manager import DataManager
+from src.models import WorkChunk
+from src.calculations import get_month_range
+from src.mmap_reader import MappedCSVReader
+from src.search_index import DescriptionIndex
+from src.snapshot import load_snapshot, save_snapshot
+from src.storage import (
+    load_chunks_from_csv, load_chunks_from_csv_in_range, load_chunk_store_from_csv, save_chunks_to_csv
+)
+
+DEFAULT_SIZES = [1_000, 100_000]
+QUERY_DATE = date(2025, 10, 15)  # Inside the synthetic data's last month
+
+
+def time_call(fn, repeat):
+    """Run fn repeat times and return timing stats in seconds."""
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        times.append(time.perf_counter() - start)
+    return {"repeat": repeat, "min": min(times), "median": statistics.median(times)}
+
+
+def run_size(size, workdir):
+    """Run every benchmark against a synthetic ledger of size chunks."""
+    source = write_csv(os.path.join(workdir, f"chunks_{size}.csv"), size)
+    chunks = load_chunks_from_csv(source)
+    store = ChunkStore(chunks)
+    heavy = 3 if size < 1_000_000 else 1
+
+    def scratch_copy(name):
+        path = os.path.join(workdir, f"{name}_{size}.csv")
+        shutil.copyfile(source, path)
+        return path
+
+    append_file = scratch_copy("append")
+    overwrite_file = scratch_copy("overwrite")
+    manager = DataManager(scratch_copy("manager"))
+    builder = DataManager(scratch_copy("builder"))
+    reader = MappedCSVReader(source)
+    snapshot_file = os.path.join(workdir, f"chunks_{size}.snapshot")
+    save_snapshot(store, snapshot_file, "bench")
+    month_start, month_end = get_month_range(QUERY_DATE)
+    index = DescriptionIndex(store)
+    delete_ids = [chunk.chunk_id for chunk in chunks[::max(1, size // 20)]][:20]
+
+    benchmarks = {
+        "load_chunks_from_csv": (lambda i: load_chunks_from_csv(source), heavy),
+        "load_chunk_store_from_csv": (lambda i: load_chunk_store_from_csv(source), heavy),
+        "load_snapshot": (lambda i: load_snapshot(snapshot_file, "bench"), heavy),
+        "load_chunks_from_csv_in_range.month": (
+            lambda i: load_chunks_from_csv_in_range(month_start, month_end, source), heavy),
+        "MappedCSVReader.load_chunks_in_range.month": (
+            lambda i: reader.load_chunks_in_range(month_start, month_end), 20),
+        "save_chunks_to_csv.append": (
+            lambda i: save_chunks_to_csv([WorkChunk(0, QUERY_DATE, 30, "bench")], append_file, append=True), 20),
+        "save_chunks_to_csv.overwrite": (
+            lambda i: save_chunks_to_csv(chunks, overwrite_file, append=False), heavy),
+        # Builds the ChunkStore, day view and totals index that replaced _create_day_dict
+        "DataManager._set_chunks": (lambda i: builder._set_chunks(store), heavy),
+        "DataManager.delete_chunk": (lambda i: manager.delete_chunk(delete_ids[i]), len(delete_ids)),
+        "DescriptionIndex.build": (lambda i: DescriptionIndex(store), heavy),
+        "DescriptionIndex.search.month": (
+            lambda i: index.search("client", month_start, month_end).minutes, 100),
+        "DescriptionIndex.search.all": (lambda i: index.search("client b").minutes, 100),
+    }
+    for period in ("week", "month", "year"):
+        benchmarks[f"calculate_billed_time.{period}.list"] = (
+            lambda i, p=period: calculate_billed_time(QUERY_DATE, p, chunks), 5)
+        benchmarks[f"calculate_billed_time.{period}.chunk_store"] = (
+            lambda i, p=period: calculate_billed_time(QUERY_DATE, p, store), 5)
+        benchmarks[f"calculate_billed_time.{period}.data_manager"] = (
+            lambda i, p=period: calculate_billed_time(QUERY_DATE, p, manager), 100)
+
+    results = []
+    for name, (fn, repeat) in benchmarks.items():
+        stats = time_call(fn, repeat)
+        results.append({"benchmark": name, "size": size, **stats})
+        print(f"{name:<48}{size:>10,}{stats['median'] * 1000:12.3f} ms", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a description of every result slower than threshold x its baseline."""
+    previous = {(r["benchmark"], r["size"]): r["median"] for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["benchmark"], r["size"]))
+        if old and r["median"] > old * threshold:
+            regressions.append(f"{r['benchmark']} @ {r['size']:,}: "
+                               f"{old * 1000:.3f} ms -> {r['median'] * 1000:.3f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Work Billing Tracker at scale.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated chunk counts (default: %(default)s)")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="Baseline JSON results to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Allowed slowdown factor against the baseline (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in (int(s) for s in args.sizes.split(",")):
+            results.extend(run_size(size, workdir))
+
+    report = {"python": platform.python_version(), "platform": platform.platform(),
+              "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
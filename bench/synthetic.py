@@ -0,0 +1,37 @@
+# synthetic.py
+# Synthetic ledger data for the benchmarks
+
+import csv
+import random
+from datetime import date, timedelta
+from typing import List
+from src.models import WorkChunk
+
+DESCRIPTIONS = ["Client A", "Client B", "Client C - support", "Internal", "Meeting", ""]
+CHUNKS_PER_DAY = 6
+
+
+def generate_chunks(count: int, seed: int = 0, end: date = date(2025, 10, 31)) -> List[WorkChunk]:
+    """
+    Build count chunks spread over weekdays ending at end, about
+    CHUNKS_PER_DAY per day, in date order with IDs 1..count.
+    """
+    rng = random.Random(seed)
+    chunks = []
+    day = end - timedelta(days=(count // CHUNKS_PER_DAY) * 7 // 5)
+    for chunk_id in range(1, count + 1):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        chunks.append(WorkChunk(chunk_id, day, rng.randrange(5, 121, 5), rng.choice(DESCRIPTIONS)))
+        if chunk_id % CHUNKS_PER_DAY == 0:
+            day += timedelta(days=1)
+    return chunks
+
+
+def write_csv(filename: str, count: int, seed: int = 0) -> str:
+    """Write a synthetic work_chunks.csv with count rows and return its path."""
+    with open(filename, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Date', 'Minutes', 'Description'])
+        writer.writerows(chunk.to_csv_row() for chunk in generate_chunks(count, seed))
+    return filename
@@ -1,28 +1,45 @@
+import os
 from datetime import date
 
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget,
     QVBoxLayout, QHBoxLayout, QCalendarWidget,
-    QLabel, QPushButton, QListWidget,  QMessageBox, QListWidgetItem
+    QLabel, QPushButton, QListView,  QMessageBox, QLineEdit, QCheckBox
 )
-from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtCore import QDate, QFileSystemWatcher, QObject, Qt, QTimer, pyqtSignal
 
-from src.models import WorkChunk, Day
-from src.storage import save_chunks_to_csv
-from src.calculations import *
+from src import config
+from src.profiling import profiler
+from src.storage import DAYS_OFF_FILENAME, load_days_off
+from src.calculations import (
+    DaysOffCalendar, calculate_billed_time, count_workdays, get_month_range, get_week_range
+)
 from src.data_manager import DataManager
 from src.GUI.Panels.stats_panel import StatsPanel
 from src.GUI.Panels.add_time_panel import AddTimePanel
 from src.GUI.custom_calendar import CustomCalendarWidget
+from src.GUI.entry_list_model import EntryListModel
 
 
 # Constants
 DAILY_GOAL = 480  # minutes per workday - (Assumes a standard 8 hours - need to account for lunches in the future)
+STORAGE_CHANGE_DELAY_MS = 300  # Wait for a burst of file change notifications to settle
+
+
+class PersistenceSignals(QObject):
+    """Carries messages from the background writer and history load to the GUI thread."""
+    write_failed = pyqtSignal(str)
+    chunks_renumbered = pyqtSignal(dict)
+    history_loaded = pyqtSignal()
 
 
 class BillingTrackerGUI(QMainWindow):
 #---------- INITIALIZATION ----------
-    def __init__(self):
+    def __init__(self, data_manager=None):
+        """
+        :param data_manager: DataManager to show. By default one is created
+                             for the configured storage.
+        """
         super().__init__()
         self.setWindowTitle("Work Billing Tracker")
         self.resize(900, 600)
@@ -31,9 +48,21 @@ class BillingTrackerGUI(QMainWindow):
         self.stats_panel = StatsPanel()
         self.add_time_panel = AddTimePanel(on_done_callback=self.handle_add_time_panel_done)
 
-        # Main data — initially empty; initialize_lists function will reload from disk
-        self.data_manager = DataManager()
+        # Main data — in lazy mode only the current month is read before the window opens
+        self.data_manager = data_manager or DataManager(lazy=config.LAZY_LOAD,
+                                                        background_writes=config.BACKGROUND_WRITES)
+        self.persistence_signals = PersistenceSignals()
+        self.persistence_signals.write_failed.connect(self.on_write_failed)
+        self.persistence_signals.chunks_renumbered.connect(self.on_chunks_renumbered)
+        self.persistence_signals.history_loaded.connect(self.refresh_entries)
+        self.data_manager.on_history_loaded = self.persistence_signals.history_loaded.emit
+        if self.data_manager.writer is not None:
+            # Called on the writer's thread; the signals hand them to the GUI thread
+            self.data_manager.writer.on_error = self.persistence_signals.write_failed.emit
+            self.data_manager.on_renumbered = self.persistence_signals.chunks_renumbered.emit
         self.selected_date = date.today() #Set the selected date to today by default
+        self.search_result = None  # SearchResult shown in the list, or None when showing a day
+        self.days_off = DaysOffCalendar(load_days_off(config.DAYS_OFF_FILE or DAYS_OFF_FILENAME))
 
         # --- Widgets ---
         self.central = QWidget()
@@ -47,11 +76,25 @@ class BillingTrackerGUI(QMainWindow):
         self.calendar.setSelectedDate(QDate.currentDate())
         self.last_valid_date = self.calendar.selectedDate()
         self.calendar.selectionChanged.connect(self.on_date_changed)
+        self.calendar.currentPageChanged.connect(self.on_calendar_page_changed)
+
+        # Colors each calendar day by billed time, from the data manager's per-day totals
+        self.heatmap_checkbox = QCheckBox("Show billed-time heatmap")
+        self.heatmap_checkbox.toggled.connect(self.on_heatmap_toggled)
 
         # Create list to display entries on selected day
-        self.entry_list = QListWidget()
+        self.entry_model = EntryListModel(self.data_manager)
+        self.entry_list = QListView()
+        self.entry_list.setModel(self.entry_model)
+        self.entry_list.setUniformItemSizes(True)  # Lets the view skip measuring every row
         self.status_label = QLabel()
 
+        # Search box; while it has text the list shows matching entries from every date
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("Search descriptions...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.refresh_entries)
+
         # Create and connect buttons for editing and deleting entries
         self.edit_button = QPushButton("Edit Time Entry (WIP)")
         self.delete_button = QPushButton("Delete Selected Entry")
@@ -61,6 +104,8 @@ class BillingTrackerGUI(QMainWindow):
         # Add widgets to left layout
         for widget in [
             self.calendar,
+            self.heatmap_checkbox,
+            self.search_box,
             self.status_label,
             self.entry_list,
             self.edit_button,
@@ -83,6 +128,17 @@ class BillingTrackerGUI(QMainWindow):
         self.central.setLayout(self.main_layout)
         self.setCentralWidget(self.central)
 
+        # Pick up entries written by other instances or scripts. Change
+        # notifications come in bursts, so they are handled once things settle.
+        self.storage_watcher = QFileSystemWatcher(self)
+        self.storage_watcher.fileChanged.connect(self.on_storage_changed)
+        self.storage_watcher.directoryChanged.connect(self.on_storage_changed)
+        self.storage_change_timer = QTimer(self)
+        self.storage_change_timer.setSingleShot(True)
+        self.storage_change_timer.setInterval(STORAGE_CHANGE_DELAY_MS)
+        self.storage_change_timer.timeout.connect(self.apply_storage_changes)
+        self.watch_storage_files()
+
         # initial load of main GUI elements
         self.refresh_entries()
 
@@ -100,101 +156,138 @@ class BillingTrackerGUI(QMainWindow):
             self.last_valid_date = qdate
             self.refresh_entries()
 
+    def on_calendar_page_changed(self, year, month):
+        """Make sure the month now shown is loaded before any of its dates are clicked."""
+        first, last = get_month_range(date(year, month, 1))
+        self.data_manager.ensure_range_loaded(first, last)
+
+    def on_storage_changed(self, path):
+        self.storage_change_timer.start()
+
+    def apply_storage_changes(self):
+        """Apply what other processes wrote to storage and show it."""
+        if self.data_manager.apply_external_changes():
+            self.refresh_entries()
+        elif self.data_manager.writer is not None and not self.data_manager.writer.idle():
+            self.storage_change_timer.start()  # Check again once this process's own writes are done
+        self.watch_storage_files()
+
+    def watch_storage_files(self):
+        """
+        Watch the storage files and their folders. A file replaced by a
+        rewrite drops out of the watcher, so this is repeated after changes.
+        """
+        paths = self.data_manager.storage.watch_paths()
+        paths += [os.path.dirname(os.path.abspath(path)) for path in paths]
+        watched = set(self.storage_watcher.files() + self.storage_watcher.directories())
+        missing = [path for path in dict.fromkeys(paths) if path not in watched and os.path.exists(path)]
+        if missing:
+            self.storage_watcher.addPaths(missing)
+
+    def on_heatmap_toggled(self, checked):
+        self.calendar.set_heatmap(self.data_manager if checked else None, DAILY_GOAL)
+
+    def closeEvent(self, event):
+        """Save the data manager's rollup cache before the window closes."""
+        self.data_manager.close()
+        super().closeEvent(event)
+
+    def on_write_failed(self, message):
+        """Report a failed background write and reload what storage actually holds."""
+        QMessageBox.warning(self, "Save failed", message)
+        self.data_manager.load_data()
+        self.refresh_entries()
+
+    def on_chunks_renumbered(self, renumbered):
+        """Show the IDs storage gave entries after another process wrote first."""
+        self.refresh_entries()
+
     def edit_time_entry(self):
         pass
 
 
     def delete_selected_entry(self):
-        selected_items = self.entry_list.selectedItems()
-        if not selected_items:
+        selected_indexes = self.entry_list.selectionModel().selectedIndexes()
+        if not selected_indexes:
             QMessageBox.information(self, "No selection", "Select an entry to delete.")
             return
 
-        chunk = selected_items[0].data(Qt.UserRole) # Retrieve the stored chunk object
-        self.data_manager.delete_chunk(chunk.chunk_id)
-        self.refresh_entries()
+        chunk = selected_indexes[0].data(Qt.UserRole) # Retrieve the stored chunk object
+        if chunk is None:
+            # The entry changed under the list (e.g. renumbered); show what is stored now
+            self.refresh_entries()
+            return
+        if self.data_manager.delete_chunk(chunk.chunk_id):
+            self.entry_model.remove_chunk(chunk.chunk_id)
+        if self.search_result is not None:
+            self.search_result = self.data_manager.search(self.search_box.text().strip())
+        self.refresh_stats()
 
 
 #---------- CORE LOGIC ----------
 
 
     def refresh_entries(self):
-        """Reload chunks from disk (CSV) and update the entries list + stats."""
-        #from src.calculations import get_week_range, get_month_range, get_weekdays_in_range, calculate_billed_time
-        
-
-        # clear UI list and compute stats
-        self.entry_list.clear()
-        count_for_selected_date = 0
-        billed_today = 0
-        billed_week = 0
-        billed_month = 0
-
-        #today = date.today()
+        """
+        Update the entries list + stats for the selected date from the data manager.
+
+        Each step is timed by the shared profiler when profiling is enabled.
+        """
+        with profiler.phase("refresh_entries"):
+            with profiler.phase("refresh_entries.data_lookup"):
+                # Week and month totals come from the rollup cache, so only the day's entries must be loaded
+                self.data_manager.ensure_range_loaded(self.selected_date, self.selected_date)
+
+            # Show entries for the currently selected date (or the search matches); the view reads rows from the model as it draws them
+            with profiler.phase("refresh_entries.list_population"):
+                query = self.search_box.text().strip()
+                if query:
+                    self.search_result = self.data_manager.search(query)
+                    self.entry_model.show_rows(self.search_result.rows())
+                else:
+                    self.search_result = None
+                    self.entry_model.show_day(self.selected_date)
+
+            self.refresh_stats()
+
+    def refresh_stats(self):
+        """Update the status label, stats panel and calendar heatmap for the selected date."""
+        self.calendar.refresh_heatmap()  # Only days whose totals changed are restyled
         week_start, week_end = get_week_range(self.selected_date)
         month_start, month_end = get_month_range(self.selected_date)
 
-        # Show entries for the currently selected date
-        if self.selected_date in self.data_manager.days_dict:
-            day_obj = self.data_manager.days_dict[self.selected_date]
-            for chunk in day_obj.chunks:
-                item_text = f"{chunk.minutes} min - {chunk.description}"
-                item = QListWidgetItem(item_text)
-                item.setData(Qt.UserRole, chunk) # Store the chunk object
-                self.entry_list.addItem(item)
-                count_for_selected_date += 1
-                billed_today += chunk.minutes
-        else:
-            # No day object for this day yet
-            # TODO: need to alter how much I rely on the days_dict vs the chunks list for truth
-            pass
-
-        #TODO: Organize these better 
-        billed_week = calculate_billed_time(self.selected_date, "week", self.data_manager.chunks)
-        billed_month = calculate_billed_time(self.selected_date, "month", self.data_manager.chunks)
-
-        self.status_label.setText(f"Entries for {self.selected_date} ({count_for_selected_date}):")
-
-        # Calculate goals
-        today_goal = DAILY_GOAL
-        week_goal = DAILY_GOAL * len(get_weekdays_in_range(week_start, week_end))
-        month_goal = DAILY_GOAL * len(get_weekdays_in_range(month_start, month_end))
+        with profiler.phase("refresh_entries.aggregation"):
+            billed_today = calculate_billed_time(self.selected_date, "day", self.data_manager)
+            billed_week = calculate_billed_time(self.selected_date, "week", self.data_manager)
+            billed_month = calculate_billed_time(self.selected_date, "month", self.data_manager)
+
+            # Calculate goals
+            today_goal = DAILY_GOAL
+            week_goal = DAILY_GOAL * count_workdays(week_start, week_end, self.days_off)
+            month_goal = DAILY_GOAL * count_workdays(month_start, month_end, self.days_off)
+
+        with profiler.phase("refresh_entries.stats_update"):
+            if self.search_result is not None:
+                minutes = self.search_result.minutes
+                self.status_label.setText(f"{self.search_result.count} matching entries "
+                                          f"({minutes // 60}h {minutes % 60}m):")
+            else:
+                self.status_label.setText(f"Entries for {self.selected_date} ({self.entry_model.total_count()}):")
+
+            # Update the right-hand stats panel
+            self.stats_panel.update_stats(
+                billed_today, billed_week, billed_month,
+                today_goal, week_goal, month_goal
+            )
 
-        # Update the right-hand stats panel
-        self.stats_panel.update_stats(
-            billed_today, billed_week, billed_month,
-            today_goal, week_goal, month_goal
-        )
-
-          
     def handle_add_time_panel_done(self, minutes, description):
         if not minutes:
             return
         
-        #get max id from existing chunks
-        max_id = self.data_manager.get_max_id()
-        new_chunks = []
-        
-        # Build new chunks
-        new_chunk = self.build_new_chunk(max_id, self.selected_date, minutes, description)
-        new_chunks = [new_chunk]
-
-        # Save new chunks to CSV
-        save_chunks_to_csv(new_chunks, append=True)
-
-        # Reinitialize lists and refresh entries to reflect changes
-        self.data_manager.load_data()
-        self.refresh_entries()    
-        
-    def build_new_chunk(self, max_id, selected_date, minutes, description):
-        new_chunk = WorkChunk(str(max_id), selected_date, minutes, description.strip())
-        return new_chunk
-    
-    def build_new_chunk_list(self, max_id, selected_date, minute_chunks, description):
-        new_chunks = []
-        for m in minute_chunks:
-            max_id += 1
-            new_chunks.append(WorkChunk(str(max_id),selected_date, m, description.strip()))
-        
-        return new_chunks
-    
+        # The data manager persists the new chunk and updates its cache in place
+        new_chunks = self.data_manager.add_chunks(self.selected_date, [minutes], description)
+        if self.search_result is not None:
+            self.refresh_entries()  # The new entry may match the search
+            return
+        self.entry_model.add_chunks(new_chunks)
+        self.refresh_stats()
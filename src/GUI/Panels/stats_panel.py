@@ -6,8 +6,6 @@ from PyQt5.QtGui import QFont
 
 from PyQt5.QtCore import Qt
 
-import src.calculations
-
 class StatsPanel(QWidget):
     def __init__(self):
         super().__init__()
@@ -1,11 +1,53 @@
+from datetime import date
+
 from PyQt5.QtWidgets import QCalendarWidget
 from PyQt5.QtGui import QTextCharFormat, QColor
 from PyQt5.QtCore import QDate, QTimer
 
+# Date styles are (background, foreground) color pairs; None means no formatting
+WEEKEND_STYLE = ("#444444", "white")
+TODAY_STYLE = ("#F4F8A4", "Black")
+
+# Heatmap styles by billed minutes / daily goal: the first level whose bound
+# the ratio is below is used
+HEATMAP_LEVELS = (
+    (0.25, ("#DCEFD9", "black")),
+    (0.5, ("#B5DFAE", "black")),
+    (0.75, ("#86C97C", "black")),
+    (1.0, ("#4FA845", "white")),
+    (float("inf"), ("#2E7D32", "white")),
+)
+
+
+def heatmap_style(minutes: int, daily_goal: int):
+    """Return the heatmap style for a day's billed minutes, or None if nothing was billed."""
+    if minutes <= 0:
+        return None
+    ratio = minutes / daily_goal if daily_goal else float("inf")
+    for bound, style in HEATMAP_LEVELS:
+        if ratio < bound:
+            return style
+    return HEATMAP_LEVELS[-1][1]
+
+
 class CustomCalendarWidget(QCalendarWidget):
+    """
+    Calendar that grays out weekends, highlights today and can color each
+    day by billed time (see set_heatmap).
+
+    The styles of each (year, month) page are computed once and cached, and
+    the widget remembers the style it last gave every date, so turning a page
+    only calls setDateTextFormat for dates whose style actually changed.
+    """
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.apply_weekend_format(self.yearShown(), self.monthShown())
+        self._formats = {}          # style -> QTextCharFormat
+        self._applied = {}          # date ordinal -> style currently set in the widget
+        self._weekend_pages = {}    # (year, month) -> {ordinal: style} for the page's weekends
+        self._heat_pages = {}       # (year, month) -> (source version, {ordinal: style})
+        self._heat_source = None
+        self._daily_goal = 0
+        self.apply_page_format(self.yearShown(), self.monthShown())
         self.setVerticalHeaderFormat(QCalendarWidget.NoVerticalHeader)
         self.currentPageChanged.connect(self.on_month_changed)
         self.highlight_today()
@@ -13,54 +55,85 @@ class CustomCalendarWidget(QCalendarWidget):
         self.start_refresh_timer()
 
     def on_month_changed(self, year, month):
-        self.apply_weekend_format(year, month)
+        self.apply_page_format(year, month)
+        self.highlight_today()
+
+    # ---------- Heatmap ----------
+
+    def set_heatmap(self, source, daily_goal: int = 480):
+        """
+        Color each day by its billed minutes relative to daily_goal.
+
+        :param source: Per-day totals, e.g. the DataManager: anything with
+                       daily_minutes_for_range(start, end) returning
+                       {date ordinal: minutes}, and a totals_version that
+                       changes whenever those totals do. None turns the
+                       heatmap off.
+        """
+        self._heat_source = source
+        self._daily_goal = daily_goal
+        self._heat_pages = {}
+        self.refresh_heatmap()
+
+    def refresh_heatmap(self):
+        """Restyle the days on the current page whose totals changed since it was drawn."""
+        self.apply_page_format(self.yearShown(), self.monthShown())
         self.highlight_today()
 
-    def apply_weekend_format(self, year, month):
-        # Helper functions
-        def prev_month_year(month, year):
-            return (month - 1 if month > 1 else 12, year if month > 1 else year - 1)
-        def next_month_year(month, year):
-            return (month + 1 if month < 12 else 1, year if month < 12 else year + 1)
-
-        months = [
-            prev_month_year(month, year),
-            (month, year),
-            next_month_year(month, year)
-        ]
-
-        # Clear all formatting first
-        clear_format = QTextCharFormat()
-        for m, y in months:
-            first_day = QDate(y, m, 1)
-            last_day = QDate(y, m, first_day.daysInMonth())
-            for day in range(1, last_day.day() + 1):
-                qdate = QDate(y, m, day)
-                self.setDateTextFormat(qdate, clear_format)
-
-        # Apply dark gray to weekends
-        dark_gray_format = QTextCharFormat()
-        dark_gray_format.setBackground(QColor("#444444"))
-        dark_gray_format.setForeground(QColor("white"))
-        for m, y in months:
-            first_day = QDate(y, m, 1)
-            last_day = QDate(y, m, first_day.daysInMonth())
-            for day in range(1, last_day.day() + 1):
-                qdate = QDate(y, m, day)
-                if qdate.dayOfWeek() in (6, 7):
-                    self.setDateTextFormat(qdate, dark_gray_format)
+    # ---------- Page formats ----------
+
+    def apply_page_format(self, year, month):
+        """Apply the styles of the page showing year/month (and the month on each side)."""
+        first, last = _page_span(year, month)
+        styles = self._page_styles(year, month, first, last)
+        today = QDate.currentDate().toPyDate().toordinal()
+        for ordinal in range(first, last + 1):
+            style = TODAY_STYLE if ordinal == today else styles.get(ordinal)
+            self._set_style(ordinal, style)
+
+    def _page_styles(self, year, month, first, last):
+        weekends = self._weekend_pages.get((year, month))
+        if weekends is None:
+            weekends = self._weekend_pages[(year, month)] = {
+                ordinal: WEEKEND_STYLE for ordinal in range(first, last + 1)
+                if date.fromordinal(ordinal).weekday() >= 5
+            }
+        if self._heat_source is None:
+            return weekends
+
+        version = self._heat_source.totals_version
+        cached = self._heat_pages.get((year, month))
+        if cached is None or cached[0] != version:
+            totals = self._heat_source.daily_minutes_for_range(date.fromordinal(first), date.fromordinal(last))
+            heat = {ordinal: heatmap_style(minutes, self._daily_goal) for ordinal, minutes in totals.items()}
+            cached = self._heat_pages[(year, month)] = (version, {**weekends, **heat})
+        return cached[1]
+
+    def _set_style(self, ordinal, style):
+        """Give a date a style, skipping the widget call if it already has it."""
+        if self._applied.get(ordinal) == style:
+            return
+        text_format = self._formats.get(style)
+        if text_format is None:
+            text_format = self._formats[style] = QTextCharFormat()
+            if style is not None:
+                text_format.setBackground(QColor(style[0]))
+                text_format.setForeground(QColor(style[1]))
+        self.setDateTextFormat(QDate(date.fromordinal(ordinal)), text_format)
+        if style is None:
+            self._applied.pop(ordinal, None)
+        else:
+            self._applied[ordinal] = style
+
+    # ---------- Today ----------
 
     def highlight_today(self):
-        today_highlight_format = QTextCharFormat()
-        today_highlight_format.setBackground(QColor("#F4F8A4"))
-        today_highlight_format.setForeground(QColor("Black"))
         today = QDate.currentDate()
-        self.setDateTextFormat(today, today_highlight_format)
+        self._set_style(today.toPyDate().toordinal(), TODAY_STYLE)
         self._last_highlighted_date = today
-    
+
     def clear_old_highlight(self):
-        clear_format = QTextCharFormat()
-        self.setDateTextFormat(self._last_highlighted_date, clear_format)
+        self._set_style(self._last_highlighted_date.toPyDate().toordinal(), None)
 
     def _check_today_changed(self):
         """Called by the timer - if the system date rolled over, reapply formats."""
@@ -76,4 +149,11 @@ class CustomCalendarWidget(QCalendarWidget):
         self._today_refresh_timer.setInterval(30* 60 * 1000) #Check every 30 minutes
         self._today_refresh_timer.timeout.connect(self._check_today_changed)
         self._today_refresh_timer.start()
-        
\ No newline at end of file
+
+
+def _page_span(year, month):
+    """Return the first and last date ordinals of the month before through the month after year/month."""
+    prev_year, prev_month = (year, month - 1) if month > 1 else (year - 1, 12)
+    next_year, next_month = (year, month + 1) if month < 12 else (year + 1, 1)
+    following = date(next_year + (next_month == 12), next_month % 12 + 1, 1)
+    return date(prev_year, prev_month, 1).toordinal(), following.toordinal() - 1
@@ -0,0 +1,130 @@
+# entry_list_model.py
+# List model over the DataManager's chunks for a day (or any date range).
+
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt
+
+# Rows handed to the view per fetchMore() call
+FETCH_BATCH_SIZE = 256
+
+
+class EntryListModel(QAbstractListModel):
+    """
+    Shows the chunks between two dates, ordered by date then entry order.
+
+    Only chunk IDs are held; a chunk is read from the DataManager when the
+    view asks for one of its rows. Rows are handed to the view in batches
+    through canFetchMore()/fetchMore(), so a range with thousands of entries
+    is shown without building them all. add_chunks() and remove_chunk()
+    report single-row changes instead of resetting the model.
+    """
+    def __init__(self, data_manager, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.start_date = None
+        self.end_date = None
+        self._ids = []
+        self._ordinals = []   # Date ordinal of each row, for placing new chunks
+        self._fetched = 0     # Rows the view has been told about so far
+
+    # ---------- Contents ----------
+
+    def show_day(self, day: date):
+        self.show_range(day, day)
+
+    def show_range(self, start_date: date, end_date: date):
+        """Replace the rows with the chunks between start_date and end_date, inclusive."""
+        self.beginResetModel()
+        self.start_date, self.end_date = start_date, end_date
+        self._ids, self._ordinals = [], []
+        day = start_date
+        while day <= end_date:
+            day_ids = self.data_manager.chunk_ids_for_range(day, day)
+            self._ids.extend(day_ids)
+            self._ordinals.extend([day.toordinal()] * len(day_ids))
+            day += timedelta(days=1)
+        self._fetched = min(len(self._ids), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def show_rows(self, rows):
+        """
+        Replace the rows with given chunks, e.g. search results.
+
+        :param rows: (date ordinal, chunk ID) pairs, ordered by date.
+        """
+        self.beginResetModel()
+        self.start_date = self.end_date = None  # Not a date range, so add_chunks() leaves it alone
+        self._ordinals = [ordinal for ordinal, _ in rows]
+        self._ids = [chunk_id for _, chunk_id in rows]
+        self._fetched = min(len(self._ids), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def add_chunks(self, chunks):
+        """Insert newly added chunks that fall in the shown range."""
+        for chunk in chunks:
+            if self.start_date is None or not self.start_date <= chunk.chunk_date <= self.end_date:
+                continue
+            ordinal = chunk.chunk_date.toordinal()
+            row = bisect_right(self._ordinals, ordinal)
+            if row <= self._fetched:
+                self.beginInsertRows(QModelIndex(), row, row)
+            self._ids.insert(row, chunk.chunk_id)
+            self._ordinals.insert(row, ordinal)
+            if row <= self._fetched:
+                self._fetched += 1
+                self.endInsertRows()
+
+    def remove_chunk(self, chunk_id):
+        """Remove a deleted chunk's row, if it is shown."""
+        try:
+            row = self._ids.index(chunk_id)
+        except ValueError:
+            return
+        if row < self._fetched:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        del self._ids[row]
+        del self._ordinals[row]
+        if row < self._fetched:
+            self._fetched -= 1
+            self.endRemoveRows()
+
+    def chunk_at(self, row: int):
+        """
+        Return the chunk shown in a row, or None if it is no longer stored
+        (e.g. renumbered or deleted by a write the model hasn't caught up with).
+        """
+        return self.data_manager.get_chunk(self._ids[row])
+
+    def total_count(self) -> int:
+        """Number of chunks in the range, including rows not fetched yet."""
+        return len(self._ids)
+
+    # ---------- QAbstractListModel ----------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < self._fetched:
+            return None
+        if role not in (Qt.DisplayRole, Qt.UserRole):
+            return None
+        chunk = self.chunk_at(index.row())
+        if chunk is None or role == Qt.UserRole:
+            return chunk
+        return f"{chunk.minutes} min - {chunk.description}"
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < len(self._ids)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH_SIZE, len(self._ids) - self._fetched)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
@@ -0,0 +1,199 @@
+# aggregates.py
+# Aggregate indexes over work chunks, kept up to date by the DataManager so
+# totals don't need a scan of every chunk.
+
+from datetime import date
+from typing import Dict, Iterable
+from src.models import WorkChunk
+
+# Extra days allocated on each side when the index grows, so adding chunks
+# near the edges doesn't rebuild it every time
+GROWTH_PADDING = 366
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over positions 0..size-1.
+
+    Supports adding to a single position and summing a prefix, both in
+    O(log size).
+    """
+    def __init__(self, values):
+        """
+        Build the tree from a list of initial values in O(size).
+
+        :param values: Initial value for every position.
+        """
+        self.size = len(values)
+        self._tree = [0] + list(values)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self._tree[parent] += self._tree[i]
+
+    def add(self, index: int, delta: int):
+        """Add delta to the value at index."""
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """Return the sum of positions 0..index, inclusive."""
+        i = min(index + 1, self.size)
+        total = 0
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class DailyTotalsIndex:
+    """
+    Billed minutes per day, keyed by date ordinal.
+
+    Day totals are answered in O(1) from a dict and range totals in O(log N)
+    from a Fenwick tree covering every day between the first and last
+    recorded date. Adding a date outside that span rebuilds the tree with
+    some padding.
+    """
+    def __init__(self, chunks: Iterable[WorkChunk] = ()):
+        """
+        :param chunks: Chunks to index, or a ChunkStore, whose per-day totals
+                       are read straight from its columns.
+        """
+        daily_minutes = getattr(chunks, "daily_minutes", None)
+        if daily_minutes is not None:
+            self._daily: Dict[int, int] = daily_minutes()
+        else:
+            self._daily = {}
+            for chunk in chunks:
+                ordinal = chunk.chunk_date.toordinal()
+                self._daily[ordinal] = self._daily.get(ordinal, 0) + chunk.minutes
+        self._first = 0
+        self._tree = FenwickTree([])
+        if self._daily:
+            self._rebuild(min(self._daily), max(self._daily))
+
+    def add(self, day: date, minutes: int):
+        """Add minutes to a day. Use a negative value to remove them."""
+        ordinal = day.toordinal()
+        total = self._daily.get(ordinal, 0) + minutes
+        if total:
+            self._daily[ordinal] = total
+        else:
+            self._daily.pop(ordinal, None)
+
+        position = ordinal - self._first
+        if 0 <= position < self._tree.size:
+            self._tree.add(position, minutes)
+        else:
+            self._rebuild(min(self._daily, default=ordinal), max(self._daily, default=ordinal))
+
+    def total_for_day(self, day: date) -> int:
+        """Return the minutes billed on a single day."""
+        return self._daily.get(day.toordinal(), 0)
+
+    def total_for_range(self, start_date: date, end_date: date) -> int:
+        """Return the minutes billed between start_date and end_date, inclusive."""
+        start = max(start_date.toordinal() - self._first, 0)
+        end = end_date.toordinal() - self._first
+        if end < start or end < 0 or start >= self._tree.size:
+            return 0
+        before = self._tree.prefix_sum(start - 1) if start > 0 else 0
+        return self._tree.prefix_sum(end) - before
+
+    def _rebuild(self, first: int, last: int):
+        self._first = first - GROWTH_PADDING
+        size = last - self._first + GROWTH_PADDING + 1
+        values = [0] * size
+        for ordinal, minutes in self._daily.items():
+            values[ordinal - self._first] = minutes
+        self._tree = FenwickTree(values)
+
+
+class RollupCache:
+    """
+    Materialized billed-minute totals per day, ISO week and month.
+
+    Every add() updates all three in O(1), so the stats for any day, week,
+    month, quarter or year are dict lookups (quarters and years sum at most
+    twelve months). The cache can be saved with to_dict() and restored with
+    from_dict() to avoid rebuilding it from the chunks on startup.
+    """
+    def __init__(self, chunks: Iterable[WorkChunk] = ()):
+        """
+        :param chunks: Chunks to total, or anything with a daily_minutes()
+                       method such as a ChunkStore.
+        """
+        self.daily: Dict[int, int] = {}
+        self.weekly: Dict[int, int] = {}     # Keyed by the ordinal of the week's Monday
+        self.monthly: Dict[str, int] = {}    # Keyed by "YYYY-MM"
+        daily_minutes = getattr(chunks, "daily_minutes", None)
+        if daily_minutes is not None:
+            for ordinal, minutes in daily_minutes().items():
+                self._add_ordinal(ordinal, minutes)
+        else:
+            for chunk in chunks:
+                self.add(chunk.chunk_date, chunk.minutes)
+
+    def add(self, day: date, minutes: int):
+        """Add minutes to a day. Use a negative value to remove them."""
+        self._add_ordinal(day.toordinal(), minutes)
+
+    def daily_minutes(self) -> Dict[int, int]:
+        """Return a copy of the per-day totals, keyed by date ordinal."""
+        return dict(self.daily)
+
+    def day(self, target_date: date) -> int:
+        return self.daily.get(target_date.toordinal(), 0)
+
+    def week(self, target_date: date) -> int:
+        """Minutes in the Monday-Sunday week containing target_date."""
+        return self.weekly.get(target_date.toordinal() - target_date.weekday(), 0)
+
+    def month(self, target_date: date) -> int:
+        return self.monthly.get(_month_key(target_date.year, target_date.month), 0)
+
+    def quarter(self, target_date: date) -> int:
+        first_month = (target_date.month - 1) // 3 * 3 + 1
+        return sum(self.monthly.get(_month_key(target_date.year, m), 0)
+                   for m in range(first_month, first_month + 3))
+
+    def year(self, target_date: date) -> int:
+        return sum(self.monthly.get(_month_key(target_date.year, m), 0) for m in range(1, 13))
+
+    def to_dict(self) -> dict:
+        """Return the cache as JSON-compatible data."""
+        return {
+            "daily": {str(k): v for k, v in self.daily.items()},
+            "weekly": {str(k): v for k, v in self.weekly.items()},
+            "monthly": dict(self.monthly),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RollupCache':
+        """Rebuild a cache saved with to_dict()."""
+        cache = cls()
+        cache.daily = {int(k): v for k, v in data["daily"].items()}
+        cache.weekly = {int(k): v for k, v in data["weekly"].items()}
+        cache.monthly = dict(data["monthly"])
+        return cache
+
+    def _add_ordinal(self, ordinal: int, minutes: int):
+        day = date.fromordinal(ordinal)
+        _add_to(self.daily, ordinal, minutes)
+        _add_to(self.weekly, ordinal - day.weekday(), minutes)
+        _add_to(self.monthly, _month_key(day.year, day.month), minutes)
+
+
+def _month_key(year: int, month: int) -> str:
+    return f"{year:04d}-{month:02d}"
+
+
+def _add_to(totals: dict, key, minutes: int):
+    total = totals.get(key, 0) + minutes
+    if total:
+        totals[key] = total
+    else:
+        totals.pop(key, None)
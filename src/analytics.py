@@ -0,0 +1,194 @@
+# analytics.py
+# Whole-year reports computed in one pass over the chunk columns.
+#
+# Uses NumPy when it is installed and falls back to pure Python otherwise;
+# both paths return the same report.
+
+import statistics
+from array import array
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from src.calculations import DaysOffCalendar
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; see _year_report_python
+    np = None
+
+DEFAULT_DAILY_GOAL = 480
+ROLLING_WINDOWS = (7, 30)
+
+# Upper edges (minutes, inclusive) of the chunk-size histogram; the last bin is open-ended
+CHUNK_SIZE_EDGES = (15, 30, 60, 120, 240)
+
+
+def year_report(chunks, year: int, daily_goal: int = DEFAULT_DAILY_GOAL, days_off=None,
+                as_of: Optional[date] = None, use_numpy: Optional[bool] = None) -> dict:
+    """
+    Build a report of the billed time in a year.
+
+    :param chunks: A DataManager, ChunkStore or list of WorkChunks.
+    :param daily_goal: Minutes to bill per workday.
+    :param days_off: Dates (e.g. a calculations.DaysOffCalendar) that aren't workdays.
+    :param as_of: Last date to count; days after it are left out of goals and
+                  streaks. Defaults to the end of the year.
+    :param use_numpy: Force the NumPy (True) or pure-Python (False) path.
+                      Defaults to NumPy when it is installed.
+
+    :return: A dict with:
+        daily: minutes billed on each day of the year, from Jan 1.
+        rolling_7 / rolling_30: trailing average minutes per day, for each day.
+        weeks: per Monday-Sunday week (clipped to the year), its start date,
+               billed minutes, goal and attainment (billed / goal, or None).
+        streaks: 'longest' and 'current' runs of workdays that met the daily
+                 goal. Weekends and days off don't break a run.
+        chunk_sizes: histogram of chunk lengths ('edges', 'counts') plus
+                     'mean' and 'median'.
+        total, goal, attainment: for the whole year up to as_of.
+    """
+    first = date(year, 1, 1)
+    last = min(date(year, 12, 31), as_of or date(year, 12, 31))
+    ordinals, minutes = _columns(chunks)
+    if use_numpy is None:
+        use_numpy = np is not None
+    build = _year_report_numpy if use_numpy else _year_report_python
+    return build(ordinals, minutes, first, date(year, 12, 31), last, daily_goal, days_off)
+
+
+def _columns(chunks):
+    """Return (date ordinals, minutes) columns for any supported chunk source."""
+    store = getattr(chunks, "chunks", None)
+    if store is not None and hasattr(chunks, "wait_for_history"):
+        chunks.wait_for_history()
+        chunks = store
+    columns = getattr(chunks, "columns", None)
+    if columns is not None:
+        return columns()
+    return (array('i', (c.chunk_date.toordinal() for c in chunks)),
+            array('i', (c.minutes for c in chunks)))
+
+
+def _workday_flags(first: date, days: int, days_off) -> List[bool]:
+    if days_off is not None and not isinstance(days_off, DaysOffCalendar):
+        days_off = DaysOffCalendar(days_off)
+    return [(first.weekday() + i) % 7 < 5
+            and (days_off is None or first + timedelta(days=i) not in days_off)
+            for i in range(days)]
+
+
+def _week_slices(first: date, days: int) -> List[tuple]:
+    """Return (start index, end index) of each Monday-Sunday week within the days."""
+    slices = []
+    start = 0
+    while start < days:
+        end = min(days, start + 7 - (first.weekday() + start) % 7)
+        slices.append((start, end))
+        start = end
+    return slices
+
+
+def _streaks(met: List[bool], workdays: List[bool]) -> Dict[str, int]:
+    longest = current = 0
+    for is_workday, goal_met in zip(workdays, met):
+        if not is_workday:
+            continue
+        current = current + 1 if goal_met else 0
+        longest = max(longest, current)
+    return {"longest": longest, "current": current}
+
+
+def _finish(first, daily, rolling, week_totals, weeks, workdays, counted, streaks,
+            sizes, size_total, size_median, daily_goal) -> dict:
+    """Assemble the report dict shared by both paths."""
+    week_reports = []
+    for (start, end), billed in zip(weeks, week_totals):
+        goal = daily_goal * sum(workdays[start:min(end, counted)])
+        week_reports.append({"week_start": first + timedelta(days=start), "billed": billed,
+                             "goal": goal, "attainment": billed / goal if goal else None})
+    total = sum(daily[:counted])
+    goal = daily_goal * sum(workdays[:counted])
+    chunk_count = sum(sizes)
+    return {
+        "year": first.year,
+        "daily": daily,
+        **{f"rolling_{window}": rolling[window] for window in ROLLING_WINDOWS},
+        "weeks": week_reports,
+        "streaks": streaks,
+        "chunk_sizes": {"edges": list(CHUNK_SIZE_EDGES), "counts": sizes,
+                        "mean": size_total / chunk_count if chunk_count else 0.0,
+                        "median": size_median},
+        "total": total,
+        "goal": goal,
+        "attainment": total / goal if goal else None,
+    }
+
+
+def _year_report_python(ordinals, minutes, first, year_end, last, daily_goal, days_off) -> dict:
+    days = year_end.toordinal() - first.toordinal() + 1
+    counted = last.toordinal() - first.toordinal() + 1
+    lead = max(ROLLING_WINDOWS) - 1   # Days before Jan 1 the first windows reach back to
+    origin = first.toordinal() - lead
+
+    # One pass over the columns: per-day totals and the year's chunk sizes
+    totals = [0] * (lead + days)
+    sizes = [0] * (len(CHUNK_SIZE_EDGES) + 1)
+    year_minutes = []
+    for ordinal, m in zip(ordinals, minutes):
+        index = ordinal - origin
+        if 0 <= index < lead + days:
+            totals[index] += m
+            if index >= lead:
+                year_minutes.append(m)
+                sizes[bisect_right(CHUNK_SIZE_EDGES, m - 1)] += 1
+    daily = totals[lead:]
+
+    rolling = {}
+    for window in ROLLING_WINDOWS:
+        running = sum(totals[lead - window + 1:lead])
+        averages = []
+        for i in range(days):
+            running += totals[lead + i]
+            averages.append(running / window)
+            running -= totals[lead + i - window + 1]
+        rolling[window] = averages
+
+    weeks = _week_slices(first, days)
+    week_totals = [sum(daily[start:end]) for start, end in weeks]
+    workdays = _workday_flags(first, days, days_off)
+    streaks = _streaks([m >= daily_goal for m in daily[:counted]], workdays[:counted])
+
+    median = float(statistics.median(year_minutes)) if year_minutes else 0.0
+    return _finish(first, daily, rolling, week_totals, weeks, workdays, counted, streaks,
+                   sizes, sum(year_minutes), median, daily_goal)
+
+
+def _year_report_numpy(ordinals, minutes, first, year_end, last, daily_goal, days_off) -> dict:
+    days = year_end.toordinal() - first.toordinal() + 1
+    counted = last.toordinal() - first.toordinal() + 1
+    lead = max(ROLLING_WINDOWS) - 1
+    origin = first.toordinal() - lead
+
+    index = np.frombuffer(ordinals, dtype=np.intc).astype(np.int64) - origin
+    values = np.frombuffer(minutes, dtype=np.intc).astype(np.int64)
+    in_span = (index >= 0) & (index < lead + days)
+    totals = np.bincount(index[in_span], weights=values[in_span], minlength=lead + days).astype(np.int64)
+    daily = totals[lead:]
+
+    cumulative = np.concatenate(([0], np.cumsum(totals)))
+    rolling = {}
+    for window in ROLLING_WINDOWS:
+        ends = np.arange(lead + 1, lead + days + 1)
+        rolling[window] = ((cumulative[ends] - cumulative[ends - window]) / window).tolist()
+
+    weeks = _week_slices(first, days)
+    week_totals = np.add.reduceat(daily, [start for start, _ in weeks]).tolist()
+    workdays = _workday_flags(first, days, days_off)
+    streaks = _streaks((daily[:counted] >= daily_goal).tolist(), workdays[:counted])
+
+    year_minutes = values[in_span & (index >= lead)]
+    sizes = np.bincount(np.searchsorted(CHUNK_SIZE_EDGES, year_minutes - 1, side='right'),
+                        minlength=len(CHUNK_SIZE_EDGES) + 1).tolist()
+    median = float(np.median(year_minutes)) if len(year_minutes) else 0.0
+    return _finish(first, daily.tolist(), rolling, week_totals, weeks, workdays, counted, streaks,
+                   sizes, int(year_minutes.sum()), median, daily_goal)
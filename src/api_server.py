@@ -0,0 +1,330 @@
+# api_server.py
+# Local HTTP/JSON API over a DataManager, so dashboards can read (and add to)
+# one person's billing without the GUI. Standard library only.
+#
+#     python -m src.api_server [--host 127.0.0.1] [--port 8765] [--storage csv] [--file PATH]
+#
+#     GET  /chunks?from=2025-10-01&to=2025-10-31&offset=0&limit=100
+#     POST /chunks   {"date": "2025-10-01", "minutes": [30, 45], "description": "Client A"}
+#     GET  /totals?date=2025-10-15&period=week
+#     GET  /report?from=2025-01-01&to=2025-12-31&period=month
+#     GET  /version
+#
+# Connections are kept alive (HTTP/1.1) and every GET response is cached
+# until the data changes; its ETag is built from the data version, so
+# clients can revalidate with If-None-Match.
+
+import argparse
+import json
+import secrets
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+from src import config
+from src.calculations import (
+    DaysOffCalendar, calculate_billed_time, count_workdays, get_period_range, get_period_totals
+)
+from src.models import parse_iso_date
+from src.storage import DAYS_OFF_FILENAME, load_days_off
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_DAILY_GOAL = 480
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BODY_BYTES = 1 << 20
+CACHE_SIZE = 512           # Cached GET responses
+RANGE_CACHE_SIZE = 16      # Cached chunk ID lists, for paging through a range
+REFRESH_INTERVAL = 1.0     # Seconds between checks for writes by other processes
+PERIODS = ("day", "week", "month", "quarter", "year")
+
+
+class ApiError(Exception):
+    """A request that can't be served; becomes an error response with status."""
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class BillingApi:
+    """
+    Routes requests to a DataManager, independent of HTTP.
+
+    The DataManager is only used under one lock, so requests from many
+    connections never see a write half applied. GET responses are cached
+    with the data version (DataManager.totals_version) they were built from
+    and served from the cache until it changes.
+    """
+    def __init__(self, data_manager, daily_goal: int = DEFAULT_DAILY_GOAL, days_off=None,
+                 refresh_interval: float = REFRESH_INTERVAL):
+        """
+        :param days_off: A calculations.DaysOffCalendar excluded from goals.
+        :param refresh_interval: Seconds between checks for writes other
+                                 processes made to storage (see
+                                 DataManager.apply_external_changes).
+        """
+        self.data_manager = data_manager
+        self.daily_goal = daily_goal
+        self.days_off = days_off
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()        # (path, query) -> (version, body)
+        self._range_ids = OrderedDict()    # (from, to) -> (version, chunk IDs)
+        self._last_refresh = time.monotonic()
+        # The data version starts over with every launch, so ETags also carry a per-launch token
+        self._instance = secrets.token_hex(8)
+
+    @property
+    def version(self) -> int:
+        return self.data_manager.totals_version
+
+    def etag(self, version: int) -> str:
+        """Return the ETag for responses built from a data version."""
+        return f'"{self._instance}-{version}"'
+
+    def handle(self, method: str, path: str, query: dict, body: bytes = b""):
+        """
+        Serve one request. Unexpected errors are printed to stderr and
+        answered with a 500, so a client is never left without a response.
+
+        :return: (status, JSON body bytes, data version)
+        """
+        try:
+            self._refresh_if_due()
+            if method == "GET":
+                return self._get(path, query)
+            if method == "POST" and path == "/chunks":
+                with self._lock:
+                    try:
+                        payload = self._add_chunks(body)
+                    except OSError as e:
+                        # Storage is written before memory, so nothing needs undoing
+                        raise ApiError(500, f"could not save: {e}")
+                    return 201, _encode(payload), self.version
+            raise ApiError(404 if method == "GET" else 405, f"no {method} {path}")
+        except ApiError as e:
+            return e.status, _encode({"error": str(e)}), self.version
+        except Exception as e:
+            traceback.print_exc()
+            return 500, _encode({"error": f"internal error: {e}"}), self.version
+
+    def _get(self, path: str, query: dict):
+        routes = {"/chunks": self._list_chunks, "/totals": self._totals,
+                  "/report": self._report, "/version": lambda q: {"version": self.version}}
+        route = routes.get(path)
+        if route is None:
+            raise ApiError(404, f"no GET {path}")
+        key = (path, tuple(sorted(query.items())))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == self.version:
+                self._cache.move_to_end(key)
+                return 200, cached[1], cached[0]
+            version = self.version
+            body = _encode(route(query))
+            _put(self._cache, key, (version, body), CACHE_SIZE)
+        return 200, body, version
+
+    def _refresh_if_due(self):
+        now = time.monotonic()
+        if now - self._last_refresh < self.refresh_interval:
+            return
+        with self._lock:
+            self._last_refresh = now
+            self.data_manager.apply_external_changes()
+
+    # ---------- Endpoints ----------
+
+    def _list_chunks(self, query: dict) -> dict:
+        start, end = _date_param(query, "from"), _date_param(query, "to")
+        if end < start:
+            raise ApiError(400, "'to' is before 'from'")
+        offset = _int_param(query, "offset", 0, minimum=0)
+        limit = _int_param(query, "limit", DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+
+        cached = self._range_ids.get((start, end))
+        if cached is None or cached[0] != self.version:
+            cached = (self.version, self.data_manager.chunk_ids_for_range(start, end))
+            _put(self._range_ids, (start, end), cached, RANGE_CACHE_SIZE)
+        ids = cached[1]
+        page = [self.data_manager.get_chunk(chunk_id) for chunk_id in ids[offset:offset + limit]]
+        return {"from": start.isoformat(), "to": end.isoformat(), "offset": offset, "limit": limit,
+                "total": len(ids), "next_offset": offset + limit if offset + limit < len(ids) else None,
+                "chunks": [_chunk_dict(chunk) for chunk in page if chunk is not None]}
+
+    def _totals(self, query: dict) -> dict:
+        target = _date_param(query, "date")
+        period = _choice_param(query, "period", PERIODS, "day")
+        start, end = get_period_range(target, period)
+        billed = calculate_billed_time(target, period, self.data_manager)
+        goal = self.daily_goal * count_workdays(start, end, self.days_off)
+        return {"date": target.isoformat(), "period": period, "start": start.isoformat(),
+                "end": end.isoformat(), "billed": billed, "goal": goal}
+
+    def _report(self, query: dict) -> dict:
+        from src.cli import report_dict
+        start, end = _date_param(query, "from"), _date_param(query, "to")
+        if end < start:
+            raise ApiError(400, "'to' is before 'from'")
+        period = _choice_param(query, "period", PERIODS, "month")
+        rows = get_period_totals(self.data_manager, start, end, period, self.daily_goal, self.days_off)
+        return report_dict(rows, start, end, period)
+
+    def _add_chunks(self, body: bytes) -> dict:
+        try:
+            entry = json.loads(body.decode('utf-8'))
+        except ValueError as e:
+            raise ApiError(400, f"invalid JSON: {e}")
+        if not isinstance(entry, dict):
+            raise ApiError(400, "expected a JSON object")
+        chunk_date = _date_param(entry, "date")
+        minutes = entry.get("minutes")
+        minutes = minutes if isinstance(minutes, list) else [minutes]
+        if not minutes or not all(isinstance(m, int) and not isinstance(m, bool) and m > 0 for m in minutes):
+            raise ApiError(400, "'minutes' must be a positive integer or a list of them")
+        description = entry.get("description", "")
+        if not isinstance(description, str):
+            raise ApiError(400, "'description' must be a string")
+        chunks = self.data_manager.add_chunks(chunk_date, minutes, description)
+        return {"chunks": [_chunk_dict(chunk) for chunk in chunks], "version": self.version}
+
+
+# ---------- Helpers ----------
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode('utf-8')
+
+
+def _put(cache: OrderedDict, key, value, size: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > size:
+        cache.popitem(last=False)
+
+
+def _chunk_dict(chunk) -> dict:
+    return {"id": chunk.chunk_id, "date": chunk.chunk_date.isoformat(),
+            "minutes": chunk.minutes, "description": chunk.description}
+
+
+def _date_param(params: dict, name: str) -> date:
+    value = params.get(name)
+    if value is None:
+        raise ApiError(400, f"missing '{name}'")
+    try:
+        return parse_iso_date(str(value))
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be a YYYY-MM-DD date")
+
+
+def _int_param(params: dict, name: str, default: int, minimum: int = None, maximum: int = None) -> int:
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise ApiError(400, f"'{name}' must be between {minimum} and {maximum}")
+    return value
+
+
+def _choice_param(params: dict, name: str, choices, default: str) -> str:
+    value = params.get(name, default)
+    if value not in choices:
+        raise ApiError(400, f"'{name}' must be one of {', '.join(choices)}")
+    return value
+
+
+# ---------- HTTP ----------
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Hands requests to the server's BillingApi. HTTP/1.1, so connections stay open."""
+    protocol_version = "HTTP/1.1"
+    server_version = "BillingTrackerAPI/1"
+    # Headers and body are separate writes; with Nagle on, a kept-alive
+    # client waits on a delayed ACK (~40 ms) for every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self._send(413, _encode({"error": "request body too large"}), None)
+            self.close_connection = True
+            return
+        body = self.rfile.read(length) if length else b""
+        status, payload, version = self.server.api.handle(method, url.path, dict(parse_qsl(url.query)), body)
+        etag = self.server.api.etag(version)
+        if method == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag)
+        else:
+            self._send(status, payload, etag)
+
+    def _send(self, status: int, payload: bytes, etag):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if payload:
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ApiServer(ThreadingHTTPServer):
+    """Threaded HTTP server (a thread per connection) for a BillingApi."""
+    daemon_threads = True
+
+    def __init__(self, api: BillingApi, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 verbose: bool = False):
+        self.api = api
+        self.verbose = verbose
+        super().__init__((host, port), ApiRequestHandler)
+
+
+def main(argv=None):
+    from src.data_manager import DataManager
+    from src.storage import get_storage
+
+    parser = argparse.ArgumentParser(prog="python -m src.api_server",
+                                     description="Serve the Work Billing Tracker data as JSON over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--storage", choices=("csv", "sqlite", "partitioned"),
+                        help="Storage backend (default: config.STORAGE_BACKEND)")
+    parser.add_argument("--file", help="Data file or directory for the backend")
+    parser.add_argument("--goal", type=int, default=DEFAULT_DAILY_GOAL, help="Minutes per workday")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    # Writes are synchronous, so a POST only succeeds once stored and returns the IDs storage gave
+    data_manager = DataManager(storage=get_storage(args.storage, args.file))
+    days_off = DaysOffCalendar(load_days_off(config.DAYS_OFF_FILE or DAYS_OFF_FILENAME))
+    server = ApiServer(BillingApi(data_manager, args.goal, days_off), args.host, args.port, args.verbose)
+    print(f"Serving {data_manager.filename} on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        data_manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,9 @@
 # Business logic for the Work Billing Tracker (totals, week/month logic, etc.)
 
 import calendar
+from bisect import bisect_left, bisect_right
 from datetime import date, timedelta
-from typing import List
+from typing import Iterable, List, Optional, Tuple
 from src.models import WorkChunk
 
 def get_week_range(target_date: date):
@@ -23,6 +24,51 @@ def get_month_range(target_date: date):
     last = target_date.replace(day=last_day)
     return first, last
 
+def get_quarter_range(target_date: date):
+    """
+    Returns the first and last date of the quarter containing target_date.
+    """
+    first_month = (target_date.month - 1) // 3 * 3 + 1
+    first = date(target_date.year, first_month, 1)
+    last = get_month_range(date(target_date.year, first_month + 2, 1))[1]
+    return first, last
+
+def get_year_range(target_date: date):
+    """
+    Returns the first and last date of the year containing target_date.
+    """
+    return date(target_date.year, 1, 1), date(target_date.year, 12, 31)
+
+def get_period_range(target_date: date, period: str):
+    """
+    Returns the first and last date of the 'day', 'week', 'month', 'quarter'
+    or 'year' containing target_date.
+    """
+    if period == "day":
+        return target_date, target_date
+    if period == "week":
+        return get_week_range(target_date)
+    if period == "month":
+        return get_month_range(target_date)
+    if period == "quarter":
+        return get_quarter_range(target_date)
+    if period == "year":
+        return get_year_range(target_date)
+    raise ValueError(f"Unknown period: {period!r}")
+
+def get_months_in_range(start_date: date, end_date: date) -> List[Tuple[int, int]]:
+    """
+    Returns (year, month) for every month that overlaps start_date..end_date, inclusive.
+    """
+    months = []
+    if start_date > end_date:
+        return months
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append((year, month))
+        year, month = (year, month + 1) if month < 12 else (year + 1, 1)
+    return months
+
 def get_weekdays_in_range(start_date: date, end_date: date) -> List[date]:
     """
     Returns a list of all weekdays (Mon-Fri) between start_date and end_date, inclusive.
@@ -35,17 +81,74 @@ def get_weekdays_in_range(start_date: date, end_date: date) -> List[date]:
         current += timedelta(days=1)
     return days
 
+def _weekdays_before(ordinal: int) -> int:
+    """
+    Returns the number of weekdays from 0001-01-01 (a Monday) up to but not
+    including the date with the given ordinal.
+    """
+    days = ordinal - 1
+    return days // 7 * 5 + min(days % 7, 5)
+
+class DaysOffCalendar:
+    """
+    Holidays, PTO and other weekdays that don't count towards goals.
+
+    Dates are kept as a sorted list of ordinals, so the days off in any range
+    are counted with two binary searches. Weekend dates are ignored since
+    they are never workdays anyway.
+    """
+    def __init__(self, days: Iterable[date] = ()):
+        self._ordinals = sorted({d.toordinal() for d in days if d.weekday() < 5})
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    def __contains__(self, day: date) -> bool:
+        i = bisect_left(self._ordinals, day.toordinal())
+        return i < len(self._ordinals) and self._ordinals[i] == day.toordinal()
+
+    def count_in_range(self, start_date: date, end_date: date) -> int:
+        """Returns the number of days off between start_date and end_date, inclusive."""
+        return (bisect_right(self._ordinals, end_date.toordinal())
+                - bisect_left(self._ordinals, start_date.toordinal()))
+
+def count_workdays(start_date: date, end_date: date, days_off: Optional[DaysOffCalendar] = None) -> int:
+    """
+    Returns the number of workdays (Mon-Fri, minus any days off) between
+    start_date and end_date, inclusive.
+
+    Constant time in the length of the range, unlike
+    len(get_weekdays_in_range(...)); days off add an O(log n) lookup.
+    """
+    if end_date < start_date:
+        return 0
+    workdays = _weekdays_before(end_date.toordinal() + 1) - _weekdays_before(start_date.toordinal())
+    if days_off:
+        workdays -= days_off.count_in_range(start_date, end_date)
+    return workdays
+
 def get_total_minutes_for_range(chunks: List[WorkChunk], start_date: date, end_date: date) -> int:
     """
     Sums all minutes for entries between start_date and end_date, inclusive.
+
+    chunks may also be any object with its own total_minutes_for_range method
+    (e.g. the DataManager), in which case that is used instead of a scan.
     """
+    range_total = getattr(chunks, "total_minutes_for_range", None)
+    if range_total is not None:
+        return range_total(start_date, end_date)
     return sum(chunk.minutes for chunk in chunks if start_date <= chunk.chunk_date <= end_date)
 
 def get_total_minutes_for_day(chunks: List[WorkChunk], target_date: date) -> int:
     """
     Sum all minutes for a specific date.
+
+    Like get_total_minutes_for_range, chunks may be the DataManager, whose
+    per-day totals are used instead of a scan.
     """
-    #TODO: Can probably refactor this using the day_dict instead of the chunk list
+    day_total = getattr(chunks, "total_minutes_for_day", None)
+    if day_total is not None:
+        return day_total(target_date)
     return sum(chunk.minutes for chunk in chunks if chunk.chunk_date == target_date)
 
 
@@ -54,20 +157,36 @@ def calculate_billed_time(selected_date, period, chunk_list):
     Calculates the sum of billed minutes within a certain period of time.
     
     :param selected_date: The date that the time period is centered around.
-    :param period: Either 'week' or 'month'.
-    :param chunk_list: The list of all recorded chunks. (Taken from the data 
-                                                                        manager)
+    :param period: 'day', 'week', 'month', 'quarter' or 'year'.
+    :param chunk_list: The list of all recorded chunks, or the data manager
+                       itself so its cached period totals can be used.
                                                         
     :return billed_minutes: The sum of billed minutes within the selected time period.
     """
-    if period == "week":
-        #Find the first and last day of the week
-        start, end = get_week_range(selected_date)
-
-    elif period == "month":
-        #Find the first and last day of the month
-        start, end = get_month_range(selected_date)
+    period_total = getattr(chunk_list, "billed_minutes", None)
+    if period_total is not None:
+        return period_total(selected_date, period)
 
+    start, end = get_period_range(selected_date, period)
     billed_minutes = get_total_minutes_for_range(chunk_list, start, end)
     return billed_minutes
-        
\ No newline at end of file
+
+def get_period_totals(chunks, start_date: date, end_date: date, period: str,
+                      daily_goal: int, days_off: Optional[DaysOffCalendar] = None) -> List[dict]:
+    """
+    Billed minutes and goal for each day/week/month/quarter/year between
+    start_date and end_date, inclusive. Periods are clipped to the range.
+
+    :param chunks: Chunks, a ChunkStore or the data manager (see get_total_minutes_for_range).
+    :return: A dict per period with 'start' and 'end' dates, 'billed' and 'goal' minutes.
+    """
+    rows = []
+    day = start_date
+    while day <= end_date:
+        first, last = get_period_range(day, period)
+        first, last = max(first, start_date), min(last, end_date)
+        rows.append({"start": first, "end": last,
+                     "billed": get_total_minutes_for_range(chunks, first, last),
+                     "goal": daily_goal * count_workdays(first, last, days_off)})
+        day = last + timedelta(days=1)
+    return rows
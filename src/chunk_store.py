@@ -0,0 +1,297 @@
+# chunk_store.py
+# Compact columnar storage for work chunks held in memory
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from itertools import groupby, islice
+from operator import lt
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional
+from src.models import WorkChunk, Day
+
+# NumPy is optional (sums fall back to pure Python) and slow to import, so it
+# is only looked for the first time a column operation can use it
+_NOT_LOADED = object()
+np = _NOT_LOADED
+
+
+def _numpy():
+    """Return the numpy module, or None if it isn't installed."""
+    global np
+    if np is _NOT_LOADED:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        np = numpy
+    return np
+
+# Drop deleted rows once there are at least this many and they outnumber live ones
+COMPACT_MIN_DEAD_ROWS = 1024
+
+
+class ChunkStore:
+    """
+    Holds chunks as parallel int columns instead of one object per chunk.
+
+    IDs, date ordinals and minutes are kept in array('i') columns and
+    descriptions are interned in a string table. WorkChunk objects are only
+    created when a chunk is read (iteration, get, chunks_for_day).
+
+    Deleting a chunk marks its row dead; dead rows are dropped in bulk once
+    they outnumber the live ones.
+    """
+    def __init__(self, chunks: Iterable[WorkChunk] = ()):
+        self.ids = array('i')
+        self.ordinals = array('i')
+        self.minutes = array('i')
+        self.descriptions = array('i')  # Index into self.strings
+        self.live = bytearray()
+        self.strings: List[str] = []
+        self._string_refs: Dict[str, int] = {}
+        self._day_rows: Dict[int, array] = {}
+        self._ids_sorted = True
+        self._dead_count = 0
+        self.max_id = 0
+        self.extend(chunks)
+
+    # ---------- Mutation ----------
+
+    def append(self, chunk: WorkChunk) -> int:
+        """Add a chunk and return its row number."""
+        return self.append_values(int(chunk.chunk_id), chunk.chunk_date.toordinal(),
+                                  chunk.minutes, chunk.description)
+
+    def append_values(self, chunk_id: int, ordinal: int, minutes: int, description: str) -> int:
+        """Add a chunk from its raw column values and return its row number."""
+        row = len(self.ids)
+        if row and chunk_id <= self.max_id:
+            self._ids_sorted = False  # Includes an ID repeated after its row was deleted
+        self.max_id = max(self.max_id, chunk_id)
+
+        ref = self._string_refs.get(description)
+        if ref is None:
+            ref = len(self.strings)
+            self.strings.append(description)
+            self._string_refs[description] = ref
+
+        self.ids.append(chunk_id)
+        self.ordinals.append(ordinal)
+        self.minutes.append(minutes)
+        self.descriptions.append(ref)
+        self.live.append(1)
+
+        day_rows = self._day_rows.get(ordinal)
+        if day_rows is None:
+            day_rows = self._day_rows[ordinal] = array('i')
+        day_rows.append(row)
+        return row
+
+    def extend(self, chunks: Iterable[WorkChunk]):
+        for chunk in chunks:
+            self.append(chunk)
+
+    @classmethod
+    def from_columns(cls, ids: array, ordinals: array, minutes: array,
+                     descriptions: array, strings: List[str]) -> 'ChunkStore':
+        """Build a store straight from columns, e.g. ones read from a snapshot (see snapshot.py)."""
+        store = cls()
+        store.ids, store.ordinals, store.minutes, store.descriptions = ids, ordinals, minutes, descriptions
+        store.live = bytearray(b'\x01' * len(ids))
+        store.strings = list(strings)
+        store._string_refs = {text: ref for ref, text in enumerate(store.strings)}
+        store.max_id = max(ids, default=0)
+        store._ids_sorted = all(map(lt, ids, islice(ids, 1, None)))
+        store._index_days()
+        return store
+
+    def copy(self) -> 'ChunkStore':
+        """Return an independent copy holding only the live rows."""
+        if self._dead_count:
+            live_rows = [row for row in range(len(self.ids)) if self.live[row]]
+            columns = [array('i', (column[row] for row in live_rows))
+                       for column in (self.ids, self.ordinals, self.minutes, self.descriptions)]
+        else:
+            columns = [array('i', column)
+                       for column in (self.ids, self.ordinals, self.minutes, self.descriptions)]
+        return ChunkStore.from_columns(*columns, self.strings)
+
+    def remove(self, chunk_id) -> Optional[WorkChunk]:
+        """
+        Delete a chunk by ID.
+
+        :return: The removed chunk, or None if no live chunk had that ID.
+        """
+        row = self._find_row(int(chunk_id))
+        if row is None:
+            return None
+        chunk = self._view(row)
+        self.live[row] = 0
+        self._dead_count += 1
+
+        ordinal = self.ordinals[row]
+        day_rows = self._day_rows[ordinal]
+        day_rows.remove(row)
+        if not day_rows:
+            del self._day_rows[ordinal]
+
+        if self._dead_count >= COMPACT_MIN_DEAD_ROWS and self._dead_count > len(self):
+            self._compact()
+        return chunk
+
+    # ---------- Lookup ----------
+
+    def __len__(self) -> int:
+        return len(self.ids) - self._dead_count
+
+    def __iter__(self) -> Iterator[WorkChunk]:
+        for row in range(len(self.ids)):
+            if self.live[row]:
+                yield self._view(row)
+
+    def __getitem__(self, index: int) -> WorkChunk:
+        """Return the index-th live chunk. O(1) unless rows have been deleted."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ChunkStore index out of range")
+        if not self._dead_count:
+            return self._view(index)
+        for position, chunk in enumerate(self):
+            if position == index:
+                return chunk
+
+    def get(self, chunk_id) -> Optional[WorkChunk]:
+        """Return the chunk with the given ID, or None."""
+        row = self._find_row(int(chunk_id))
+        return None if row is None else self._view(row)
+
+    def chunks_for_day(self, day: date) -> List[WorkChunk]:
+        """Return the chunks recorded on a day, in insertion order."""
+        return [self._view(row) for row in self._day_rows.get(day.toordinal(), ())]
+
+    def ids_for_range(self, start_date: date, end_date: date) -> List[int]:
+        """Return the IDs of chunks between two dates, inclusive, by date then insertion order."""
+        ids, day_rows = self.ids, self._day_rows
+        return [ids[row]
+                for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1)
+                for row in day_rows.get(ordinal, ())]
+
+    def days(self) -> Iterator[date]:
+        """Iterate over every date that has at least one chunk."""
+        return (date.fromordinal(ordinal) for ordinal in self._day_rows)
+
+    def has_day(self, day: date) -> bool:
+        return day.toordinal() in self._day_rows
+
+    def day_count(self) -> int:
+        """Return the number of dates that have at least one chunk."""
+        return len(self._day_rows)
+
+    def columns(self):
+        """Return the (date ordinal, minutes) columns of the live rows, e.g. for analytics.py."""
+        if not self._dead_count:
+            return self.ordinals, self.minutes
+        live = self.live
+        return (array('i', (o for o, alive in zip(self.ordinals, live) if alive)),
+                array('i', (m for m, alive in zip(self.minutes, live) if alive)))
+
+    def daily_minutes(self) -> Dict[int, int]:
+        """Return billed minutes per date ordinal for every day with chunks."""
+        minutes = self.minutes
+        return {ordinal: sum(minutes[row] for row in rows)
+                for ordinal, rows in self._day_rows.items()}
+
+    # ---------- Aggregation ----------
+
+    def total_minutes_for_range(self, start_date: date, end_date: date) -> int:
+        """Sum minutes between start_date and end_date, inclusive, over the columns."""
+        start, end = start_date.toordinal(), end_date.toordinal()
+        np = _numpy()
+        if np is not None:
+            ordinals = np.frombuffer(self.ordinals, dtype=np.intc)
+            mask = (ordinals >= start) & (ordinals <= end)
+            if self._dead_count:
+                mask &= np.frombuffer(self.live, dtype=np.uint8).astype(bool)
+            return int(np.frombuffer(self.minutes, dtype=np.intc)[mask].sum(dtype=np.int64))
+        return sum(m for o, m, alive in zip(self.ordinals, self.minutes, self.live)
+                   if alive and start <= o <= end)
+
+    def total_minutes_for_day(self, target_date: date) -> int:
+        """Sum minutes for a single date."""
+        minutes = self.minutes
+        return sum(minutes[row] for row in self._day_rows.get(target_date.toordinal(), ()))
+
+    # ---------- Internals ----------
+
+    def _view(self, row: int) -> WorkChunk:
+        return WorkChunk(self.ids[row], date.fromordinal(self.ordinals[row]),
+                         self.minutes[row], self.strings[self.descriptions[row]])
+
+    def _find_row(self, chunk_id: int) -> Optional[int]:
+        if self._ids_sorted:
+            row = bisect_left(self.ids, chunk_id)
+            rows = [row] if row < len(self.ids) and self.ids[row] == chunk_id else []
+        else:
+            rows = [row for row, value in enumerate(self.ids) if value == chunk_id]
+        for row in rows:
+            if self.live[row]:
+                return row
+        return None
+
+    def _compact(self):
+        """Rebuild the columns without dead rows."""
+        live_rows = [row for row in range(len(self.ids)) if self.live[row]]
+        for name in ("ids", "ordinals", "minutes", "descriptions"):
+            column = getattr(self, name)
+            setattr(self, name, array('i', (column[row] for row in live_rows)))
+        self.live = bytearray(b'\x01' * len(live_rows))
+        self._dead_count = 0
+        self._ids_sorted = all(map(lt, self.ids, islice(self.ids, 1, None)))
+        self._index_days()
+
+    def _index_days(self):
+        """Rebuild the rows-per-day index from the ordinals column."""
+        # Rows are mostly in date order, so they're added a run of same-day rows at a time
+        self._day_rows = {}
+        ordinals = self.ordinals
+        np = _numpy() if len(ordinals) > 1 else None
+        if np is not None:
+            values = np.frombuffer(ordinals, dtype=np.intc)
+            starts = (np.flatnonzero(values[1:] != values[:-1]) + 1).tolist()
+            runs = ((ordinals[start], range(start, end))
+                    for start, end in zip([0] + starts, starts + [len(ordinals)]))
+        else:
+            runs = groupby(range(len(ordinals)), ordinals.__getitem__)
+        for ordinal, rows in runs:
+            day_rows = self._day_rows.get(ordinal)
+            if day_rows is None:
+                self._day_rows[ordinal] = array('i', rows)
+            else:
+                day_rows.extend(rows)
+
+
+class DayView(Mapping):
+    """
+    Read-only date -> Day mapping over a ChunkStore.
+
+    Stands in for the old dict of Day objects: Day objects are built when a
+    date is looked up instead of being kept for every date.
+    """
+    def __init__(self, store: ChunkStore):
+        self.store = store
+
+    def __getitem__(self, day: date) -> Day:
+        if not self.store.has_day(day):
+            raise KeyError(day)
+        return Day(day, self.store.chunks_for_day(day))
+
+    def __contains__(self, day) -> bool:
+        return isinstance(day, date) and self.store.has_day(day)
+
+    def __iter__(self) -> Iterator[date]:
+        return self.store.days()
+
+    def __len__(self) -> int:
+        return self.store.day_count()
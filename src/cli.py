@@ -0,0 +1,257 @@
+# cli.py
+# Command line interface for scripts and cron jobs. Never imports Qt.
+#
+#     python -m src.cli import entries.csv|entries.json|entries.jsonl|-
+#     python -m src.cli report --from 2025-01-01 --to 2025-12-31 --period month [--json]
+#     python -m src.cli export [--from DATE] [--to DATE] [--format csv|jsonl] [-o FILE]
+#
+# --storage and --file pick the storage backend and data file (defaults from config.py).
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+from datetime import date
+from typing import Iterable, List
+from src import config
+from src.calculations import DaysOffCalendar, get_period_totals
+from src.chunk_store import ChunkStore
+from src.models import WorkChunk, parse_iso_date
+from src.storage import DAYS_OFF_FILENAME, get_storage, load_days_off
+
+DEFAULT_DAILY_GOAL = 480
+HEADER = ['ID', 'Date', 'Minutes', 'Description']
+FORMATS = ("csv", "json", "jsonl")
+
+
+class InputError(ValueError):
+    """An entry to import is malformed."""
+
+
+# ---------- Import ----------
+
+def read_entries(stream, fmt: str) -> List[WorkChunk]:
+    """
+    Parse entries to import. IDs in the input are ignored; storage assigns new ones.
+
+    :param fmt: "csv" (with Date, Minutes and optional Description columns, as
+                written by export), "json" (a list of objects) or "jsonl" (one
+                object per line). Objects have date, minutes and optional
+                description keys.
+    :raises InputError: On the first malformed entry, naming where it is.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        fields = {name.lower(): name for name in reader.fieldnames or []}
+        if "date" not in fields or "minutes" not in fields:
+            raise InputError("CSV input needs Date and Minutes columns")
+        if fields != {name: name for name in fields}:
+            reader.fieldnames = [name.lower() for name in reader.fieldnames]
+        records = ((row, f"line {reader.line_num}") for row in reader)
+    elif fmt == "json":
+        try:
+            data = json.load(stream)
+        except ValueError as e:
+            raise InputError(f"invalid JSON: {e}")
+        if not isinstance(data, list):
+            raise InputError("JSON input must be a list of entries")
+        records = ((record, f"entry {i + 1}") for i, record in enumerate(data))
+    elif fmt == "jsonl":
+        records = _json_lines(stream)
+    else:
+        raise InputError(f"unknown format {fmt!r}")
+    return [_to_chunk(record, where) for record, where in records]
+
+
+def _json_lines(stream):
+    for line_num, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), f"line {line_num}"
+        except ValueError as e:
+            raise InputError(f"line {line_num}: invalid JSON: {e}")
+
+
+def _to_chunk(record, where: str) -> WorkChunk:
+    if not isinstance(record, dict):
+        raise InputError(f"{where}: expected an object")
+    if "date" not in record or "minutes" not in record:
+        record = {str(key).lower(): value for key, value in record.items()}
+    try:
+        chunk_date = parse_iso_date(str(record["date"]).strip())
+        minutes = int(record["minutes"])
+    except KeyError as e:
+        raise InputError(f"{where}: missing {e.args[0]}")
+    except (TypeError, ValueError) as e:
+        raise InputError(f"{where}: {e}")
+    if minutes <= 0:
+        raise InputError(f"{where}: minutes must be positive")
+    return WorkChunk(0, chunk_date, minutes, str(record.get("description") or "").strip())
+
+
+def import_entries(storage, chunks: List[WorkChunk]) -> int:
+    """Store chunks with a single append_chunks call. Returns how many were stored."""
+    if chunks:
+        storage.append_chunks(chunks)
+    return len(chunks)
+
+
+# ---------- Reports ----------
+
+def build_report(storage, start_date: date, end_date: date, period: str = "month",
+                 daily_goal: int = DEFAULT_DAILY_GOAL, days_off=None) -> dict:
+    """
+    Total billed minutes per day/week/month/quarter/year between two dates,
+    with goals. Periods are clipped to the range.
+
+    Only the chunks in the range are read from storage.
+    """
+    store = ChunkStore(storage.load_chunks_in_range(start_date, end_date))
+    return report_dict(get_period_totals(store, start_date, end_date, period, daily_goal, days_off),
+                       start_date, end_date, period)
+
+
+def report_dict(rows, start_date: date, end_date: date, period: str) -> dict:
+    """Return get_period_totals rows as JSON-compatible data, with overall totals."""
+    return {"from": start_date.isoformat(), "to": end_date.isoformat(), "period": period,
+            "rows": [{**row, "start": row["start"].isoformat(), "end": row["end"].isoformat()}
+                     for row in rows],
+            "billed": sum(row["billed"] for row in rows),
+            "goal": sum(row["goal"] for row in rows)}
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'Period':<24}{'Billed':>9}{'Goal':>9}{'%':>6}"]
+    for row in report["rows"] + [{"start": "Total", "end": "Total", **report}]:
+        label = row["start"] if row["start"] == row["end"] else f"{row['start']}..{row['end'][5:]}"
+        percent = f"{100 * row['billed'] / row['goal']:.0f}" if row["goal"] else "-"
+        lines.append(f"{label:<24}{_hours(row['billed']):>9}{_hours(row['goal']):>9}{percent:>6}")
+    return "\n".join(lines)
+
+
+def _hours(minutes: int) -> str:
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+# ---------- Export ----------
+
+def iter_chunks(storage, start_date: date = None, end_date: date = None) -> Iterable[WorkChunk]:
+    """Yield the stored chunks, optionally only those between two dates."""
+    if start_date is None and end_date is None:
+        return storage.iter_chunks()
+    return storage.load_chunks_in_range(start_date or date.min, end_date or date.max)
+
+
+def export_chunks(chunks: Iterable[WorkChunk], out, fmt: str = "csv") -> int:
+    """Write chunks to out as they are read. Returns how many were written."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(HEADER)
+        for chunk in chunks:
+            writer.writerow(chunk.to_csv_row())
+            count += 1
+    elif fmt == "jsonl":
+        # Lines are formatted by hand; dates and descriptions repeat, so each is encoded once
+        dates, descriptions = {}, {}
+        encode = json.JSONEncoder().encode
+        for chunk in chunks:
+            day = dates.get(chunk.chunk_date)
+            if day is None:
+                day = dates[chunk.chunk_date] = chunk.chunk_date.isoformat()
+            description = descriptions.get(chunk.description)
+            if description is None:
+                description = descriptions[chunk.description] = encode(chunk.description)
+            out.write(f'{{"id": {chunk.chunk_id}, "date": "{day}", "minutes": {chunk.minutes}, '
+                      f'"description": {description}}}\n')
+            count += 1
+    else:
+        raise ValueError(f"unknown export format {fmt!r}")
+    return count
+
+
+# ---------- Command line ----------
+
+def _format_for(path: str, given: str = None) -> str:
+    if given:
+        return given
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return extension if extension in FORMATS else "csv"
+
+
+def _parse_date(text: str) -> date:
+    try:
+        return parse_iso_date(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {text!r}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Work Billing Tracker without the GUI.")
+    parser.add_argument("--storage", choices=("csv", "sqlite", "partitioned"),
+                        help="Storage backend (default: config.STORAGE_BACKEND)")
+    parser.add_argument("--file", help="Data file or directory for the backend")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Add entries from a CSV, JSON or JSON Lines file")
+    importer.add_argument("input", help="File to read, or - for stdin")
+    importer.add_argument("--format", choices=FORMATS, help="Input format (default: from the extension, else csv)")
+
+    report = commands.add_parser("report", help="Billed time per period between two dates")
+    report.add_argument("--from", dest="start", type=_parse_date, required=True)
+    report.add_argument("--to", dest="end", type=_parse_date, required=True)
+    report.add_argument("--period", choices=("day", "week", "month", "quarter", "year"), default="month")
+    report.add_argument("--goal", type=int, default=DEFAULT_DAILY_GOAL, help="Minutes per workday")
+    report.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+
+    export = commands.add_parser("export", help="Write entries as CSV or JSON Lines")
+    export.add_argument("--from", dest="start", type=_parse_date)
+    export.add_argument("--to", dest="end", type=_parse_date)
+    export.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    export.add_argument("-o", "--output", help="File to write (default: stdout)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    storage = get_storage(args.storage, args.file)
+    try:
+        if args.command == "import":
+            fmt = _format_for(args.input, args.format)
+            try:
+                if args.input == "-":
+                    chunks = read_entries(io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline=''), fmt)
+                else:
+                    with open(args.input, mode='r', newline='', encoding='utf-8') as f:
+                        chunks = read_entries(f, fmt)
+            except InputError as e:
+                print(f"error: {args.input}: {e}; nothing imported", file=sys.stderr)
+                return 1
+            print(f"Imported {import_entries(storage, chunks)} entries", file=sys.stderr)
+
+        elif args.command == "report":
+            days_off = DaysOffCalendar(load_days_off(config.DAYS_OFF_FILE or DAYS_OFF_FILENAME))
+            report = build_report(storage, args.start, args.end, args.period, args.goal, days_off)
+            print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+        elif args.command == "export":
+            chunks = iter_chunks(storage, args.start, args.end)
+            if args.output:
+                with open(args.output, mode='w', newline='', encoding='utf-8') as f:
+                    export_chunks(chunks, f, args.format)
+            else:
+                export_chunks(chunks, sys.stdout, args.format)
+    except BrokenPipeError:
+        # The reader (e.g. `| head`) went away; stop quietly
+        sys.stdout = open(os.devnull, mode='w')
+    finally:
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
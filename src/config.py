@@ -0,0 +1,27 @@
+# config.py
+# Runtime settings for the Work Billing Tracker. Each one can be overridden
+# with an environment variable.
+
+import os
+
+# Which storage backend DataManager uses: "csv", "sqlite" or "partitioned"
+STORAGE_BACKEND = os.environ.get("BILLING_TRACKER_STORAGE", "csv")
+
+# Open the GUI with only the current month loaded and read the rest of the
+# history in the background. Set to "0" to load everything up front.
+LAZY_LOAD = os.environ.get("BILLING_TRACKER_LAZY_LOAD", "1") != "0"
+
+# Time each phase of a GUI refresh and print a summary on exit (see profiling.py)
+PROFILE = os.environ.get("BILLING_TRACKER_PROFILE", "0") == "1"
+
+# File of holiday/PTO dates (one ISO date per line) excluded from goals.
+# Defaults to days_off.txt in the project root (see storage.py).
+DAYS_OFF_FILE = os.environ.get("BILLING_TRACKER_DAYS_OFF")
+
+# Write changes to storage on a background thread so the window never waits
+# on disk I/O (see persistence.py). Set to "0" to write synchronously.
+BACKGROUND_WRITES = os.environ.get("BILLING_TRACKER_BACKGROUND_WRITES", "1") != "0"
+
+# Write-ahead journal in front of the storage backend (see journal.py): the
+# fsync policy to use ("always", "interval" or "never"), or "off".
+JOURNAL = os.environ.get("BILLING_TRACKER_JOURNAL", "off")
@@ -1,7 +1,18 @@
 # data_manager.py
+import threading
 from datetime import date
-from src.models import WorkChunk, Day
-from src.storage import load_chunks_from_csv, save_chunks_to_csv
+from src.models import WorkChunk
+from src.aggregates import DailyTotalsIndex, RollupCache
+from src.calculations import get_month_range, get_months_in_range, get_period_range, get_week_range
+from src.chunk_store import ChunkStore, DayView
+from src.file_lock import file_lock
+from src.storage import get_storage, load_sidecar, save_sidecar
+
+# Saved next to the data file; see RollupCache
+ROLLUP_SUFFIX = ".rollups.json"
+
+# Seconds after a write before the storage snapshot is refreshed (see snapshot.py)
+SNAPSHOT_DELAY = 5.0
 
 
 class DataManager:
@@ -9,75 +20,513 @@ class DataManager:
     Represents a Data Management object for the Billing Tracker. Responsible for
     managing time chunks.
 
+    All writes should go through this class. Mutations are applied to the
+    in-memory structures in place and only the changed rows are persisted, so
+    storage never needs to be reread after a write.
+
     Attributes:
-        chunks(list): A list of all recorded time chunk objects. (See models.py)
-        days_dict: A dictionary that sorts all recorded time chunk objects from
-                   the chunks list by date.
+        chunks(ChunkStore): All recorded time chunks, stored in columns.
+                            Iterating yields WorkChunk objects. (See chunk_store.py)
+        days_dict: A read-only mapping of date -> Day over the chunks.
+        daily_totals: DailyTotalsIndex of billed minutes per day, used for
+                      range totals. (See aggregates.py)
+        rollups: RollupCache of billed minutes per day, week and month, used
+                 for period stats. Saved next to the data file so a lazy load
+                 has every total before the history is read.
+        totals_version(int): Bumped whenever any day's total changes, so
+                             views caching totals (e.g. the calendar
+                             heatmap) can tell when to recompute.
+        storage: The StorageBackend chunks are persisted to. (See storage.py)
+        filename: Path of the file the storage backend uses.
+        history_loaded(bool): False while a lazy load is still reading the
+                              full history in the background.
+        writer: PersistenceWorker that applies writes in the background, or
+                None if writes go straight to storage. (See persistence.py)
+        search_index: DescriptionIndex for search(), built on the first
+                      search and then kept up to date, or None before that.
+                      (See search_index.py)
+        on_renumbered: Called (on the writer's thread) with {old ID: new ID}
+                       after background-written chunks had to take other IDs
+                       than the ones add_chunks returned, because another
+                       process wrote first. Views holding IDs should refresh.
+        on_history_loaded: Called (on the loading thread) once a lazy load has
+                           read the full history, so views can show it.
     """
-    def __init__(self):
-        self.chunks = []
-        self.days_dict = {}
-        self.load_data()
+    def __init__(self, filename=None, storage=None, lazy=False, background_writes=False):
+        """
+        :param filename: Data file for the configured backend. Ignored if
+                         storage is given.
+        :param storage: StorageBackend to use instead of the configured one.
+        :param lazy: Load only the current month and week up front and read
+                     the rest of the history on a background thread.
+        :param background_writes: Update memory immediately and leave writing
+                                  to storage to a background worker. Set its
+                                  on_error to be told about failed writes.
+        """
+        self.chunks = ChunkStore()
+        self.days_dict = DayView(self.chunks)
+        self.daily_totals = DailyTotalsIndex()
+        self.rollups = RollupCache()
+        self.search_index = None
+        self.totals_version = 0
+        self.storage = storage or get_storage(filename=filename)
+        self.filename = self.storage.filename
+        self.history_loaded = True
+        self._totals_complete = True
+        self._rollups_saved = False
+        self._loaded_months = set()
+        self._history_thread = None
+        self._lock = threading.RLock()
+        self._last_id = None  # Highest ID handed out; read from storage on first add
+        self.on_renumbered = None
+        self.on_history_loaded = None
+        self.writer = None
+        if background_writes:
+            from src.persistence import PersistenceWorker  # Pulls in concurrent.futures; only needed here
+            self.writer = PersistenceWorker(self.storage, on_renumber=self._renumber_chunks)
+        self._snapshot_timer = None
+        self._snapshot_dirty = False
+        self._change_cursor = None  # Point in storage up to which writes are in memory
+        # IDs this process deleted. Their rows may still turn up when storage changes are
+        # read (e.g. a journal checkpoint writes the row before the delete), and are skipped.
+        self._deleted_ids = set()
+        if lazy:
+            self.start_lazy_load()
+        else:
+            self.load_data()
 
     def load_data(self):
-        """Load chunks from CSV and build day dictionary."""
-        self.chunks = load_chunks_from_csv()
-        self.days_dict = self._create_day_dict(self.chunks)
+        """Load chunks from storage and build day dictionary."""
+        self.wait_for_history()
+        self.flush()
+        self._last_id = None
+        # Taken first, so anything written during the load is picked up by apply_external_changes
+        self._change_cursor = self.storage.change_cursor()
+        self._set_chunks(self.storage.load_store())
+        self._save_rollups_if_needed()
+
+    def flush(self):
+        """Block until every background write has reached storage."""
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        """Finish background writes, save the snapshot and rollup cache if they changed and release storage."""
+        self.wait_for_history()
+        if self._snapshot_timer is not None:
+            self._snapshot_timer.cancel()
+            self._snapshot_timer.join()
+        if self.writer is not None:
+            self.writer.close()
+        if self._snapshot_dirty:
+            with self._lock:
+                self._save_snapshot(self.chunks, self._change_cursor)
+            self._snapshot_dirty = False
+        # Closing may still write (e.g. a journal checkpoint), so the rollups are saved after it
+        self.storage.close()
+        self._save_rollups_if_needed()
+
+    # ---------- Lazy loading ----------
+
+    def start_lazy_load(self, today=None):
+        """
+        Load the month and week containing today, then start reading the full
+        history on a background thread.
+
+        Until it finishes, other months are loaded on demand by
+        ensure_range_loaded, and writes wait for it (see wait_for_history).
+        """
+        today = today or date.today()
+        week_start, week_end = get_week_range(today)
+        month_start, month_end = get_month_range(today)
+
+        self.history_loaded = False
+        self._loaded_months = set()
+        self._set_chunks(ChunkStore())
+        saved = load_sidecar(self.filename, ROLLUP_SUFFIX, self.storage.signature())
+        self._totals_complete = saved is not None
+        if saved is not None:
+            self._set_totals(RollupCache.from_dict(saved))
+            self._rollups_saved = True
+        self.ensure_range_loaded(min(week_start, month_start), max(week_end, month_end))
+
+        self._history_thread = threading.Thread(target=self._load_history, daemon=True)
+        self._history_thread.start()
+
+    def ensure_range_loaded(self, start_date, end_date):
+        """
+        Make sure every month overlapping start_date..end_date is in memory.
+        A no-op once the full history has loaded.
+        """
+        if self.history_loaded:
+            return
+        with self._lock:
+            if self.history_loaded:
+                return
+            for year, month in get_months_in_range(start_date, end_date):
+                if (year, month) in self._loaded_months:
+                    continue
+                first, last = get_month_range(date(year, month, 1))
+                for chunk in self.storage.load_chunks_in_range(first, last):
+                    if self._totals_complete:
+                        self.chunks.append(chunk)  # Already counted in the saved rollups
+                    else:
+                        self._insert_chunk(chunk)
+                self._loaded_months.add((year, month))
+
+    def wait_for_history(self):
+        """Block until a background history load (if any) has finished."""
+        thread = self._history_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def _load_history(self):
+        self._change_cursor = self.storage.change_cursor()
+        store = self.storage.load_store()
+        with self._lock:
+            rollups_saved = self._rollups_saved
+            self._set_chunks(store)
+            self._rollups_saved = rollups_saved
+            self.history_loaded = True
+        self._save_rollups_if_needed()
+        if self.on_history_loaded is not None:
+            self.on_history_loaded()
+
+    # ---------- Writes ----------
 
     def save_chunks(self, new_chunks, append=True):
-        """Save chunks to CSV and reload local cache."""
-        save_chunks_to_csv(new_chunks, append=append)
-        self.load_data()
+        """
+        Save chunks to storage and update the local cache to match.
+
+        Appended chunks are added to the cache as they are; an overwrite
+        replaces the cache with new_chunks. Neither case rereads storage.
+        """
+        self.wait_for_history()
+        self.flush()
+        self._last_id = None
+        self._snapshot_dirty = True
+        if append:
+            self.storage.append_chunks(new_chunks)
+            for chunk in new_chunks:
+                self._insert_chunk(chunk)
+        else:
+            self.storage.replace_chunks(new_chunks)
+            self._change_cursor = self.storage.change_cursor()
+            self._set_chunks(new_chunks)
 
     def delete_chunk(self, chunk_id):
-        """Delete a chunk by ID and persist changes."""
-        self.chunks = [c for c in self.chunks if c.chunk_id != str(chunk_id)]
-        self.save_chunks(self.chunks, append=False)
+        """
+        Delete a chunk by ID and persist changes.
+
+        Only the deleted chunk is written (as a tombstone for the CSV
+        backend), so other chunks keep their IDs. See compact().
+
+        :return: True if a chunk with that ID existed.
+        """
+        self.wait_for_history()
+        chunk = self.chunks.get(chunk_id)
+        if chunk is None:
+            return False
+        if self.writer is not None:
+            with self._lock:
+                self.writer.delete(chunk.chunk_id, chunk.chunk_date)
+                self._remove_chunk(chunk)
+                self._deleted_ids.add(chunk.chunk_id)
+            self._schedule_snapshot()
+        else:
+            self.storage.delete_chunk(chunk.chunk_id, chunk.chunk_date)
+            with self._lock:
+                self._remove_chunk(chunk)
+                self._deleted_ids.add(chunk.chunk_id)
+            self._snapshot_dirty = True
+        return True
+
+    def compact(self):
+        """Drop deleted rows from storage. IDs of the remaining chunks don't change."""
+        self.wait_for_history()
+        self.flush()
+        # Compacting rewrites the data, so other processes' writes are applied first
+        # and the file stays locked until the cursor has moved past the rewrite
+        with self._lock, file_lock(self.filename):
+            changes = self.storage.read_changes(self._change_cursor)
+            self.storage.compact()
+            self._last_id = None
+            if changes is not None:
+                self._apply_changes(*changes)
+                self._change_cursor = self.storage.change_cursor()
+        if changes is None:
+            # After the locks are released: load_data flushes the writer, whose queued
+            # writes (and snapshot saves) need them
+            self.load_data()
+
+    def apply_external_changes(self):
+        """
+        Bring memory up to date with writes other processes made to storage,
+        applying just the new rows and deletes. If the data was rewritten
+        (e.g. compacted) it is loaded again in full.
+
+        Does nothing while a lazy load or this process's own background
+        writes are still running; call again once they finish.
+
+        :return: True if anything changed.
+        """
+        if not self.history_loaded:
+            return False
+        with self._lock:
+            if self.writer is not None and not self.writer.idle():
+                return False
+            changes = self.storage.read_changes(self._change_cursor)
+            if changes is None:
+                self.load_data()
+                return True
+            return self._apply_changes(*changes)
+
+    def _apply_changes(self, chunks, deleted_ids, cursor):
+        """Apply a read_changes result, skipping rows this process already has or deleted."""
+        self._change_cursor = cursor
+        changed = False
+        for chunk in chunks:
+            if chunk.chunk_id not in self._deleted_ids and self.chunks.get(chunk.chunk_id) is None:
+                self._insert_chunk(chunk)
+                changed = True
+        for chunk_id in deleted_ids:
+            chunk = self.chunks.get(chunk_id)
+            if chunk is not None:
+                self._remove_chunk(chunk)
+                changed = True
+        if changed:
+            self._last_id = None  # Other processes have used IDs too
+            self._snapshot_dirty = True
+        return changed
 
     def add_chunks(self, selected_date, minute_chunks, description):
-        """Create and save new chunks for a date."""
+        """
+        Create and save new chunks for a date.
+
+        :return: The new chunk objects, with their assigned IDs.
+        """
+        self.wait_for_history()
+        if self.writer is not None:
+            return self._add_chunks_in_background(selected_date, minute_chunks, description)
         max_id = self.get_max_id()
         new_chunks = []
 
         for m in minute_chunks:
             max_id += 1
             new_chunks.append(
-                WorkChunk(str(max_id), selected_date, m, description.strip())
+                WorkChunk(max_id, selected_date, m, description.strip())
             )
 
         self.save_chunks(new_chunks, append=True)
+        return new_chunks
+
+    def _add_chunks_in_background(self, selected_date, minute_chunks, description):
+        # Hand out the IDs storage will assign, so the chunks can be shown before they're
+        # written. Storage is checked every time, as other processes may have appended since;
+        # if one still gets in first, _renumber_chunks moves the chunks to the IDs they got.
+        with file_lock(self.filename, shared=True):
+            stored_last_id = self.storage.last_id()
+        new_chunks = []
+        with self._lock:
+            self._last_id = max(self._last_id or 0, stored_last_id, self.chunks.max_id)
+            for m in minute_chunks:
+                self._last_id += 1
+                new_chunks.append(WorkChunk(self._last_id, selected_date, m, description.strip()))
+            for chunk in new_chunks:
+                self._insert_chunk(chunk)
+            self.writer.append(new_chunks)
+        self._schedule_snapshot()
+        return new_chunks
+
+    def _renumber_chunks(self, renumbered):
+        """Writer callback: give chunks the IDs storage actually assigned them."""
+        with self._lock:
+            # Under the lock, so no delete can be queued with an ID that is about to change
+            renumbered = self.writer.renumber_pending(renumbered)
+            renumbered = {old: new for old, new in renumbered.items() if old != new}
+            moved = [chunk for chunk in map(self.chunks.get, renumbered) if chunk is not None]
+            for chunk in moved:
+                self._remove_chunk(chunk)
+            for chunk in moved:
+                self._insert_chunk(WorkChunk(renumbered[chunk.chunk_id], chunk.chunk_date,
+                                             chunk.minutes, chunk.description))
+            self._deleted_ids = {renumbered.get(chunk_id, chunk_id) for chunk_id in self._deleted_ids}
+            self._last_id = max([self._last_id or 0] + list(renumbered.values()))
+            self._snapshot_dirty = True
+        if self.on_renumbered is not None:
+            self.on_renumbered(renumbered)
+
+    def get_chunk(self, chunk_id):
+        """Return the chunk with the given ID, or None."""
+        return self.chunks.get(chunk_id)
+
+    def chunk_ids_for_range(self, start_date, end_date):
+        """Return the IDs of chunks between two dates, inclusive, ordered by date."""
+        self.ensure_range_loaded(start_date, end_date)
+        return self.chunks.ids_for_range(start_date, end_date)
+
+    def total_minutes_for_range(self, start_date, end_date):
+        """
+        Sum minutes between start_date and end_date, inclusive, in O(log N).
+
+        Lets DataManager be passed to calculations.py wherever a chunk list
+        is expected.
+        """
+        if not self._totals_complete:
+            self.ensure_range_loaded(start_date, end_date)
+        return self.daily_totals.total_for_range(start_date, end_date)
+
+    def total_minutes_for_day(self, target_date):
+        """Sum minutes for a single date in O(1)."""
+        return self.billed_minutes(target_date, "day")
+
+    def billed_minutes(self, target_date, period):
+        """
+        Return the minutes billed in the 'day', 'week', 'month', 'quarter' or
+        'year' containing target_date, from the rollup cache.
+
+        Used by calculations.calculate_billed_time when given the DataManager.
+        """
+        start, end = get_period_range(target_date, period)
+        if not self._totals_complete:
+            self.ensure_range_loaded(start, end)
+        return getattr(self.rollups, period)(target_date)
+
+    def search(self, query, start_date=None, end_date=None):
+        """
+        Find chunks whose description contains every word of query (the last
+        word may be a prefix), optionally between two dates, inclusive.
+
+        The first search indexes every description; later searches and
+        writes only touch the index incrementally.
+
+        :return: A search_index.SearchResult with the summed minutes, match
+                 count and chunk_ids().
+        """
+        self.wait_for_history()
+        with self._lock:
+            if self.search_index is None:
+                from src.search_index import DescriptionIndex
+                self.search_index = DescriptionIndex(self.chunks)
+            return self.search_index.search(query, start_date, end_date)
+
+    def daily_minutes_for_range(self, start_date, end_date):
+        """Return {date ordinal: minutes} for every day with billed time between two dates, inclusive."""
+        if not self._totals_complete:
+            self.ensure_range_loaded(start_date, end_date)
+        daily = self.rollups.daily
+        return {ordinal: daily[ordinal]
+                for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1)
+                if ordinal in daily}
 
     def get_max_id(self):
         """Get highest existing chunk ID, or 0 if empty."""
-        if self.chunks:
-            return max(int(c.chunk_id) for c in self.chunks)
-        return 0
+        self.wait_for_history()
+        return self.chunks.max_id
 
-    def _create_day_dict(self, chunks):
+    # ---------- In-memory indexes ----------
+
+    def _set_chunks(self, chunks):
         """
-        Build a dictionary of Day objects keyed by date.
-        
-        :param chunks: List of chunk objects to build dictionary.
+        Replace the cache with chunks and rebuild every index from them.
+
+        :param chunks: Iterable of chunks, or a ChunkStore to use as it is.
         """
-        days_dict = {}
-        for chunk in chunks:
-            if chunk.chunk_date not in days_dict:
-                days_dict[chunk.chunk_date] = Day(chunk.chunk_date, [])
-            days_dict[chunk.chunk_date].chunks.append(chunk)
-        return days_dict
+        self.chunks = chunks if isinstance(chunks, ChunkStore) else ChunkStore(chunks)
+        self.days_dict = DayView(self.chunks)
+        self._set_totals(RollupCache(self.chunks))
+        self.search_index = None
+        self._deleted_ids = set()  # chunks is what storage holds now
+        self._totals_complete = True
+        self._rollups_saved = False
+
+    def _set_totals(self, rollups):
+        """Use rollups for period stats and build the range index from them."""
+        self.rollups = rollups
+        self.daily_totals = DailyTotalsIndex(rollups)
+        self.totals_version += 1
+
+    def _insert_chunk(self, chunk):
+        """Add a single chunk to the cache and every index."""
+        self.chunks.append(chunk)
+        self.daily_totals.add(chunk.chunk_date, chunk.minutes)
+        self.rollups.add(chunk.chunk_date, chunk.minutes)
+        self.totals_version += 1
+        if self.search_index is not None:
+            self.search_index.add(chunk)
+        self._rollups_saved = False
+
+    def _remove_chunk(self, chunk):
+        """Remove a single chunk from the cache and every index."""
+        self.chunks.remove(chunk.chunk_id)
+        self.daily_totals.add(chunk.chunk_date, -chunk.minutes)
+        self.rollups.add(chunk.chunk_date, -chunk.minutes)
+        self.totals_version += 1
+        if self.search_index is not None:
+            self.search_index.remove(chunk)
+        self._rollups_saved = False
 
-    def add_chunks_to_day(self, date, chunks):
+    def _schedule_snapshot(self):
+        """Queue a fresh storage snapshot once writes have been quiet for SNAPSHOT_DELAY."""
+        self._snapshot_dirty = True
+        if self._snapshot_timer is not None:
+            self._snapshot_timer.cancel()
+        self._snapshot_timer = threading.Timer(SNAPSHOT_DELAY, self._queue_snapshot)
+        self._snapshot_timer.daemon = True
+        self._snapshot_timer.start()
+
+    def _queue_snapshot(self):
+        # Copied under the lock, so the copy holds exactly the writes queued so far
+        with self._lock:
+            store, cursor = self.chunks.copy(), self._change_cursor
+            self.writer.snapshot(lambda: self._save_snapshot(store, cursor))
+            self._snapshot_dirty = False
+
+    def _save_snapshot(self, store, cursor):
         """
-        Adds chunks from a list of chunks to a day object.
-        
-        :param date: Date for chunks to be added to.
-        :param chunks: List of chunk objects to add to day.
+        Save store as the storage snapshot (see snapshot.py), but only if it
+        holds exactly what storage does: everything written since cursor,
+        by this process or another, must already be in it. Otherwise the
+        snapshot is left stale and the next launch reads the data itself.
+
+        :return: True if the snapshot was saved.
         """
-        if date not in self.days_dict:
-            day_obj = Day(date, chunks)
-            self.days_dict[date] = day_obj
-            
-        day_obj = self.days_dict[date]
+        # Locked, so nothing is written between the check and the signature the snapshot is saved under
+        with file_lock(self.filename):
+            if not self._matches_storage(store, cursor):
+                return False
+            self.storage.save_snapshot(store)
+            return True
 
-        for chunk in chunks:
-            day_obj.chunks.append(chunk)
\ No newline at end of file
+    def _save_rollups_if_needed(self):
+        """
+        Save the rollup cache next to the data file if it changed. Like the
+        snapshot, it is only saved while memory holds exactly what storage
+        does, so it is never filed under a signature it doesn't match.
+        """
+        with self._lock:
+            if self._rollups_saved or not self._totals_complete:
+                return
+            if self.writer is not None and not self.writer.idle():
+                return
+            with file_lock(self.filename):
+                if not self._matches_storage(self.chunks, self._change_cursor):
+                    return
+                save_sidecar(self.filename, ROLLUP_SUFFIX, self.storage.signature(),
+                             self.rollups.to_dict())
+            self._rollups_saved = True
+
+    def _matches_storage(self, store, cursor):
+        """
+        Return True if store holds every write made to storage since cursor.
+        Call with the file lock held.
+        """
+        changes = self.storage.read_changes(cursor)
+        if changes is None:
+            return False
+        chunks, deleted_ids, _ = changes
+        deleted_ids = set(deleted_ids)
+        if any(chunk.chunk_id not in deleted_ids and store.get(chunk.chunk_id) is None
+               for chunk in chunks):
+            return False
+        return not any(store.get(chunk_id) is not None for chunk_id in deleted_ids)
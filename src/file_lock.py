@@ -0,0 +1,105 @@
+# file_lock.py
+# Advisory locks shared between processes working on the same data file.
+#
+# The lock is taken on a separate <data file>.lock file, so the data file
+# itself can be replaced (see atomic_write) while the lock is held.
+
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows; locks are then only held between threads of this process
+    fcntl = None
+
+LOCK_SUFFIX = ".lock"
+
+_registry_lock = threading.Lock()
+_locks = {}  # lock file path -> _HeldLock
+
+
+class _HeldLock:
+    """One process-wide lock on a lock file, reentrant for the thread holding it."""
+    def __init__(self, path: str):
+        self.path = path
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.exclusive = False
+        self.fd = None
+
+    def acquire(self, shared: bool):
+        self.thread_lock.acquire()
+        try:
+            if self.depth == 0:
+                self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._flock(shared)
+            elif not shared and not self.exclusive:
+                # Nested write inside a read: upgrade until the outermost release
+                self._flock(shared=False)
+        except BaseException:
+            if self.depth == 0 and self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+            self.thread_lock.release()
+            raise
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        if self.depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+            self.exclusive = False
+        self.thread_lock.release()
+
+    def _flock(self, shared: bool):
+        self.exclusive = not shared
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+
+
+@contextmanager
+def file_lock(filename: str, shared: bool = False):
+    """
+    Hold an advisory lock on filename for the duration of the block.
+
+    Writers take it exclusively and readers shared, so a reader never sees a
+    write half done and two writers never interleave. Nesting is allowed on
+    the same thread; other threads of the process wait as if they were
+    another process.
+
+    :param shared: Take a read (shared) lock instead of a write lock.
+    """
+    path = os.path.abspath(filename) + LOCK_SUFFIX
+    with _registry_lock:
+        held = _locks.get(path)
+        if held is None:
+            held = _locks[path] = _HeldLock(path)
+    held.acquire(shared)
+    try:
+        yield
+    finally:
+        held.release()
+
+
+@contextmanager
+def atomic_write(filename: str, mode: str = 'w', **open_kwargs):
+    """
+    Open a temporary file to write filename's new contents to. On a clean
+    exit it is synced and renamed over filename, so readers see either the
+    old file or the new one, never a partial rewrite.
+    """
+    temp_filename = filename + ".tmp"
+    try:
+        with open(temp_filename, mode=mode, **open_kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+    os.replace(temp_filename, filename)
@@ -0,0 +1,278 @@
+# journal.py
+# Write-ahead journal in front of a storage backend.
+#
+# New chunks and deletes are appended to <data file>.journal, one JSON record
+# per line, and only copied into the backend at a checkpoint: when the
+# journal reaches CHECKPOINT_RECORDS records, before any read, and on close.
+# A journal left behind by a crash is replayed when the storage is opened.
+
+import json
+import os
+import threading
+import time
+from datetime import date
+from typing import Dict, List
+from src.file_lock import file_lock
+from src.models import WorkChunk, parse_iso_date
+from src.storage import StorageBackend, file_signature
+
+JOURNAL_SUFFIX = ".journal"
+CHECKPOINT_RECORDS = 1000
+
+# fsync policies: after every commit, at most once per FSYNC_INTERVAL seconds, or never
+FSYNC_POLICIES = ("always", "interval", "never")
+FSYNC_INTERVAL = 1.0
+
+
+class Journal:
+    """
+    An append-only file of JSON records.
+
+    commit() writes a group of records with a single write and (depending on
+    the fsync policy) a single fsync, so a burst of inserts costs one sync.
+    """
+    def __init__(self, filename: str, fsync: str = "always"):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync!r}")
+        self.filename = filename
+        self.fsync = fsync
+        self._last_sync = 0.0
+        self._file = None
+
+    def commit(self, records: List[dict]):
+        """Append records to the journal as one group."""
+        if not records:
+            return
+        if self._file is None:
+            self._file = open(self.filename, mode='a', encoding='utf-8')
+        self._file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._file.flush()
+        now = time.monotonic()
+        if self.fsync == "always" or (self.fsync == "interval" and now - self._last_sync >= FSYNC_INTERVAL):
+            os.fsync(self._file.fileno())
+            self._last_sync = now
+
+    def read(self) -> List[dict]:
+        """
+        Return every complete record in the journal.
+
+        Reading stops at the first line that isn't valid JSON, which is
+        where a crash cut off the last write.
+        """
+        records = []
+        try:
+            with open(self.filename, mode='r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def clear(self):
+        """Empty the journal once its records are safely in the backend."""
+        self.close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def close(self):
+        if self._file is not None:
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+class JournaledStorage(StorageBackend):
+    """
+    Wraps a storage backend so writes go to a journal first.
+
+    IDs are handed out as soon as a chunk is journaled, following the
+    backend's last_id(), which is reread under the backend's file_lock. At a
+    checkpoint the backend is given the journaled appends in order and
+    assigns them the same IDs, then the deletes are applied and the journal
+    is cleared.
+
+    If another process appended to the backend in between, the appends are
+    stored under the next free IDs instead: checkpoint() moves the journaled
+    deletes onto them and returns the mapping, and read_changes() reports
+    that the data must be loaded again.
+
+    Locks are taken in the order file_lock, then the journal's own lock.
+    """
+    def __init__(self, backend: StorageBackend, fsync: str = "always"):
+        self.backend = backend
+        self.filename = backend.filename
+        self.journal = Journal(backend.filename + JOURNAL_SUFFIX, fsync)
+        self._appends: List[WorkChunk] = []
+        self._deletes: List[tuple] = []
+        self._lock = threading.RLock()
+        self._renumber_count = 0  # Checkpoints that stored appends under other IDs
+        self._replay()
+
+    # ---------- Reads (see the backend) ----------
+
+    def load_chunks(self) -> List[WorkChunk]:
+        self.checkpoint()
+        return self.backend.load_chunks()
+
+    def load_store(self):
+        self.checkpoint()
+        return self.backend.load_store()
+
+    def load_chunks_in_range(self, start_date: date, end_date: date) -> List[WorkChunk]:
+        self.checkpoint()
+        return self.backend.load_chunks_in_range(start_date, end_date)
+
+    def iter_chunks(self):
+        self.checkpoint()
+        return self.backend.iter_chunks()
+
+    def total_minutes_for_range(self, start_date: date, end_date: date) -> int:
+        self.checkpoint()
+        return self.backend.total_minutes_for_range(start_date, end_date)
+
+    def last_id(self) -> int:
+        with file_lock(self.filename, shared=True), self._lock:
+            self._last_id = max(self._last_id, self.backend.last_id())
+            return self._last_id
+
+    def signature(self):
+        backend_signature = self.backend.signature()
+        if backend_signature is None:
+            return None
+        return backend_signature + "|" + file_signature(self.journal.filename)
+
+    def change_cursor(self):
+        with self._lock:
+            return self._renumber_count, self.backend.change_cursor()
+
+    def read_changes(self, cursor):
+        if cursor is None:
+            return None
+        renumber_count, backend_cursor = cursor
+        with self._lock:
+            if renumber_count != self._renumber_count:
+                return None  # Journaled chunks the caller holds were stored under other IDs
+        # Only what reached the backend; this process's journaled writes are already known to it
+        changes = self.backend.read_changes(backend_cursor)
+        if changes is None:
+            return None
+        chunks, deleted_ids, backend_cursor = changes
+        return chunks, deleted_ids, (renumber_count, backend_cursor)
+
+    def watch_paths(self):
+        return self.backend.watch_paths()
+
+    # ---------- Writes ----------
+
+    def append_chunks(self, chunks: List[WorkChunk]):
+        with file_lock(self.filename), self._lock:
+            # Other processes may have appended to the backend since the last hand-out
+            self._last_id = max(self._last_id, self.backend.last_id())
+            for chunk in chunks:
+                self._last_id += 1
+                chunk.chunk_id = self._last_id
+            self.journal.commit([_append_record(chunk) for chunk in chunks])
+            self._appends.extend(WorkChunk(c.chunk_id, c.chunk_date, c.minutes, c.description)
+                                 for c in chunks)
+            self._checkpoint_if_needed()
+
+    def delete_chunk(self, chunk_id, chunk_date: date = None):
+        with file_lock(self.filename), self._lock:
+            self.journal.commit([_delete_record(int(chunk_id), chunk_date)])
+            self._deletes.append((int(chunk_id), chunk_date))
+            self._checkpoint_if_needed()
+
+    def replace_chunks(self, chunks: List[WorkChunk]):
+        with file_lock(self.filename), self._lock:
+            self.checkpoint()
+            self.backend.replace_chunks(chunks)
+            self._last_id = self.backend.last_id()
+
+    def save_snapshot(self, store):
+        with file_lock(self.filename), self._lock:
+            self.checkpoint()
+            self.backend.save_snapshot(store)
+
+    def compact(self):
+        with file_lock(self.filename), self._lock:
+            self.checkpoint()
+            self.backend.compact()
+            self._last_id = self.backend.last_id()
+
+    def close(self):
+        with file_lock(self.filename), self._lock:
+            self.checkpoint()
+            self.journal.close()
+            self.backend.close()
+
+    # ---------- Checkpoints ----------
+
+    def checkpoint(self) -> Dict[int, int]:
+        """
+        Copy every journaled write into the backend and clear the journal.
+
+        :return: {journaled ID: stored ID} for appends the backend had to
+                 store under other IDs (see the class docstring); usually empty.
+        """
+        with file_lock(self.filename), self._lock:
+            if not self._appends and not self._deletes:
+                return {}
+            renumbered = {}
+            if self._appends:
+                appends = self._appends
+                journaled_ids = [chunk.chunk_id for chunk in appends]
+                self.backend.append_chunks(appends)
+                # In the backend now, so a retry after a failed delete mustn't append them again
+                self._appends = []
+                renumbered = {old: chunk.chunk_id for old, chunk in zip(journaled_ids, appends)
+                              if old != chunk.chunk_id}
+                self._last_id = max(self._last_id, self.backend.last_id())
+            if renumbered:
+                self._renumber_count += 1
+                self._deletes = [(renumbered.get(chunk_id, chunk_id), chunk_date)
+                                 for chunk_id, chunk_date in self._deletes]
+                # The journal names the old IDs, which are now other rows; a replay must not delete them
+                self.journal.clear()
+                self.journal.commit([_delete_record(*delete) for delete in self._deletes])
+            for chunk_id, chunk_date in self._deletes:
+                self.backend.delete_chunk(chunk_id, chunk_date)
+            self._deletes = []
+            self.journal.clear()
+            return renumbered
+
+    def _checkpoint_if_needed(self):
+        if len(self._appends) + len(self._deletes) >= CHECKPOINT_RECORDS:
+            self.checkpoint()
+
+    def _replay(self):
+        """Queue the writes of a journal left by a crash, then checkpoint them."""
+        with file_lock(self.filename):
+            self._replay_locked()
+
+    def _replay_locked(self):
+        backend_last_id = self.backend.last_id()
+        for record in self.journal.read():
+            if record["op"] == "append":
+                # A crash mid-checkpoint can leave appends that already reached the backend
+                if record["id"] > backend_last_id:
+                    self._appends.append(WorkChunk(record["id"], parse_iso_date(record["date"]),
+                                                   record["minutes"], record["description"]))
+            elif record["op"] == "delete":
+                chunk_date = parse_iso_date(record["date"]) if record["date"] else None
+                self._deletes.append((record["id"], chunk_date))
+        self._last_id = max([backend_last_id] + [chunk.chunk_id for chunk in self._appends])
+        self.checkpoint()
+        self.journal.clear()
+
+
+def _append_record(chunk: WorkChunk) -> dict:
+    return {"op": "append", "id": chunk.chunk_id, "date": chunk.chunk_date.isoformat(),
+            "minutes": chunk.minutes, "description": chunk.description}
+
+
+def _delete_record(chunk_id: int, chunk_date: date = None) -> dict:
+    return {"op": "delete", "id": chunk_id, "date": chunk_date.isoformat() if chunk_date else None}
@@ -1,12 +1,63 @@
-from PyQt5.QtWidgets import QApplication
-from src.GUI.BillingTrackerGUI import BillingTrackerGUI
+# main.py
+# Entry point for the GUI.
+#
+# Qt and the GUI modules are imported inside run_gui, after a splash window is
+# on screen, so the first paint doesn't wait on the import graph or on the
+# DataManager load. (bench/bench_startup.py measures both.)
+#
+#     python -m src.main [--profile] [--exit-after-paint]
+#
+# --exit-after-paint prints when the splash and the main window were first
+# painted (as time.time() values) to stderr and quits; used by the startup benchmark.
+
 import sys
+import time
+
+SPLASH_SIZE = (360, 120)
+
+
+def show_splash(app):
+    """Show a plain splash window and paint it straight away."""
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtGui import QColor, QPixmap
+    from PyQt5.QtWidgets import QSplashScreen
+
+    pixmap = QPixmap(*SPLASH_SIZE)
+    pixmap.fill(QColor("#2E7D32"))
+    splash = QSplashScreen(pixmap)
+    splash.showMessage("Work Billing Tracker\nLoading your time log...",
+                       Qt.AlignCenter, QColor("white"))
+    splash.show()
+    app.processEvents()
+    return splash
+
 
 def run_gui():
+    exit_after_paint = "--exit-after-paint" in sys.argv
+    if exit_after_paint:
+        sys.argv.remove("--exit-after-paint")
+    if "--profile" in sys.argv:
+        sys.argv.remove("--profile")
+        from src import profiling
+        profiling.enable()
+
+    from PyQt5.QtWidgets import QApplication
     app = QApplication(sys.argv)
+    splash = show_splash(app)
+    splash_painted = time.time()
+
+    # The rest of the GUI and the data load happen behind the splash
+    from src.GUI.BillingTrackerGUI import BillingTrackerGUI
     window = BillingTrackerGUI()
     window.show()
+    splash.finish(window)
+
+    if exit_after_paint:
+        app.processEvents()
+        print(f"startup splash {splash_painted:.6f} window {time.time():.6f}", file=sys.stderr)
+        window.close()
+        return
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    run_gui()
\ No newline at end of file
+    run_gui()
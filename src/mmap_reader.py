@@ -0,0 +1,231 @@
+# mmap_reader.py
+# Date-range reads of a large CSV ledger through a memory map.
+#
+# Rows are appended mostly in date order, so the rows of a date range sit in
+# one contiguous stretch of the file that a binary search on the date column
+# can find. Rows written out of order ("outliers", e.g. a forgotten entry
+# added for last week) are listed in an index, saved next to the file, so
+# they are never missed.
+#
+# A description may hold newlines (csv quotes it), so a line that looks like
+# the start of a row can sit inside a quoted field. The indexing scan tracks
+# quotes and lists such lines too, so searches skip them.
+
+import csv
+import io
+import json
+import mmap
+import os
+import re
+import zlib
+from datetime import date
+from typing import List, Optional
+from src.file_lock import file_lock
+from src.models import WorkChunk, parse_iso_date
+from src.storage import FILENAME, load_tombstones
+
+INDEX_SUFFIX = ".mmidx.json"
+
+# Above this share of out-of-order rows, binary search stops paying off and
+# the whole file is read instead
+MAX_OUTLIER_RATIO = 0.1
+
+# Start of every row: a newline, then "<id>,<YYYY-MM-DD>,"
+_ROW = re.compile(rb'\n(\d+),(\d{4}-\d\d-\d\d),')
+CHECK_BYTES = 4096
+
+
+class MappedCSVReader:
+    """
+    Reads date ranges from a CSV ledger without decoding the whole file.
+
+    The file is only mapped for the duration of a read, under a shared
+    file_lock, so it can still be appended to, compacted or replaced between
+    reads but never during one. Rows appended since the last read are
+    indexed when the next read starts; if the file was rewritten instead,
+    the index is rebuilt.
+    """
+    def __init__(self, filename: str = FILENAME):
+        self.filename = filename
+        self.index = self._read_index()
+
+    def load_chunks_in_range(self, start_date: date, end_date: date) -> List[WorkChunk]:
+        """Return the live chunks dated between start_date and end_date, inclusive."""
+        start, end = start_date.isoformat(), end_date.isoformat()
+        chunks = []
+        with file_lock(self.filename, shared=True), self._map() as mm:
+            if mm is None:
+                return []
+            tombstones = load_tombstones(self.filename)
+            self._update_index(mm)
+            if self.index["outliers"] is None:
+                # Too far out of order to search; read everything
+                spans = [(self.index["data_start"], len(mm))]
+            else:
+                first = self._first_row_after(mm, start, inclusive=True)
+                last = self._first_row_after(mm, end, inclusive=False)
+                spans = [(first, last)] + [
+                    (offset, _row_end(mm, offset)) for offset, day in self.index["outliers"]
+                    if start <= day <= end and not first <= offset < last
+                ]
+            for span_start, span_end in spans:
+                text = mm[span_start:span_end].decode('utf-8')
+                for row in csv.reader(io.StringIO(text, newline='')):
+                    if len(row) < 3 or row[0] in tombstones or not start <= row[1] <= end:
+                        continue
+                    chunks.append(WorkChunk(int(row[0]), parse_iso_date(row[1]), int(row[2]),
+                                            row[3] if len(row) > 3 else ""))
+        chunks.sort(key=lambda c: c.chunk_id)
+        return chunks
+
+    def total_minutes_for_range(self, start_date: date, end_date: date) -> int:
+        """Sum minutes between two dates; lets the reader be passed to calculations.py."""
+        return sum(c.minutes for c in self.load_chunks_in_range(start_date, end_date))
+
+    # ---------- Binary search ----------
+
+    def _first_row_after(self, mm, day: str, inclusive: bool) -> int:
+        """
+        Return the offset of the first in-order row dated on/after day
+        (inclusive) or after day, or the end of the indexed data.
+        """
+        lo, hi = self.index["data_start"], self.index["size"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            row = self._row_at_or_after(mm, mid)
+            if row is None:
+                hi = mid
+                continue
+            offset, row_day = row
+            if (row_day >= day) if inclusive else (row_day > day):
+                hi = mid
+            else:
+                lo = offset + 1
+        row = self._row_at_or_after(mm, lo)
+        return row[0] if row else self.index["size"]
+
+    def _row_at_or_after(self, mm, pos: int):
+        """Return (offset, date) of the first in-order row starting at or after pos."""
+        skipped = self._skipped_offsets
+        size = self.index["size"]
+        pos = max(pos, self.index["data_start"])
+        if pos > self.index["data_start"]:
+            pos = mm.find(b'\n', pos - 1, size) + 1
+            if pos == 0:
+                return None
+        while pos < size:
+            match = _ROW.match(mm, pos - 1) if pos > 0 else None
+            if match and pos not in skipped:
+                return pos, match.group(2).decode()
+            pos = mm.find(b'\n', pos, size) + 1
+            if pos == 0:
+                return None
+        return None
+
+    # ---------- Index ----------
+
+    def _update_index(self, mm):
+        """Index rows appended since the last read, or everything if the file was rewritten."""
+        index = self.index
+        rewritten = index is None or len(mm) < index["size"] or _checksum(mm, index["size"]) != index["check"]
+        if rewritten or "quoted" not in index:  # Indexes saved before quoted lines were tracked are rebuilt
+            index = self.index = {"size": 0, "data_start": _data_start(mm), "max_date": "",
+                                  "rows": 0, "outliers": [], "quoted": []}
+        if len(mm) == index["size"]:
+            return
+
+        # The indexed part ends with a whole row, so the scan starts outside quotes
+        scan_from = max(index["size"], index["data_start"]) - 1
+        rows, max_date, outliers, quoted = (index["rows"], index["max_date"], index["outliers"],
+                                            index["quoted"])
+        in_quotes, quotes_from = False, scan_from
+        for match in _ROW.finditer(mm, scan_from):
+            if mm.find(b'"', quotes_from, match.start()) != -1:
+                # Doubled quotes inside a field count twice, so odd means the field is still open
+                in_quotes ^= mm[quotes_from:match.start()].count(b'"') % 2 == 1
+            quotes_from = match.start()
+            if in_quotes:
+                quoted.append(match.start() + 1)  # A newline inside a description
+                continue
+            day = match.group(2).decode()
+            rows += 1
+            if day >= max_date:
+                max_date = day
+            elif outliers is not None:
+                outliers.append([match.start() + 1, day])
+                if len(outliers) > MAX_OUTLIER_RATIO * rows and rows > 100:
+                    outliers = None
+        index.update(size=len(mm), rows=rows, max_date=max_date, outliers=outliers,
+                     check=_checksum(mm, len(mm)))
+        self._set_skipped_offsets()
+        self._write_index()
+
+    def _read_index(self) -> Optional[dict]:
+        try:
+            with open(self.filename + INDEX_SUFFIX, mode='r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            index = None
+        self.index = index
+        self._set_skipped_offsets()
+        return index
+
+    def _set_skipped_offsets(self):
+        """Collect the offsets binary search must step over: outliers and lines inside quotes."""
+        index = self.index or {}
+        self._skipped_offsets = set(o for o, _ in index.get("outliers") or ()) | set(index.get("quoted") or ())
+
+    def _write_index(self):
+        path = self.filename + INDEX_SUFFIX
+        with open(path + ".tmp", mode='w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(path + ".tmp", path)
+
+    def _map(self):
+        return _MappedFile(self.filename)
+
+
+class _MappedFile:
+    """Context manager yielding a read-only map of a file, or None if it is missing or empty."""
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = None
+        self.mm = None
+
+    def __enter__(self):
+        try:
+            self.file = open(self.filename, mode='rb')
+        except FileNotFoundError:
+            return None
+        if os.fstat(self.file.fileno()).st_size == 0:
+            return None
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.mm
+
+    def __exit__(self, *exc):
+        if self.mm is not None:
+            self.mm.close()
+        if self.file is not None:
+            self.file.close()
+
+
+def _data_start(mm) -> int:
+    """Return the offset just past the header line."""
+    return mm.find(b'\n') + 1 or len(mm)
+
+
+def _row_end(mm, offset: int) -> int:
+    """Return the offset just past the row starting at offset, which may span lines."""
+    pos = offset
+    while True:
+        end = mm.find(b'\n', pos)
+        if end == -1:
+            return len(mm)
+        if mm[offset:end].count(b'"') % 2 == 0:
+            return end + 1
+        pos = end + 1
+
+
+def _checksum(mm, size: int) -> int:
+    """CRC of the start of the file and of the bytes just before size, to spot rewrites."""
+    return zlib.crc32(mm[:CHECK_BYTES] + mm[max(0, size - CHECK_BYTES):size])
@@ -2,12 +2,27 @@
 # Contains data models for the Work Billing Tracker
 
 from datetime import date
+from functools import lru_cache
 from typing import List
 
+
+@lru_cache(maxsize=None)
+def parse_iso_date(text: str) -> date:
+    """
+    Parse a YYYY-MM-DD string into a date.
+
+    Memoized: a ledger only has a few thousand distinct days, so most rows
+    are a dict lookup instead of a parse.
+    """
+    return date.fromisoformat(text)
+
+
 class WorkChunk:
     """
     Represents a chunk of work (in minutes) billed to a specific date.
     """
+    __slots__ = ('chunk_id', 'chunk_date', 'minutes', 'description')
+
     def __init__(self,chunk_id:int, chunk_date: date, minutes: int, description: str = ""):
         self.chunk_id = chunk_id
         self.chunk_date = chunk_date
@@ -20,11 +35,10 @@ class WorkChunk:
 
     @staticmethod
     def from_csv_row(row: List[str]) -> 'WorkChunk':
-        from datetime import datetime
-        chunk_id = row[0]
-        chunk_date = datetime.strptime(row[1], '%Y-%m-%d').date()
+        chunk_id = int(row[0])
+        chunk_date = parse_iso_date(row[1])
         minutes = int(row[2])
-        description = row[3] if len(row) > 2 else ""
+        description = row[3] if len(row) > 3 else ""
         return WorkChunk(chunk_id, chunk_date, minutes, description)
 
 
@@ -35,4 +49,4 @@ class Day:
     """
     def __init__(self, date: date, chunks: list):
         self.date = date
-        self.chunks = []
\ No newline at end of file
+        self.chunks = list(chunks)
\ No newline at end of file
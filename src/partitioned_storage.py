@@ -0,0 +1,304 @@
+# partitioned_storage.py
+# Monthly-partitioned CSV storage backend for the Work Billing Tracker.
+#
+# Chunks are stored one file per month (data/2025-10.csv, ...) next to a
+# manifest.json that records the last ID handed out, per partition its row
+# count and minute total, and a log of the latest deletes (for read_changes).
+#
+# Migration to and from the single work_chunks.csv file:
+#     python -m src.partitioned_storage to-partitions [csv_file] [directory]
+#     python -m src.partitioned_storage to-csv [directory] [csv_file]
+
+import csv
+import json
+import os
+import sys
+from datetime import date
+from typing import Dict, List
+from src.calculations import get_month_range, get_months_in_range
+from src.file_lock import atomic_write, file_lock
+from src.models import WorkChunk
+from src.storage import (
+    BASE_DIR, FILENAME, StorageBackend, file_signature,
+    load_chunks_from_csv, load_chunks_from_csv_in_range
+)
+
+PARTITION_DIR = os.path.join(BASE_DIR, "data")
+MANIFEST_NAME = "manifest.json"
+HEADER = ['ID', 'Date', 'Minutes', 'Description']
+
+# Deletes kept in the manifest's log; readers further behind load everything again
+DELETE_LOG_LIMIT = 1000
+
+
+def partition_key(chunk_date: date) -> str:
+    """Return the partition name ("YYYY-MM") a date is stored in."""
+    return f"{chunk_date.year:04d}-{chunk_date.month:02d}"
+
+
+class PartitionedCSVStorage(StorageBackend):
+    """
+    Stores chunks in one CSV file per month.
+
+    Loading a date range reads only the partitions it overlaps, range totals
+    use the manifest for whole months, and a delete rewrites only the
+    partition the chunk is in.
+
+    Other processes may write the same directory, so every read and write
+    rereads the manifest under the directory's file_lock, and writes replace
+    it with atomic_write.
+    """
+    def __init__(self, directory: str = PARTITION_DIR):
+        self.directory = directory
+        self.filename = directory
+        os.makedirs(directory, exist_ok=True)
+        with file_lock(self.filename, shared=True):
+            self.manifest = self._read_manifest()
+
+    # ---------- Reads ----------
+
+    def load_chunks(self) -> List[WorkChunk]:
+        chunks = []
+        with file_lock(self.filename, shared=True):
+            self.manifest = self._read_manifest()
+            for key in sorted(self.manifest["partitions"]):
+                chunks.extend(load_chunks_from_csv(self._path(key)))
+        chunks.sort(key=lambda c: c.chunk_id)
+        return chunks
+
+    def load_chunks_in_range(self, start_date: date, end_date: date) -> List[WorkChunk]:
+        chunks = []
+        with file_lock(self.filename, shared=True):
+            self.manifest = self._read_manifest()
+            for key in self._keys_in_range(start_date, end_date):
+                chunks.extend(load_chunks_from_csv_in_range(start_date, end_date, self._path(key)))
+        chunks.sort(key=lambda c: c.chunk_id)
+        return chunks
+
+    def total_minutes_for_range(self, start_date: date, end_date: date) -> int:
+        total = 0
+        with file_lock(self.filename, shared=True):
+            self.manifest = self._read_manifest()
+            for key in self._keys_in_range(start_date, end_date):
+                first, last = get_month_range(date(int(key[:4]), int(key[5:]), 1))
+                if start_date <= first and last <= end_date:
+                    total += self.manifest["partitions"][key]["minutes"]
+                else:
+                    total += sum(c.minutes for c in
+                                 load_chunks_from_csv_in_range(start_date, end_date, self._path(key)))
+        return total
+
+    def signature(self):
+        # Every write updates the manifest
+        return file_signature(os.path.join(self.directory, MANIFEST_NAME))
+
+    def change_cursor(self):
+        with file_lock(self.filename, shared=True):
+            self.manifest = self._read_manifest()
+            return self._cursor()
+
+    def read_changes(self, cursor):
+        """
+        New chunks are the rows past the cursor's last ID in the partitions
+        written since; deletes come from the manifest's delete log.
+        """
+        if cursor is None:
+            return None
+        last_id, delete_seq, partition_signatures = cursor
+        with file_lock(self.filename, shared=True):
+            self.manifest = self._read_manifest()
+            seq = self.manifest.get("delete_seq", 0)
+            log = self.manifest.get("deletes", [])
+            if not seq - len(log) <= delete_seq <= seq:
+                return None  # Rewritten, or more deletes than the log keeps
+            chunks = []
+            if self.manifest["last_id"] > last_id:
+                for key in sorted(self.manifest["partitions"]):
+                    path = self._path(key)
+                    if partition_signatures.get(key) != file_signature(path):
+                        chunks.extend(c for c in load_chunks_from_csv(path) if c.chunk_id > last_id)
+            deleted = [chunk_id for entry_seq, chunk_id in log if entry_seq > delete_seq]
+            return chunks, deleted, self._cursor()
+
+    # ---------- Writes ----------
+
+    def append_chunks(self, chunks: List[WorkChunk]):
+        with file_lock(self.filename):
+            self.manifest = self._read_manifest()
+            by_partition: Dict[str, List[WorkChunk]] = {}
+            for chunk in chunks:
+                self.manifest["last_id"] += 1
+                chunk.chunk_id = self.manifest["last_id"]
+                by_partition.setdefault(partition_key(chunk.chunk_date), []).append(chunk)
+
+            for key, partition_chunks in by_partition.items():
+                path = self._path(key)
+                file_exists = os.path.exists(path)
+                with open(path, mode='a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if not file_exists:
+                        writer.writerow(HEADER)
+                    for chunk in partition_chunks:
+                        writer.writerow(chunk.to_csv_row())
+                stats = self.manifest["partitions"].setdefault(key, {"rows": 0, "minutes": 0})
+                stats["rows"] += len(partition_chunks)
+                stats["minutes"] += sum(c.minutes for c in partition_chunks)
+            self._write_manifest()
+
+    def last_id(self) -> int:
+        with file_lock(self.filename, shared=True):
+            self.manifest = self._read_manifest()
+        return self.manifest["last_id"]
+
+    def replace_chunks(self, chunks: List[WorkChunk]):
+        with file_lock(self.filename):
+            for key in list(self._read_manifest()["partitions"]):
+                os.remove(self._path(key))
+            # Everything is deleted, more than the log can describe
+            seq = self._read_manifest().get("delete_seq", 0) + DELETE_LOG_LIMIT + 1
+            self.manifest = {"last_id": 0, "partitions": {}, "delete_seq": seq, "deletes": []}
+            self._write_manifest()
+            self.append_chunks(chunks)
+
+    def delete_chunk(self, chunk_id, chunk_date: date = None):
+        """
+        Delete one chunk by ID, rewriting only its partition.
+
+        :param chunk_date: The chunk's date, if known. Without it every
+                           partition may need to be searched.
+        """
+        with file_lock(self.filename):
+            self.manifest = self._read_manifest()
+            if chunk_date is not None:
+                keys = [partition_key(chunk_date)]
+            else:
+                keys = sorted(self.manifest["partitions"], reverse=True)
+            for key in keys:
+                if key in self.manifest["partitions"] and self._delete_from_partition(key, int(chunk_id)):
+                    self._log_delete(int(chunk_id))
+                    self._write_manifest()
+                    return
+
+    def _delete_from_partition(self, key: str, chunk_id: int) -> bool:
+        chunks = load_chunks_from_csv(self._path(key))
+        kept = [c for c in chunks if c.chunk_id != chunk_id]
+        if len(kept) == len(chunks):
+            return False
+
+        if kept:
+            self._write_partition(key, kept)
+            stats = self.manifest["partitions"][key]
+            stats["rows"] = len(kept)
+            stats["minutes"] = sum(c.minutes for c in kept)
+        else:
+            os.remove(self._path(key))
+            del self.manifest["partitions"][key]
+        return True
+
+    # ---------- Files ----------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".csv")
+
+    def _log_delete(self, chunk_id: int):
+        seq = self.manifest.get("delete_seq", 0) + 1
+        log = self.manifest.get("deletes", []) + [[seq, chunk_id]]
+        self.manifest["delete_seq"], self.manifest["deletes"] = seq, log[-DELETE_LOG_LIMIT:]
+
+    def _cursor(self) -> tuple:
+        """Return (last ID, delete log position, {partition: file signature}) for the manifest read last."""
+        return (self.manifest["last_id"], self.manifest.get("delete_seq", 0),
+                {key: file_signature(self._path(key)) for key in self.manifest["partitions"]})
+
+    def _keys_in_range(self, start_date: date, end_date: date) -> List[str]:
+        keys = (f"{year:04d}-{month:02d}" for year, month in get_months_in_range(start_date, end_date))
+        return [key for key in keys if key in self.manifest["partitions"]]
+
+    def _write_partition(self, key: str, chunks: List[WorkChunk]):
+        with atomic_write(self._path(key), mode='w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADER)
+            writer.writerows(chunk.to_csv_row() for chunk in chunks)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return self._rebuild_manifest()
+
+    def _rebuild_manifest(self) -> dict:
+        """Build the manifest by reading every partition file in the directory."""
+        manifest = {"last_id": 0, "partitions": {}}
+        for name in sorted(os.listdir(self.directory)):
+            key, ext = os.path.splitext(name)
+            if ext != ".csv" or len(key) != 7:
+                continue
+            chunks = load_chunks_from_csv(os.path.join(self.directory, name))
+            manifest["partitions"][key] = {"rows": len(chunks),
+                                           "minutes": sum(c.minutes for c in chunks)}
+            manifest["last_id"] = max([manifest["last_id"]] + [c.chunk_id for c in chunks])
+        return manifest
+
+    def _write_manifest(self):
+        with atomic_write(os.path.join(self.directory, MANIFEST_NAME), encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+
+
+def migrate_csv_to_partitions(csv_filename: str = FILENAME, directory: str = PARTITION_DIR) -> int:
+    """
+    Split the single CSV file into monthly partitions, keeping IDs.
+
+    :return: The number of chunks copied.
+    :raises ValueError: If the directory already holds partitions.
+    """
+    storage = PartitionedCSVStorage(directory)
+    with file_lock(storage.filename):
+        storage.manifest = storage._read_manifest()
+        if storage.manifest["partitions"]:
+            raise ValueError(f"{directory} already contains partitions; refusing to migrate twice")
+
+        chunks = load_chunks_from_csv(csv_filename)
+        by_partition: Dict[str, List[WorkChunk]] = {}
+        for chunk in chunks:
+            by_partition.setdefault(partition_key(chunk.chunk_date), []).append(chunk)
+        for key, partition_chunks in by_partition.items():
+            storage._write_partition(key, partition_chunks)
+            storage.manifest["partitions"][key] = {"rows": len(partition_chunks),
+                                                   "minutes": sum(c.minutes for c in partition_chunks)}
+        storage.manifest["last_id"] = max((c.chunk_id for c in chunks), default=0)
+        storage._write_manifest()
+    return len(chunks)
+
+
+def migrate_partitions_to_csv(directory: str = PARTITION_DIR, csv_filename: str = FILENAME) -> int:
+    """
+    Merge monthly partitions back into a single CSV file, keeping IDs.
+
+    :return: The number of chunks copied.
+    :raises ValueError: If the CSV file already exists.
+    """
+    if os.path.exists(csv_filename):
+        raise ValueError(f"{csv_filename} already exists; refusing to overwrite it")
+
+    chunks = PartitionedCSVStorage(directory).load_chunks()
+    with open(csv_filename, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(chunk.to_csv_row() for chunk in chunks)
+    return len(chunks)
+
+
+if __name__ == "__main__":
+    usage = "usage: python -m src.partitioned_storage to-partitions|to-csv [source] [target]"
+    if len(sys.argv) < 2 or sys.argv[1] not in ("to-partitions", "to-csv"):
+        sys.exit(usage)
+    if sys.argv[1] == "to-partitions":
+        source = sys.argv[2] if len(sys.argv) > 2 else FILENAME
+        target = sys.argv[3] if len(sys.argv) > 3 else PARTITION_DIR
+        copied = migrate_csv_to_partitions(source, target)
+    else:
+        source = sys.argv[2] if len(sys.argv) > 2 else PARTITION_DIR
+        target = sys.argv[3] if len(sys.argv) > 3 else FILENAME
+        copied = migrate_partitions_to_csv(source, target)
+    print(f"Migrated {copied} chunks from {source} to {target}")
@@ -0,0 +1,146 @@
+# persistence.py
+# Background writer that keeps storage I/O off the GUI thread.
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from src.models import WorkChunk
+
+
+class PersistenceWorker:
+    """
+    Applies storage writes on a single background thread, in order.
+
+    Writes are queued with append() and delete() and return immediately; the
+    caller updates its in-memory state straight away. Everything queued while
+    a write is running is applied as one batch: all appends go to storage in
+    a single append_chunks call and repeated deletes of the same chunk are
+    written once. A queued snapshot save (see snapshot.py) runs after the
+    writes before it.
+
+    Callers assign chunk IDs themselves (see DataManager.add_chunks). If
+    another process appended first, storage hands out different IDs; the
+    batch's deletes then follow the stored IDs, queued writes are moved onto
+    them with renumber_pending() and on_renumber is called with
+    {queued ID: stored ID} so the caller can update its own copy. A caller
+    that queues deletes under a lock should call renumber_pending() itself,
+    from on_renumber, while holding it. Storage errors are passed to
+    on_error as a message.
+    """
+    def __init__(self, storage, on_error: Optional[Callable[[str], None]] = None,
+                 on_renumber: Optional[Callable[[Dict[int, int]], None]] = None):
+        self.storage = storage
+        self.on_error = on_error
+        self.on_renumber = on_renumber
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")
+        self._last_batch = None
+
+    def append(self, chunks):
+        """Queue new chunks, which already carry the IDs storage will give them."""
+        self._queue([("append", chunk) for chunk in chunks])
+
+    def delete(self, chunk_id, chunk_date=None):
+        self._queue([("delete", chunk_id, chunk_date)])
+
+    def snapshot(self, save: Callable[[], None]):
+        """
+        Queue save, which writes a snapshot holding every write queued so
+        far, to run once those writes are in storage.
+        """
+        self._queue([("snapshot", save)])
+
+    def flush(self):
+        """Block until every queued write has been applied."""
+        with self._lock:
+            batch = self._last_batch
+        if batch is not None:
+            batch.result()
+
+    def idle(self) -> bool:
+        """Return True if every queued write has been applied."""
+        with self._lock:
+            return not self._pending and (self._last_batch is None or self._last_batch.done())
+
+    def renumber_pending(self, renumbered: Dict[int, int]) -> Dict[int, int]:
+        """
+        Move queued writes onto the IDs storage actually handed out.
+
+        :param renumbered: {queued ID: stored ID} for every chunk of the
+                           batch just appended.
+        :return: renumbered, extended with the new IDs of queued appends,
+                 which follow on from the batch's.
+        """
+        renumbered = dict(renumbered)
+        next_id = max(renumbered.values())
+        with self._lock:
+            pending = []
+            for op in self._pending:
+                if op[0] == "append":
+                    chunk = op[1]
+                    next_id += 1
+                    renumbered[chunk.chunk_id] = next_id
+                    pending.append(("append", WorkChunk(next_id, chunk.chunk_date,
+                                                        chunk.minutes, chunk.description)))
+                elif op[0] == "delete":
+                    pending.append(("delete", renumbered.get(op[1], op[1]), op[2]))
+                # Queued snapshot saves hold the old IDs, so they're dropped
+            self._pending = pending
+        return renumbered
+
+    def close(self):
+        """Apply the remaining writes and stop the worker thread."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _queue(self, ops):
+        with self._lock:
+            self._pending.extend(ops)
+            if not self._scheduled:
+                self._scheduled = True
+                self._last_batch = self._executor.submit(self._write_batch)
+
+    def _write_batch(self):
+        with self._lock:
+            ops, self._pending = self._pending, []
+            self._scheduled = False
+
+        appends = [op[1] for op in ops if op[0] == "append"]
+        snapshot_saves = [op[1] for op in ops if op[0] == "snapshot"]
+        deletes = {}
+        for op in ops:
+            if op[0] == "delete":
+                deletes.setdefault(op[1], op[2])
+
+        renumbered = {}
+        try:
+            if appends:
+                # Storage assigns IDs itself; write copies so the caller's chunks never change
+                copies = [WorkChunk(chunk.chunk_id, chunk.chunk_date, chunk.minutes, chunk.description)
+                          for chunk in appends]
+                self.storage.append_chunks(copies)
+                if any(stored.chunk_id != chunk.chunk_id for chunk, stored in zip(appends, copies)):
+                    renumbered = {chunk.chunk_id: stored.chunk_id for chunk, stored in zip(appends, copies)}
+            for chunk_id, chunk_date in deletes.items():
+                self.storage.delete_chunk(renumbered.get(chunk_id, chunk_id), chunk_date)
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            self.on_error(f"Could not save changes: {e}")
+            return
+
+        if renumbered:
+            if self.on_renumber is not None:
+                self.on_renumber(renumbered)
+            else:
+                self.renumber_pending(renumbered)
+            return  # This batch's snapshot holds the old IDs
+
+        # A snapshot only matches storage if no write in this batch was queued after it
+        if snapshot_saves and ops[-1][0] == "snapshot":
+            try:
+                snapshot_saves[-1]()
+            except OSError:
+                pass  # Only a startup shortcut; the next launch reads the data itself
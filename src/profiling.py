@@ -0,0 +1,78 @@
+# profiling.py
+# Opt-in timing of named phases (e.g. the steps of a GUI refresh).
+#
+# Turn it on with BILLING_TRACKER_PROFILE=1 or `python -m src.main --profile`;
+# a per-phase summary is printed to stderr when the app exits.
+
+import atexit
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+from src import config
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of values, nearest-rank."""
+    ordered = sorted(values)
+    return ordered[round(pct / 100 * (len(ordered) - 1))]
+
+
+class Profiler:
+    """
+    Collects durations per phase name.
+
+    When disabled, phase() returns a shared no-op context manager, so
+    instrumented code costs next to nothing in normal use.
+    """
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.timings: Dict[str, List[float]] = {}
+        self._null_phase = nullcontext()
+
+    def phase(self, name: str):
+        """Context manager that records how long its block takes under name."""
+        if not self.enabled:
+            return self._null_phase
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.setdefault(name, []).append(time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return count, p50 and p99 (in milliseconds) for every phase."""
+        return {
+            name: {"count": len(times),
+                   "p50_ms": percentile(times, 50) * 1000,
+                   "p99_ms": percentile(times, 99) * 1000}
+            for name, times in self.timings.items()
+        }
+
+    def report(self, stream=None):
+        """Print the summary as a table."""
+        stream = stream or sys.stderr
+        for name, stats in sorted(self.summary().items()):
+            print(f"{name:<32}{stats['count']:>8}{stats['p50_ms']:>10.3f} ms p50"
+                  f"{stats['p99_ms']:>10.3f} ms p99", file=stream)
+
+    def reset(self):
+        self.timings = {}
+
+
+profiler = Profiler()
+
+
+def enable():
+    """Turn on the shared profiler and print its report at exit."""
+    if not profiler.enabled:
+        profiler.enabled = True
+        atexit.register(profiler.report)
+
+
+if config.PROFILE:
+    enable()
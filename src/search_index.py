@@ -0,0 +1,175 @@
+# search_index.py
+# Inverted index over chunk descriptions.
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import accumulate
+from typing import Dict, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(text.lower())
+
+
+class _Posting:
+    """The chunks sharing one description, ordered by date, with running minute totals."""
+    __slots__ = ("ordinals", "ids", "minutes", "_prefix")
+
+    def __init__(self):
+        self.ordinals = array('i')
+        self.ids = array('i')
+        self.minutes = array('i')
+        self._prefix = None
+
+    def add(self, chunk_id: int, ordinal: int, minutes: int):
+        if not self.ordinals or ordinal >= self.ordinals[-1]:
+            position = len(self.ordinals)
+        else:
+            position = bisect_right(self.ordinals, ordinal)
+        self.ordinals.insert(position, ordinal)
+        self.ids.insert(position, chunk_id)
+        self.minutes.insert(position, minutes)
+        self._prefix = None
+
+    def remove(self, chunk_id: int) -> bool:
+        try:
+            position = self.ids.index(chunk_id)
+        except ValueError:
+            return False
+        del self.ordinals[position], self.ids[position], self.minutes[position]
+        self._prefix = None
+        return True
+
+    def span(self, start: int, end: int):
+        """Return the (first, last + 1) positions of rows dated start..end (ordinals)."""
+        return bisect_left(self.ordinals, start), bisect_right(self.ordinals, end)
+
+    def minutes_between(self, first: int, last: int) -> int:
+        if self._prefix is None:
+            self._prefix = array('q', accumulate(self.minutes, initial=0))
+        return self._prefix[last] - self._prefix[first]
+
+
+class SearchResult:
+    """
+    Chunks matching a search. minutes and count are summed up front; the
+    matching IDs are only gathered (and sorted by date) when asked for.
+    """
+    def __init__(self, spans):
+        self._spans = spans  # (posting, first, last) per matching description
+        self.count = sum(last - first for _, first, last in spans)
+        self.minutes = sum(posting.minutes_between(first, last) for posting, first, last in spans)
+
+    def rows(self) -> List[Tuple[int, int]]:
+        """Return (date ordinal, chunk ID) of each match, ordered by date then ID."""
+        rows = []
+        for posting, first, last in self._spans:
+            rows.extend(zip(posting.ordinals[first:last], posting.ids[first:last]))
+        rows.sort()
+        return rows
+
+    def chunk_ids(self) -> List[int]:
+        """Return the IDs of the matching chunks, ordered by date then ID."""
+        return [chunk_id for _, chunk_id in self.rows()]
+
+
+class DescriptionIndex:
+    """
+    Maps description tokens to the chunks whose description contains them.
+
+    Chunks are grouped by their exact description (most descriptions repeat,
+    e.g. client names), and each group keeps its chunks in date order with
+    running minute totals. A search only looks at the groups whose
+    description contains every query token, and sums a date range of each
+    group with two binary searches.
+    """
+    def __init__(self, chunks=()):
+        """
+        :param chunks: Chunks to index, or a ChunkStore (read column by column).
+        """
+        self._postings: Dict[str, _Posting] = {}
+        self._tokens: Dict[str, Set[str]] = {}   # token -> descriptions containing it
+        self._vocabulary: Optional[List[str]] = None  # Sorted tokens, for prefix matches
+        if hasattr(chunks, "strings"):
+            strings = chunks.strings
+            for chunk_id, ordinal, minutes, ref, alive in zip(
+                    chunks.ids, chunks.ordinals, chunks.minutes, chunks.descriptions, chunks.live):
+                if alive:
+                    self._add(strings[ref], chunk_id, ordinal, minutes)
+        else:
+            for chunk in chunks:
+                self.add(chunk)
+
+    def add(self, chunk):
+        self._add(chunk.description, int(chunk.chunk_id), chunk.chunk_date.toordinal(), chunk.minutes)
+
+    def remove(self, chunk):
+        posting = self._postings.get(chunk.description)
+        if posting is None or not posting.remove(int(chunk.chunk_id)):
+            return
+        if not posting.ids:
+            del self._postings[chunk.description]
+            for token in set(tokenize(chunk.description)):
+                descriptions = self._tokens[token]
+                descriptions.discard(chunk.description)
+                if not descriptions:
+                    del self._tokens[token]
+                    self._vocabulary = None
+
+    def search(self, query: str, start_date: date = None, end_date: date = None,
+               prefix: bool = True) -> SearchResult:
+        """
+        Find chunks whose description contains every word of query.
+
+        :param start_date: Only chunks on or after this date, if given.
+        :param end_date: Only chunks on or before this date, if given.
+        :param prefix: Let the last word match as a prefix ("cli" finds
+                       "client"), for search-as-you-type.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return SearchResult([])
+        matches = None
+        for position, token in enumerate(tokens):
+            if prefix and position == len(tokens) - 1:
+                descriptions = set()
+                for word in self._words_starting_with(token):
+                    descriptions |= self._tokens[word]
+            else:
+                descriptions = self._tokens.get(token, set())
+            matches = descriptions if matches is None else matches & descriptions
+            if not matches:
+                return SearchResult([])
+
+        start = start_date.toordinal() if start_date else 1
+        end = end_date.toordinal() if end_date else date.max.toordinal()
+        spans = []
+        for description in matches:
+            posting = self._postings[description]
+            first, last = posting.span(start, end)
+            if first < last:
+                spans.append((posting, first, last))
+        return SearchResult(spans)
+
+    def _add(self, description: str, chunk_id: int, ordinal: int, minutes: int):
+        posting = self._postings.get(description)
+        if posting is None:
+            posting = self._postings[description] = _Posting()
+            for token in set(tokenize(description)):
+                if token not in self._tokens:
+                    self._tokens[token] = set()
+                    self._vocabulary = None
+                self._tokens[token].add(description)
+        posting.add(chunk_id, ordinal, minutes)
+
+    def _words_starting_with(self, prefix: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._tokens)
+        first = bisect_left(self._vocabulary, prefix)
+        last = bisect_left(self._vocabulary, prefix + "\U0010ffff")
+        return self._vocabulary[first:last]
@@ -0,0 +1,85 @@
+# snapshot.py
+# Binary snapshot of a ChunkStore, saved next to the data file so startup
+# can skip parsing CSV text.
+#
+# Layout (little-endian):
+#     MAGIC
+#     uint32 length + signature (UTF-8) of the data the snapshot was taken from
+#     uint32 row count, then the id, ordinal, minutes and description columns as int32
+#     uint32 length + the description string table as a JSON list (UTF-8)
+
+import json
+import os
+import struct
+import sys
+from array import array
+from typing import Optional
+from src.chunk_store import ChunkStore
+
+SNAPSHOT_SUFFIX = ".snapshot"
+MAGIC = b"BTSNAP1\0"
+_UINT32 = struct.Struct("<I")
+
+
+def save_snapshot(store: ChunkStore, path: str, signature: str):
+    """Write the live rows of store to path, tagged with the data's signature."""
+    if signature is None:
+        return
+    if store._dead_count:
+        store = store.copy()
+    columns = [store.ids, store.ordinals, store.minutes, store.descriptions]
+    if sys.byteorder != "little":
+        columns = [array('i', column) for column in columns]
+        for column in columns:
+            column.byteswap()
+    signature_bytes = signature.encode('utf-8')
+    strings = json.dumps(store.strings).encode('utf-8')
+
+    with open(path + ".tmp", mode='wb') as f:
+        f.write(MAGIC)
+        f.write(_UINT32.pack(len(signature_bytes)) + signature_bytes)
+        f.write(_UINT32.pack(len(store.ids)))
+        for column in columns:
+            f.write(column.tobytes())
+        f.write(_UINT32.pack(len(strings)) + strings)
+    os.replace(path + ".tmp", path)
+
+
+def load_snapshot(path: str, signature: str) -> Optional[ChunkStore]:
+    """
+    Read a snapshot written by save_snapshot.
+
+    :return: The store, or None if there is no snapshot, it is unreadable,
+             or it was taken from different data than signature describes.
+    """
+    if signature is None:
+        return None
+    try:
+        with open(path, mode='rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = _UINT32.unpack(f.read(4))
+            if f.read(length).decode('utf-8', errors='replace') != signature:
+                return None
+            data = f.read()
+    except (FileNotFoundError, struct.error):
+        return None
+
+    try:
+        (rows,) = _UINT32.unpack_from(data, 0)
+        offset = 4
+        columns = []
+        for _ in range(4):
+            column = array('i')
+            column.frombytes(data[offset:offset + rows * 4])
+            if len(column) != rows:
+                return None
+            if sys.byteorder != "little":
+                column.byteswap()
+            columns.append(column)
+            offset += rows * 4
+        (length,) = _UINT32.unpack_from(data, offset)
+        strings = json.loads(data[offset + 4:offset + 4 + length].decode('utf-8'))
+    except (struct.error, ValueError):
+        return None
+    return ChunkStore.from_columns(*columns, strings)
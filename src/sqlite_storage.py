@@ -0,0 +1,200 @@
+# sqlite_storage.py
+# SQLite storage backend for the Work Billing Tracker.
+#
+# One-shot migration from the CSV file:
+#     python -m src.sqlite_storage [csv_file] [db_file]
+
+import os
+import sqlite3
+import sys
+import threading
+from datetime import date
+from typing import List
+from src.models import WorkChunk
+from src.storage import BASE_DIR, FILENAME, StorageBackend, file_signature, load_chunks_from_csv
+
+DB_FILENAME = os.path.join(BASE_DIR, "work_chunks.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    chunk_date  TEXT    NOT NULL,
+    minutes     INTEGER NOT NULL,
+    description TEXT    NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_chunks_date ON chunks (chunk_date);
+CREATE TABLE IF NOT EXISTS deleted_chunks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id  INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS log_chunk_delete AFTER DELETE ON chunks
+BEGIN
+    INSERT INTO deleted_chunks (id) VALUES (old.id);
+END;
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Stores chunks in an SQLite database.
+
+    Dates are stored as ISO strings, which sort the same way as the dates
+    themselves, so range queries can use the index on chunk_date.
+    AUTOINCREMENT keeps IDs of deleted chunks from being handed out again.
+
+    The connection may be used from a background thread (see DataManager's
+    lazy loading), so every call holds a lock.
+
+    Deletes are logged to deleted_chunks by a trigger, so read_changes can
+    report other connections' writes as new IDs and logged deletes. A
+    replace or compact clears the log and bumps the database's user_version,
+    which tells readers to load everything again.
+    """
+    def __init__(self, filename: str = DB_FILENAME):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def load_chunks(self) -> List[WorkChunk]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, chunk_date, minutes, description FROM chunks ORDER BY id"
+            ).fetchall()
+        return [_chunk_from_row(row) for row in rows]
+
+    def load_chunks_in_range(self, start_date: date, end_date: date) -> List[WorkChunk]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, chunk_date, minutes, description FROM chunks "
+                "WHERE chunk_date BETWEEN ? AND ? ORDER BY id",
+                (start_date.isoformat(), end_date.isoformat())
+            ).fetchall()
+        return [_chunk_from_row(row) for row in rows]
+
+    def append_chunks(self, chunks: List[WorkChunk]):
+        with self._lock, self.conn:
+            for chunk in chunks:
+                cursor = self.conn.execute(
+                    "INSERT INTO chunks (chunk_date, minutes, description) VALUES (?, ?, ?)",
+                    (chunk.chunk_date.isoformat(), chunk.minutes, chunk.description)
+                )
+                chunk.chunk_id = cursor.lastrowid
+
+    def last_id(self) -> int:
+        with self._lock:
+            row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'chunks'").fetchone()
+        return row[0] if row else 0
+
+    def replace_chunks(self, chunks: List[WorkChunk]):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM chunks")
+            self.conn.execute("DELETE FROM sqlite_sequence WHERE name = 'chunks'")
+            for next_id, chunk in enumerate(chunks, start=1):
+                chunk.chunk_id = next_id
+                self._insert_with_id(chunk)
+            self._clear_delete_log()
+
+    def delete_chunk(self, chunk_id, chunk_date: date = None):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM chunks WHERE id = ?", (int(chunk_id),))
+
+    def total_minutes_for_range(self, start_date: date, end_date: date) -> int:
+        with self._lock:
+            (total,) = self.conn.execute(
+                "SELECT COALESCE(SUM(minutes), 0) FROM chunks WHERE chunk_date BETWEEN ? AND ?",
+                (start_date.isoformat(), end_date.isoformat())
+            ).fetchone()
+        return total
+
+    def compact(self):
+        with self._lock:
+            with self.conn:
+                self._clear_delete_log()
+            self.conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def signature(self):
+        return file_signature(self.filename)
+
+    def change_cursor(self):
+        with self._lock:
+            return self._cursor()
+
+    def read_changes(self, cursor):
+        if cursor is None:
+            return None
+        version, last_id, last_seq = cursor
+        with self._lock:
+            if self._version() != version:
+                return None
+            rows = self.conn.execute(
+                "SELECT id, chunk_date, minutes, description FROM chunks WHERE id > ? ORDER BY id",
+                (last_id,)
+            ).fetchall()
+            deletes = self.conn.execute(
+                "SELECT seq, id FROM deleted_chunks WHERE seq > ? ORDER BY seq", (last_seq,)
+            ).fetchall()
+        chunks = [_chunk_from_row(row) for row in rows]
+        last_id = max([last_id] + [chunk.chunk_id for chunk in chunks])
+        last_seq = deletes[-1][0] if deletes else last_seq
+        return chunks, [chunk_id for _, chunk_id in deletes], (version, last_id, last_seq)
+
+    def count(self) -> int:
+        """Return the number of stored chunks."""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def _version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _cursor(self) -> tuple:
+        (last_id,) = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM chunks").fetchone()
+        (last_seq,) = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM deleted_chunks").fetchone()
+        return self._version(), last_id, last_seq
+
+    def _clear_delete_log(self):
+        """Empty the delete log; readers holding older cursors then reload in full."""
+        self.conn.execute("DELETE FROM deleted_chunks")
+        self.conn.execute(f"PRAGMA user_version = {self._version() + 1}")
+
+    def _insert_with_id(self, chunk: WorkChunk):
+        self.conn.execute(
+            "INSERT INTO chunks (id, chunk_date, minutes, description) VALUES (?, ?, ?, ?)",
+            (int(chunk.chunk_id), chunk.chunk_date.isoformat(), chunk.minutes, chunk.description)
+        )
+
+
+def _chunk_from_row(row) -> WorkChunk:
+    chunk_id, chunk_date, minutes, description = row
+    return WorkChunk(chunk_id, date.fromisoformat(chunk_date), minutes, description)
+
+
+def migrate_csv_to_sqlite(csv_filename: str = FILENAME, db_filename: str = DB_FILENAME) -> int:
+    """
+    Copy every chunk from the CSV file into a new SQLite database, keeping IDs.
+
+    :return: The number of chunks copied.
+    :raises ValueError: If the database already holds chunks.
+    """
+    chunks = load_chunks_from_csv(csv_filename)
+    storage = SQLiteStorage(db_filename)
+    try:
+        if storage.count():
+            raise ValueError(f"{db_filename} already contains chunks; refusing to migrate twice")
+        with storage.conn:
+            for chunk in chunks:
+                storage._insert_with_id(chunk)
+    finally:
+        storage.close()
+    return len(chunks)
+
+
+if __name__ == "__main__":
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else FILENAME
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_FILENAME
+    copied = migrate_csv_to_sqlite(csv_path, db_path)
+    print(f"Migrated {copied} chunks from {csv_path} to {db_path}")
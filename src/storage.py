@@ -2,10 +2,17 @@
 # Handles saving and loading data for the Work Billing Tracker
 
 import csv
+import io
+import json
 import os
 import sys
-from typing import List
-from src.models import WorkChunk
+from datetime import date
+from typing import Iterator, List, Set
+from src import config
+from src.chunk_store import ChunkStore
+from src.file_lock import atomic_write, file_lock
+from src.models import WorkChunk, parse_iso_date
+from src.snapshot import SNAPSHOT_SUFFIX, load_snapshot, save_snapshot
 
 if getattr(sys, 'frozen', False):
     # If running as a PyInstaller bundle, get the parent of the .exe (dist/)
@@ -17,22 +24,75 @@ else:
 FILENAME = os.path.join(BASE_DIR, "work_chunks.csv")
 
 FILENAME = os.path.join(BASE_DIR, "work_chunks.csv")
+DAYS_OFF_FILENAME = os.path.join(BASE_DIR, "days_off.txt")
+
+TAIL_READ_SIZE = 4096  # bytes read per step when seeking back for the last row
+
+def read_last_id(filename: str = FILENAME) -> int:
+    """
+    Return the ID stored in the final row of the CSV file, or 0 if it has no rows.
+
+    Appends always hand out increasing IDs, and compaction keeps the final
+    row even if it was deleted, so the last row holds the highest one. Only
+    the tail of the file is read; if the final line can't be parsed (e.g. a
+    header-only file) it falls back to a full scan.
+    """
+    try:
+        with open(filename, mode='rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            tail = b''
+            while pos > 0:
+                step = min(TAIL_READ_SIZE, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+                # Stop once a full line sits in front of the final row
+                if tail.rstrip(b'\r\n').count(b'\n') >= 1:
+                    break
+    except FileNotFoundError:
+        return 0
+
+    lines = [line for line in tail.decode('utf-8', errors='replace').splitlines() if line.strip()]
+    if not lines:
+        return 0
+    try:
+        return int(next(csv.reader([lines[-1]]))[0])
+    except (ValueError, IndexError, StopIteration):
+        return _scan_last_id(filename)
+
+
+def _scan_last_id(filename: str) -> int:
+    """Read every row to find the last ID. Slow path for read_last_id."""
+    last_id = 0
+    with open(filename, mode='r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            try:
+                last_id = int(row[0])
+            except (ValueError, IndexError):
+                pass
+    return last_id
+
 
 def save_chunks_to_csv(chunks: List[WorkChunk], filename: str = FILENAME, append: bool = True):
-    """Append or overwrite chunks in the CSV file, assigning IDs automatically if needed."""
+    """
+    Append or overwrite chunks in the CSV file, assigning IDs automatically if needed.
+
+    Holds the file's write lock throughout, so processes appending at the same
+    time can't hand out the same IDs. Overwrites go to a temporary file that
+    replaces the CSV once complete.
+    """
+    with file_lock(filename):
+        _save_chunks_to_csv(chunks, filename, append)
+
+
+def _save_chunks_to_csv(chunks: List[WorkChunk], filename: str, append: bool):
     if append:
         # APPEND MODE
         file_exists = os.path.exists(filename)
-        last_id = 0
-        if file_exists:
-            with open(filename, mode='r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader, None)
-                for row in reader:
-                    try:
-                        last_id = int(row[0])
-                    except (ValueError, IndexError):
-                        pass
+        last_id = read_last_id(filename) if file_exists else 0
 
         with open(filename, mode='a', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
@@ -46,7 +106,7 @@ def save_chunks_to_csv(chunks: List[WorkChunk], filename: str = FILENAME, append
 
     else:
         # OVERWRITE MODE — always reassign IDs from 1..n
-        with open(filename, mode='w', newline='', encoding='utf-8') as f:
+        with atomic_write(filename, mode='w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['ID', 'Date', 'Minutes', 'Description'])
             next_id = 1
@@ -55,16 +115,518 @@ def save_chunks_to_csv(chunks: List[WorkChunk], filename: str = FILENAME, append
                 next_id += 1
                 writer.writerow(chunk.to_csv_row())
 
+        # Renumbered IDs would be matched by stale tombstones
+        _remove_tombstones(filename)
+
 
 def load_chunks_from_csv(filename: str = FILENAME) -> List[WorkChunk]:
-    """Load all work chunks from a CSV file."""
-    chunks = []
+    """Load all work chunks from a CSV file, skipping deleted (tombstoned) ones."""
+    return [WorkChunk(chunk_id, chunk_date, minutes, description)
+            for chunk_id, chunk_date, minutes, description in _read_csv_rows(filename)]
+
+
+def load_chunk_store_from_csv(filename: str = FILENAME) -> ChunkStore:
+    """
+    Load all work chunks from a CSV file straight into a ChunkStore.
+
+    Skips building a WorkChunk per row, so peak memory stays close to the
+    size of the store itself.
+    """
+    store = ChunkStore()
+    append = store.append_values
+    for chunk_id, chunk_date, minutes, description in _read_csv_rows(filename):
+        append(chunk_id, chunk_date.toordinal(), minutes, description)
+    return store
+
+
+def load_chunks_from_csv_in_range(start_date: date, end_date: date,
+                                  filename: str = FILENAME) -> List[WorkChunk]:
+    """
+    Load the chunks dated between start_date and end_date, inclusive.
+
+    Still reads the whole file, but rows outside the range are rejected by
+    comparing the raw ISO date text, before anything is parsed.
+    """
+    return [WorkChunk(chunk_id, chunk_date, minutes, description)
+            for chunk_id, chunk_date, minutes, description
+            in _read_csv_rows(filename, start_date.isoformat(), end_date.isoformat())]
+
+
+def _read_csv_rows(filename: str, start: str = None, end: str = None):
+    """
+    Yield (id, date, minutes, description) for every live row of a CSV file.
+
+    :param start: Only yield rows dated on or after this ISO date, if given.
+    :param end: Only yield rows dated on or before this ISO date, if given.
+    """
+    with file_lock(filename, shared=True):
+        tombstones = load_tombstones(filename)
+        try:
+            with open(filename, mode='r', newline='', encoding='utf-8') as f:
+                yield from _live_rows(csv.reader(f), tombstones, start, end)
+        except FileNotFoundError:
+            pass  # No data yet
+
+
+def _stream_csv_rows(filename: str):
+    """
+    Yield (id, date, minutes, description) for every live row of a CSV file,
+    like _read_csv_rows, but without holding the file lock while the rows
+    are consumed (e.g. by a slow export).
+
+    The lock is only held to open the file and note its size. Appends only
+    add bytes past that size and rewrites swap in a new file, leaving the
+    open one as it was, so the bytes up to the size can't change meanwhile.
+    """
+    with file_lock(filename, shared=True):
+        tombstones = load_tombstones(filename)
+        try:
+            f = open(filename, mode='rb')
+        except FileNotFoundError:
+            return  # No data yet
+        size = os.fstat(f.fileno()).st_size
+    with f:
+        yield from _live_rows(csv.reader(_lines_up_to(f, size)), tombstones)
+
+
+def _lines_up_to(f, size: int):
+    """Yield the decoded lines of binary file f within its first size bytes."""
+    remaining = size
+    for line in f:
+        if remaining <= 0:
+            return
+        remaining -= len(line)
+        yield line.decode('utf-8')
+
+
+def _live_rows(reader, tombstones: Set[str], start: str = None, end: str = None):
+    """Parse the rows of a CSV reader, skipping the header, tombstoned rows and rows outside start..end."""
+    parse_date = parse_iso_date
+    next(reader, None)  # Skip header
+    for row in reader:
+        if not row or row[0] in tombstones:
+            continue
+        if (start and row[1] < start) or (end and row[1] > end):
+            continue
+        yield (int(row[0]), parse_date(row[1]), int(row[2]),
+               row[3] if len(row) > 3 else "")
+
+
+def load_days_off(filename: str) -> List[date]:
+    """
+    Load holiday/PTO dates from a file with one ISO date per line.
+
+    Anything after the date on a line (e.g. ",New Year's Day") is ignored,
+    as are blank lines and lines starting with '#'. A missing file means no
+    days off.
+    """
+    days = []
+    try:
+        with open(filename, mode='r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    days.append(parse_iso_date(line.split(',', 1)[0].strip()))
+    except FileNotFoundError:
+        pass
+    return days
+
+
+# ---------- Tombstones ----------
+# Deleting a chunk appends its ID to a small sidecar log instead of rewriting
+# the CSV. Deleted rows stay in the CSV (and keep their IDs reserved) until
+# compact_csv drops them and clears the log.
+
+def tombstone_filename(filename: str = FILENAME) -> str:
+    """Return the path of the tombstone log that belongs to a CSV file."""
+    root, _ = os.path.splitext(filename)
+    return root + "_deleted.csv"
+
+
+def append_tombstones(chunk_ids, filename: str = FILENAME):
+    """Record the given chunk IDs as deleted."""
+    path = tombstone_filename(filename)
+    with file_lock(filename):
+        file_exists = os.path.exists(path)
+        with open(path, mode='a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(['ID'])
+            for chunk_id in chunk_ids:
+                writer.writerow([str(chunk_id)])
+
+
+def load_tombstones(filename: str = FILENAME) -> Set[str]:
+    """Return the set of deleted chunk IDs (as strings) for a CSV file."""
+    tombstones = set()
     try:
-        with open(filename, mode='r', newline='', encoding='utf-8') as f:
+        with open(tombstone_filename(filename), mode='r', newline='', encoding='utf-8') as f:
             reader = csv.reader(f)
-            next(reader)  # Skip header
+            next(reader, None)  # Skip header
             for row in reader:
-                chunks.append(WorkChunk.from_csv_row(row))
+                if row:
+                    tombstones.add(row[0])
+    except FileNotFoundError:
+        pass
+    return tombstones
+
+
+def _remove_tombstones(filename: str):
+    try:
+        os.remove(tombstone_filename(filename))
+    except FileNotFoundError:
+        pass
+
+
+def compact_csv(filename: str = FILENAME) -> int:
+    """
+    Rewrite the CSV without its tombstoned rows and clear the tombstone log.
+
+    Unlike save_chunks_to_csv(append=False), IDs are kept as they are. The
+    final row is kept (still tombstoned) even if it was deleted, because
+    read_last_id takes the next ID from it.
+
+    :return: The number of rows dropped.
+    """
+    with file_lock(filename):
+        return _compact_csv(filename)
+
+
+def _compact_csv(filename: str) -> int:
+    tombstones = load_tombstones(filename)
+    if not tombstones or not os.path.exists(filename):
+        _remove_tombstones(filename)
+        return 0
+    last_id = str(read_last_id(filename))
+    if tombstones == {last_id}:
+        return 0  # Only the row holding the last ID is deleted; it has to stay
+
+    dropped = 0
+    # The new file is swapped in before the log is dropped, so a crash in
+    # between leaves tombstones that simply match nothing
+    with atomic_write(filename, mode='w', newline='', encoding='utf-8') as dst, \
+         open(filename, mode='r', newline='', encoding='utf-8') as src:
+        reader = csv.reader(src)
+        writer = csv.writer(dst)
+        for i, row in enumerate(reader):
+            if i > 0 and row and row[0] in tombstones and row[0] != last_id:
+                dropped += 1
+                continue
+            writer.writerow(row)
+    if last_id in tombstones:
+        with atomic_write(tombstone_filename(filename), mode='w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows([['ID'], [last_id]])
+    else:
+        _remove_tombstones(filename)
+    return dropped
+
+
+# ---------- Changes from other processes ----------
+# The CSV file and tombstone log only ever grow between rewrites, so what
+# another process wrote since a given point can be read from the byte
+# offsets reached last time. A cursor holds (inode, size) of both files; a
+# rewrite (compaction, replace_chunks) swaps in a new inode.
+
+def csv_change_cursor(filename: str = FILENAME) -> tuple:
+    """Return a cursor marking the current end of a CSV file and its tombstone log."""
+    with file_lock(filename, shared=True):
+        return _file_position(filename), _file_position(tombstone_filename(filename))
+
+
+def read_csv_changes(cursor: tuple, filename: str = FILENAME):
+    """
+    Read what was written to a CSV file since cursor was taken.
+
+    :return: (appended chunks, deleted IDs, new cursor), or None if the file
+             was rewritten since and has to be loaded again in full.
+    """
+    with file_lock(filename, shared=True):
+        data_position, tombstone_position = cursor
+        rows, data_position = _read_rows_after(filename, data_position)
+        tombstones, tombstone_position = _read_rows_after(tombstone_filename(filename), tombstone_position)
+    if rows is None or tombstones is None:
+        return None
+    chunks = [WorkChunk(int(row[0]), parse_iso_date(row[1]), int(row[2]), row[3] if len(row) > 3 else "")
+              for row in rows if len(row) >= 3 and row[0] != 'ID']
+    deleted = [int(row[0]) for row in tombstones if row and row[0] != 'ID']
+    return chunks, deleted, (data_position, tombstone_position)
+
+
+def _file_position(path: str):
+    try:
+        stat = os.stat(path)
     except FileNotFoundError:
-        pass  # No data yet
-    return chunks
+        return None
+    return stat.st_ino, stat.st_size
+
+
+def _read_rows_after(path: str, position):
+    """
+    Return the complete CSV rows past position and the position after them,
+    or (None, None) if the file was replaced or truncated since.
+    """
+    current = _file_position(path)
+    if current is None:
+        return ([], None) if position is None else (None, None)
+    inode, offset = position if position is not None else (current[0], 0)
+    if inode != current[0] or current[1] < offset:
+        return None, None
+    with open(path, mode='rb') as f:
+        f.seek(offset)
+        data = f.read(current[1] - offset)
+    data = data[:data.rfind(b'\n') + 1]  # Leave a row still being written for next time
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8'), newline='')))
+    return rows, (inode, offset + len(data))
+
+
+# ---------- Storage backends ----------
+# DataManager talks to storage through a StorageBackend so the on-disk format
+# can be chosen in config.py. CSVStorage wraps the functions above;
+# SQLiteStorage lives in sqlite_storage.py and PartitionedCSVStorage in
+# partitioned_storage.py.
+
+# Compact the CSV on load once this many deleted rows have piled up in it
+COMPACT_TOMBSTONE_LIMIT = 500
+
+
+class StorageBackend:
+    """
+    Interface for persisting work chunks.
+
+    Attributes:
+        filename: Path of the file the backend stores its data in.
+    """
+    filename = None
+
+    def load_chunks(self) -> List[WorkChunk]:
+        """Return every stored chunk, in ID order."""
+        raise NotImplementedError
+
+    def load_store(self) -> ChunkStore:
+        """Return every stored chunk as a ChunkStore."""
+        return ChunkStore(self.load_chunks())
+
+    def load_chunks_in_range(self, start_date: date, end_date: date) -> List[WorkChunk]:
+        """Return the chunks dated between start_date and end_date, inclusive."""
+        return [c for c in self.load_chunks() if start_date <= c.chunk_date <= end_date]
+
+    def iter_chunks(self) -> Iterator[WorkChunk]:
+        """Yield every stored chunk, in ID order. Backends that can stream avoid holding them all."""
+        return iter(self.load_chunks())
+
+    def append_chunks(self, chunks: List[WorkChunk]):
+        """Store new chunks, assigning each one the next free ID."""
+        raise NotImplementedError
+
+    def last_id(self) -> int:
+        """
+        Return the highest ID handed out so far, including deleted chunks.
+        The next append_chunks call numbers its chunks from here.
+        """
+        return max((c.chunk_id for c in self.load_chunks()), default=0)
+
+    def replace_chunks(self, chunks: List[WorkChunk]):
+        """Replace all stored data with chunks, renumbering IDs from 1..n."""
+        raise NotImplementedError
+
+    def delete_chunk(self, chunk_id, chunk_date: date = None):
+        """
+        Delete one chunk by ID. Other chunks keep their IDs.
+
+        :param chunk_date: The chunk's date, if known. Backends that store
+                           chunks by date use it to find the chunk faster.
+        """
+        raise NotImplementedError
+
+    def total_minutes_for_range(self, start_date: date, end_date: date) -> int:
+        """Sum minutes for chunks between start_date and end_date, inclusive."""
+        return sum(c.minutes for c in self.load_chunks() if start_date <= c.chunk_date <= end_date)
+
+    def compact(self):
+        """Reclaim space left by deleted chunks, if the backend needs to."""
+        pass
+
+    def save_snapshot(self, store: ChunkStore):
+        """
+        Save store, which must match what is stored, in a form load_store
+        can read faster than the data itself. Backends that don't need one
+        ignore this.
+        """
+        pass
+
+    def signature(self):
+        """
+        Return a string that changes whenever the stored data changes (file
+        sizes and modification times), or None if the backend can't tell.
+        Used to check whether caches saved next to the data are still valid.
+        """
+        return None
+
+    def change_cursor(self):
+        """Return a marker of the stored data's current state, for read_changes."""
+        return self.signature()
+
+    def read_changes(self, cursor):
+        """
+        Return what was written (e.g. by another process) since cursor was
+        taken, as (appended chunks, deleted IDs, new cursor). Chunks already
+        known to the caller may be included again.
+
+        Returns None when the changes can't be told apart and the data must
+        be loaded again in full, which is all this default can do.
+        """
+        if cursor is not None and cursor == self.change_cursor():
+            return [], [], cursor
+        return None
+
+    def watch_paths(self) -> List[str]:
+        """Return the files that change when the stored data does, for file watchers."""
+        return [self.filename] if self.filename else []
+
+    def close(self):
+        """Release any open handles."""
+        pass
+
+
+class CSVStorage(StorageBackend):
+    """Stores chunks in a single CSV file plus a tombstone log for deletes."""
+    def __init__(self, filename: str = FILENAME):
+        self.filename = filename
+        self.tombstone_count = 0
+        self._reader = None
+
+    def load_chunks(self) -> List[WorkChunk]:
+        self._compact_if_needed()
+        return load_chunks_from_csv(self.filename)
+
+    def iter_chunks(self) -> Iterator[WorkChunk]:
+        self._compact_if_needed()
+        for chunk_id, chunk_date, minutes, description in _stream_csv_rows(self.filename):
+            yield WorkChunk(chunk_id, chunk_date, minutes, description)
+
+    def load_store(self) -> ChunkStore:
+        self._compact_if_needed()
+        store = load_snapshot(self.filename + SNAPSHOT_SUFFIX, self.signature())
+        if store is None:
+            # Locked throughout, so the snapshot is saved under the signature of exactly the rows parsed
+            with file_lock(self.filename):
+                store = load_chunk_store_from_csv(self.filename)
+                self.save_snapshot(store)
+        return store
+
+    def save_snapshot(self, store: ChunkStore):
+        if os.path.exists(self.filename):
+            save_snapshot(store, self.filename + SNAPSHOT_SUFFIX, self.signature())
+
+    def load_chunks_in_range(self, start_date: date, end_date: date) -> List[WorkChunk]:
+        # Binary searches the memory-mapped file instead of reading all of it
+        if self._reader is None:
+            from src.mmap_reader import MappedCSVReader
+            self._reader = MappedCSVReader(self.filename)
+        return self._reader.load_chunks_in_range(start_date, end_date)
+
+    def append_chunks(self, chunks: List[WorkChunk]):
+        save_chunks_to_csv(chunks, filename=self.filename, append=True)
+
+    def last_id(self) -> int:
+        return read_last_id(self.filename)
+
+    def replace_chunks(self, chunks: List[WorkChunk]):
+        save_chunks_to_csv(chunks, filename=self.filename, append=False)
+        self.tombstone_count = 0
+
+    def delete_chunk(self, chunk_id, chunk_date: date = None):
+        append_tombstones([chunk_id], filename=self.filename)
+        self.tombstone_count += 1
+
+    def compact(self):
+        compact_csv(self.filename)
+        self.tombstone_count = 0
+
+    def signature(self):
+        return file_signature(self.filename, tombstone_filename(self.filename))
+
+    def change_cursor(self):
+        return csv_change_cursor(self.filename)
+
+    def read_changes(self, cursor):
+        return read_csv_changes(cursor, self.filename)
+
+    def watch_paths(self) -> List[str]:
+        return [self.filename, tombstone_filename(self.filename)]
+
+    def _compact_if_needed(self):
+        self.tombstone_count = len(load_tombstones(self.filename))
+        if self.tombstone_count >= COMPACT_TOMBSTONE_LIMIT:
+            self.compact()
+
+
+def file_signature(*paths: str) -> str:
+    """Return a string built from the size and mtime of each path (missing files count too)."""
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            parts.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+        except FileNotFoundError:
+            parts.append("-")
+    return "|".join(parts)
+
+
+def load_sidecar(data_filename: str, suffix: str, signature: str):
+    """
+    Load JSON data saved next to a data file by save_sidecar.
+
+    :return: The saved data, or None if there is none or it was saved for a
+             different signature (i.e. the data has changed since).
+    """
+    if signature is None:
+        return None
+    try:
+        with open(data_filename + suffix, mode='r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if saved.get("signature") != signature:
+        return None
+    return saved["data"]
+
+
+def save_sidecar(data_filename: str, suffix: str, signature: str, data):
+    """Save JSON data next to a data file, tagged with the data's signature."""
+    if signature is None:
+        return
+    path = data_filename + suffix
+    with open(path + ".tmp", mode='w', encoding='utf-8') as f:
+        json.dump({"signature": signature, "data": data}, f)
+    os.replace(path + ".tmp", path)
+
+
+def get_storage(backend: str = None, filename: str = None, journal: str = None) -> StorageBackend:
+    """
+    Create a storage backend.
+
+    :param backend: "csv", "sqlite" or "partitioned". Defaults to
+                    config.STORAGE_BACKEND.
+    :param filename: Data file path. Defaults to the backend's standard file.
+    :param journal: fsync policy for a write-ahead journal in front of the
+                    backend ("always", "interval" or "never"), or "off".
+                    Defaults to config.JOURNAL. (See journal.py)
+    """
+    backend = backend or config.STORAGE_BACKEND
+    journal = journal or config.JOURNAL
+    if backend == "csv":
+        storage = CSVStorage(filename or FILENAME)
+    elif backend == "sqlite":
+        from src.sqlite_storage import SQLiteStorage, DB_FILENAME
+        storage = SQLiteStorage(filename or DB_FILENAME)
+    elif backend == "partitioned":
+        from src.partitioned_storage import PartitionedCSVStorage, PARTITION_DIR
+        storage = PartitionedCSVStorage(filename or PARTITION_DIR)
+    else:
+        raise ValueError(f"Unknown storage backend: {backend!r}")
+
+    if journal != "off":
+        from src.journal import JournaledStorage
+        storage = JournaledStorage(storage, fsync=journal)
+    return storage